@@ -0,0 +1,141 @@
+"""
+Chronic absenteeism.
+
+Every night ChronicAbsenteeismJob (attendance.jobs) recomputes, for every
+section with recent attendance, each student's absence rate and longest
+run of consecutive absences over the section's last ROLLING_DAYS school
+days (days on which the section has any record). A student is absent on a
+school day when none of their records that day is present or late.
+
+A section is read with one query and turned into two arrays indexed by
+student, with one bit per school day: the days the student has a record
+and the days they were absent. Rates are popcounts of those arrays and
+streaks come from ANDing the absence array with itself shifted by one day
+until it is empty, each round ending the runs one day shorter. With NumPy
+these are whole-array operations, otherwise the same bit operations on
+Python integers. Students over a threshold replace the section's rows in
+AbsenteeismFlag, which the dashboard reads as is.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+
+from attendance.models import AbsenteeismFlag, Attendance
+from attendance.packed import np, popcount
+
+# School days looked at, one bit each, so at most 64 for uint64 arrays
+ROLLING_DAYS = 60
+# Calendar days searched for those school days
+LOOKBACK_DAYS = 120
+MIN_SCHOOL_DAYS = 10
+RATE_THRESHOLD = 0.1
+STREAK_THRESHOLD = 5
+ATTENDED = ("present", "late")
+
+
+def section_arrays(section_id, as_of):
+    """
+    ``(student_ids, recorded, absent)`` of the section's last ROLLING_DAYS
+    school days up to ``as_of``: bit ``i`` of ``recorded[s]`` and
+    ``absent[s]`` is school day ``i``, oldest first.
+    """
+    rows = list(
+        Attendance.objects.filter(
+            section_id=section_id,
+            date__gt=as_of - timedelta(days=LOOKBACK_DAYS),
+            date__lte=as_of,
+        ).values_list("student_id", "date", "status")
+    )
+    days = sorted({day for _, day, _ in rows})[-ROLLING_DAYS:]
+    day_index = {day: index for index, day in enumerate(days)}
+    student_ids = sorted({student_id for student_id, _, _ in rows})
+    student_index = {student_id: index for index, student_id in enumerate(student_ids)}
+    rows = [row for row in rows if row[1] in day_index]
+
+    if np is not None:
+        students = np.array([student_index[row[0]] for row in rows], dtype=np.intp)
+        bits = np.left_shift(
+            np.uint64(1),
+            np.array([day_index[row[1]] for row in rows], dtype=np.uint64),
+        )
+        attended_rows = np.array([row[2] in ATTENDED for row in rows], dtype=bool)
+        recorded = np.zeros(len(student_ids), dtype=np.uint64)
+        attended = np.zeros(len(student_ids), dtype=np.uint64)
+        np.bitwise_or.at(recorded, students, bits)
+        np.bitwise_or.at(attended, students[attended_rows], bits[attended_rows])
+        return student_ids, recorded, recorded & ~attended
+
+    recorded = [0] * len(student_ids)
+    attended = [0] * len(student_ids)
+    for student_id, day, status in rows:
+        bit = 1 << day_index[day]
+        recorded[student_index[student_id]] |= bit
+        if status in ATTENDED:
+            attended[student_index[student_id]] |= bit
+    return (
+        student_ids,
+        recorded,
+        [days & ~seen for days, seen in zip(recorded, attended)],
+    )
+
+
+def absence_stats(recorded, absent):
+    """
+    ``(school_days, absent_days, longest_streak)`` per student, as lists,
+    from the arrays of section_arrays.
+    """
+    if np is not None:
+        streaks = np.zeros(len(absent), dtype=np.int64)
+        runs = absent.copy()
+        while runs.any():
+            streaks += runs != 0
+            runs &= runs >> np.uint64(1)
+        return (
+            popcount(recorded).tolist(),
+            popcount(absent).tolist(),
+            streaks.tolist(),
+        )
+
+    streaks = []
+    for runs in absent:
+        streak = 0
+        while runs:
+            streak += 1
+            runs &= runs >> 1
+        streaks.append(streak)
+    return (
+        [days.bit_count() for days in recorded],
+        [days.bit_count() for days in absent],
+        streaks,
+    )
+
+
+def flag_section(section_id, institution_id, as_of):
+    """Recompute the flags of a section; returns ``(students, flagged)``."""
+    student_ids, recorded, absent = section_arrays(section_id, as_of)
+    flags = []
+    if student_ids:
+        for student_id, school_days, absent_days, streak in zip(
+            student_ids, *absence_stats(recorded, absent)
+        ):
+            rate = absent_days / school_days if school_days else 0.0
+            if streak >= STREAK_THRESHOLD or (
+                school_days >= MIN_SCHOOL_DAYS and rate >= RATE_THRESHOLD
+            ):
+                flags.append(
+                    AbsenteeismFlag(
+                        institution_id=institution_id,
+                        student_id=student_id,
+                        section_id=section_id,
+                        as_of=as_of,
+                        school_days=school_days,
+                        absent_days=absent_days,
+                        absence_rate=round(rate, 4),
+                        longest_streak=streak,
+                    )
+                )
+    with transaction.atomic():
+        AbsenteeismFlag.objects.filter(section_id=section_id).delete()
+        AbsenteeismFlag.objects.bulk_create(flags)
+    return len(student_ids), len(flags)
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from attendance.bulk import delete_attendance
 from attendance.models import Attendance
 
 
@@ -38,3 +39,9 @@ class AttendanceAdmin(admin.ModelAdmin):
             ).values_list("institution_id", flat=True)
             qs = qs.filter(institution__in=institutions)
         return qs
+
+    def delete_model(self, request, obj):
+        delete_attendance(Attendance.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_attendance(queryset)
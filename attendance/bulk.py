@@ -0,0 +1,149 @@
+"""
+Roster attendance writes.
+
+A teacher posts one status per student for a (section, subject, date).
+The roster is validated with validate_batch (two queries whatever its
+size), compared with the rows already recorded that day, and only the new
+or changed rows are written, with one INSERT ... ON CONFLICT DO UPDATE on
+the (student, section, subject, date) key, followed by one recount of
+their monthly rollups. Posting a day again corrects it instead of failing.
+upsert_rows does the same for rows spread over several days and sections,
+as offline uploads are (attendance.ingest). New absences notify the
+parents in the background (attendance.notifications). delete_attendance
+removes rows and recounts their rollups the same set-based way.
+"""
+
+from django.db import transaction
+
+from attendance.models import Attendance
+from attendance.pending import forget_pending
+from attendance.rollups import refresh_rollups
+from attendance.tasks import notify_absences
+from institution.validation import validate_batch
+
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+
+def upsert_attendance(institution_id, section_id, subject_id, date, rows, user):
+    """
+    Record ``rows`` (``[{"student_id", "status"}]``, one per student) and
+    return ``(results, errors)``: ``results`` holds
+    ``{"student_id", "status", "result"}`` per row, ``result`` being
+    created, updated or unchanged. When any row is invalid nothing is
+    written, ``results`` is empty and ``errors`` lists
+    ``{"index", "student_id", "errors"}``.
+    """
+    return upsert_rows(
+        institution_id,
+        [
+            {
+                "student_id": row["student_id"],
+                "section_id": section_id,
+                "subject_id": subject_id,
+                "date": date,
+                "status": row["status"],
+            }
+            for row in rows
+        ],
+        user,
+    )
+
+
+def upsert_rows(institution_id, rows, user):
+    """
+    upsert_attendance over rows of any sections, subjects and dates:
+    ``rows`` are ``{"student_id", "section_id", "subject_id", "date",
+    "status"}``, at most one per key, and are validated, read and written
+    together whatever their spread.
+    """
+    attendances = [
+        Attendance(institution_id=institution_id, created_by=user, **row)
+        for row in rows
+    ]
+    errors = validate_batch(attendances)
+    if errors:
+        for error in errors:
+            error["student_id"] = str(attendances[error["index"]].student_id)
+        return [], errors
+
+    keys = [_key(attendance) for attendance in attendances]
+    recorded = {
+        (student_id, section_id, subject_id, date): status
+        for student_id, section_id, subject_id, date, status in Attendance.objects.filter(
+            student_id__in={key[0] for key in keys},
+            section_id__in={key[1] for key in keys},
+            subject_id__in={key[2] for key in keys},
+            date__in={key[3] for key in keys},
+        ).values_list(
+            "student_id", "section_id", "subject_id", "date", "status"
+        )
+    }
+    results = []
+    changed = []
+    for attendance, key in zip(attendances, keys):
+        previous = recorded.get(key)
+        if previous is None:
+            result = CREATED
+        elif previous != attendance.status:
+            result = UPDATED
+        else:
+            result = UNCHANGED
+        if result != UNCHANGED:
+            changed.append(attendance)
+        results.append(
+            {
+                "student_id": str(attendance.student_id),
+                "status": attendance.status,
+                "result": result,
+            }
+        )
+    if changed:
+        # savepoint=False: the write and its rollups commit or fail together
+        # without a savepoint round trip when already in a transaction
+        with transaction.atomic(savepoint=False):
+            # A row recorded concurrently since the read above is updated too
+            Attendance.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=["student", "section", "subject", "date"],
+                update_fields=["status", "updated_at"],
+            )
+            # bulk_create skips the signals that maintain the rollups
+            refresh_rollups(_key(attendance) for attendance in changed)
+        absences = {}
+        for attendance in changed:
+            if attendance.status == "absent":
+                absences.setdefault(attendance.date, []).append(attendance.student_id)
+        for date, student_ids in absences.items():
+            notify_absences(institution_id, date, student_ids)
+        # Pairs recorded for the first time that day are no longer pending
+        forget_pending(
+            key[1:] for key, result in zip(keys, results) if result["result"] == CREATED
+        )
+    return results, []
+
+
+def delete_attendance(queryset):
+    """
+    Delete the attendance of ``queryset`` and recount the rollups and
+    section days of the keys it held; returns the number of rows deleted.
+    """
+    with transaction.atomic():
+        keys = list(
+            queryset.values_list("student_id", "section_id", "subject_id", "date")
+        )
+        deleted, _ = queryset.delete()
+        refresh_rollups(keys, prune=True)
+    forget_pending(key[1:] for key in keys)
+    return deleted
+
+
+def _key(attendance):
+    return (
+        attendance.student_id,
+        attendance.section_id,
+        attendance.subject_id,
+        attendance.date,
+    )
@@ -0,0 +1,83 @@
+"""
+Attendance exports.
+
+Rows are read with ``values_list()`` and ``queryset.iterator()``, so memory
+stays flat whatever the range: the CSV export streams each row to the
+response as it is read, and the XLSX one goes through an openpyxl
+write-only workbook spooled to a temporary file. Institution-wide ranges
+longer than MAX_STREAMED_DAYS are exported by AttendanceExportJob
+(attendance.jobs) instead, one month per chunk, and downloaded from the
+job.
+"""
+
+import csv
+from uuid import UUID
+
+import openpyxl
+
+from attendance.models import Attendance
+
+EXPORT_DIR = "jobs/exports"
+FILE_TYPES = ("csv", "xlsx")
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+# Longest range a request may export without a section
+MAX_STREAMED_DAYS = 93
+ITERATOR_CHUNK_SIZE = 2000
+
+# values_list() field -> column header
+COLUMNS = (
+    ("date", "Date"),
+    ("student_id", "Student ID"),
+    ("student__first_name", "First name"),
+    ("student__last_name", "Last name"),
+    ("student__email", "Email"),
+    ("section__name", "Section"),
+    ("subject__name__name", "Subject"),
+    ("status", "Status"),
+)
+HEADER = [label for _, label in COLUMNS]
+
+
+def export_rows(filters, start, end):
+    """Iterate the rows of the attendance matching ``filters`` in a range."""
+    return (
+        Attendance.objects.filter(filters, date__gte=start, date__lte=end)
+        .order_by("date", "section__name", "student__first_name", "student_id", "pk")
+        .values_list(*(field for field, _ in COLUMNS))
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    )
+
+
+def export_filename(start, end, file_type):
+    return f"attendance_{start:%Y%m%d}_{end:%Y%m%d}.{file_type}"
+
+
+class Echo:
+    """Pseudo-buffer: csv.writer returns each line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, header=True):
+    """Yield ``rows`` as CSV lines, one at a time."""
+    writer = csv.writer(Echo())
+    if header:
+        yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(rows, file):
+    """Write ``rows`` to ``file`` as a single-sheet workbook."""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Attendance")
+    sheet.append(HEADER)
+    for row in rows:
+        sheet.append(
+            [str(value) if isinstance(value, UUID) else value for value in row]
+        )
+    workbook.save(file)
@@ -0,0 +1,97 @@
+"""
+Idempotent offline attendance uploads.
+
+Teachers on poor connections upload the rosters they took offline, often
+several days and sections at once, and retry until they see a response.
+Each upload carries a client-generated ``batch_id``; its outcome is kept in
+Redis for IDEMPOTENCY_TTL under the teacher and batch id, so a retry gets
+the original response back without writing again. While the first attempt
+runs, the key holds a short lock and retries are told to wait. The key also
+stores a fingerprint of the upload so that a reused batch id with other
+content is refused rather than answered with another upload's outcome.
+
+Redis errors are logged and the upload is processed anyway: the writes are
+upserts, so a replay without the stored outcome records nothing twice.
+"""
+
+import hashlib
+import json
+import logging
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger("attendance")
+
+redis_client = settings.REDIS_CLIENT
+
+IDEMPOTENCY_TTL = 60 * 60 * 24
+# How long a crashed attempt blocks its retries
+LOCK_TTL = 60
+MAX_INGEST_ROWS = 5000
+
+CLAIMED = "claimed"
+REPLAY = "replay"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+
+def _batch_key(user_id, batch_id):
+    return f"attendance:ingest:{user_id}:{batch_id}"
+
+
+def fingerprint(payload):
+    """Hash of an upload's JSON ``payload``, independent of key order."""
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def begin(user_id, batch_id, digest):
+    """
+    Claim ``batch_id`` for ``user_id`` before processing it. Returns
+    ``(state, outcome)``: CLAIMED to go ahead, REPLAY with the stored
+    ``{"status", "data"}``, IN_PROGRESS while another attempt runs or
+    MISMATCH when the batch id was used for a different upload.
+    """
+    key = _batch_key(user_id, batch_id)
+    try:
+        stored = redis_client.get(key)
+        if stored is None:
+            if redis_client.set(
+                key, json.dumps({"fingerprint": digest}), nx=True, ex=LOCK_TTL
+            ):
+                return CLAIMED, None
+            # Another attempt claimed it in between
+            stored = redis_client.get(key) or json.dumps({"fingerprint": digest})
+    except redis.RedisError as e:
+        logger.warning(f"Could not check upload {batch_id}: {str(e)}")
+        return CLAIMED, None
+    stored = json.loads(stored)
+    if stored["fingerprint"] != digest:
+        return MISMATCH, None
+    if "status" not in stored:
+        return IN_PROGRESS, None
+    return REPLAY, {"status": stored["status"], "data": stored["data"]}
+
+
+def finish(user_id, batch_id, digest, status, data):
+    """Store the outcome of a claimed upload for its retries."""
+    try:
+        redis_client.set(
+            _batch_key(user_id, batch_id),
+            json.dumps(
+                {"fingerprint": digest, "status": status, "data": data}, default=str
+            ),
+            ex=IDEMPOTENCY_TTL,
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Could not store the outcome of upload {batch_id}: {str(e)}")
+
+
+def release(user_id, batch_id):
+    """Drop the claim of an upload that failed before having an outcome."""
+    try:
+        redis_client.delete(_batch_key(user_id, batch_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not release upload {batch_id}: {str(e)}")
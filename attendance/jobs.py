@@ -0,0 +1,198 @@
+import csv
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from attendance.absenteeism import LOOKBACK_DAYS, flag_section
+from attendance.export import (
+    EXPORT_DIR,
+    FILE_TYPES,
+    export_filename,
+    export_rows,
+    stream_csv,
+    write_xlsx,
+)
+from attendance.models import AbsenteeismFlag, Attendance
+from attendance.rollups import month_end
+from institution.jobs import _date, _uuid
+from institution.models import InstitutionInfo, Section, Subject
+from job_management.handlers import JobHandler, chunked, register
+
+
+@register
+class AttendanceExportJob(JobHandler):
+    """
+    Params: ``institution_id``, ``start_date``, ``end_date``, optional
+    ``section_id`` and ``subject_id``, and ``file_type`` (csv or xlsx).
+
+    Each chunk writes one month of rows to a CSV part file; finalize joins
+    the parts, in order, into the downloadable artifact.
+    """
+
+    kind = "attendance_export"
+    label = "Attendance export"
+
+    def validate(self, params, user):
+        institution_id = _uuid(params.get("institution_id"), "institution_id")
+        if not InstitutionInfo.objects.filter(id=institution_id, admin=user).exists():
+            raise ValidationError(
+                {"institution_id": "You are not the admin of this institution."}
+            )
+        start = _date(params.get("start_date"), "start_date")
+        end = _date(params.get("end_date"), "end_date")
+        if start > end:
+            raise ValidationError({"end_date": "Must not be before start_date."})
+        file_type = params.get("file_type") or "csv"
+        if file_type not in FILE_TYPES:
+            raise ValidationError({"file_type": "Use csv or xlsx."})
+        validated = {
+            "institution_id": str(institution_id),
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "file_type": file_type,
+        }
+        if params.get("section_id"):
+            section_id = _uuid(params["section_id"], "section_id")
+            if not Section.objects.filter(
+                pk=section_id, curriculum_track__institution_info_id=institution_id
+            ).exists():
+                raise ValidationError({"section_id": "Unknown section."})
+            validated["section_id"] = str(section_id)
+        if params.get("subject_id"):
+            subject_id = _uuid(params["subject_id"], "subject_id")
+            if not Subject.objects.filter(
+                pk=subject_id,
+                stream__curriculum_track__institution_info_id=institution_id,
+            ).exists():
+                raise ValidationError({"subject_id": "Unknown subject."})
+            validated["subject_id"] = str(subject_id)
+        return validated
+
+    def chunks(self, job):
+        start = date.fromisoformat(job.params["start_date"])
+        end = date.fromisoformat(job.params["end_date"])
+        payloads = []
+        while start <= end:
+            last = min(month_end(start), end)
+            payloads.append({"start": start.isoformat(), "end": last.isoformat()})
+            start = last + timedelta(days=1)
+        return payloads
+
+    def run_chunk(self, job, payload):
+        filters = Q(institution_id=job.params["institution_id"])
+        if job.params.get("section_id"):
+            filters &= Q(section_id=job.params["section_id"])
+        if job.params.get("subject_id"):
+            filters &= Q(subject_id=job.params["subject_id"])
+        rows = 0
+        with tempfile.TemporaryFile() as part:
+            for line in stream_csv(
+                export_rows(filters, payload["start"], payload["end"]), header=False
+            ):
+                part.write(line.encode("utf-8"))
+                rows += 1
+            part.seek(0)
+            path = f"{EXPORT_DIR}/{job.id}/{payload['start']}.csv"
+            # A retried chunk replaces its part instead of adding another
+            default_storage.delete(path)
+            path = default_storage.save(path, File(part))
+        return {"file": path, "rows": rows}
+
+    def finalize(self, job, results):
+        file_type = job.params["file_type"]
+        with tempfile.TemporaryFile() as out:
+            if file_type == "csv":
+                out.write(next(stream_csv([])).encode("utf-8"))
+                for result in results:
+                    with default_storage.open(result["file"], "rb") as part:
+                        shutil.copyfileobj(part, out)
+            else:
+                write_xlsx(self._read_parts(results), out)
+            out.seek(0)
+            job.attach_artifact(
+                export_filename(
+                    date.fromisoformat(job.params["start_date"]),
+                    date.fromisoformat(job.params["end_date"]),
+                    file_type,
+                ),
+                File(out),
+            )
+        for result in results:
+            default_storage.delete(result["file"])
+        return {"rows": sum(result["rows"] for result in results)}
+
+    @staticmethod
+    def _read_parts(results):
+        for result in results:
+            with default_storage.open(result["file"], "rb") as part:
+                for row in csv.reader(
+                    io.TextIOWrapper(part, encoding="utf-8", newline="")
+                ):
+                    yield [date.fromisoformat(row[0]), *row[1:]]
+
+
+@register
+class ChronicAbsenteeismJob(JobHandler):
+    """
+    Params: ``as_of`` (a date, by default today). Flags the chronically
+    absent students of every section with attendance in the LOOKBACK_DAYS
+    before ``as_of`` (see attendance.absenteeism), SECTIONS_PER_CHUNK
+    sections per chunk. Queued every night by
+    attendance.tasks.detect_chronic_absenteeism.
+    """
+
+    kind = "chronic_absenteeism"
+    label = "Chronic absenteeism detection"
+    chunk_size = 50
+
+    def validate(self, params, user):
+        if user is not None and not user.is_superuser:
+            raise ValidationError({"kind": "Only administrators may run this job."})
+        as_of = params.get("as_of")
+        return {"as_of": (_date(as_of, "as_of") if as_of else date.today()).isoformat()}
+
+    def chunks(self, job):
+        as_of = date.fromisoformat(job.params["as_of"])
+        sections = (
+            Attendance.objects.filter(
+                date__gt=as_of - timedelta(days=LOOKBACK_DAYS), date__lte=as_of
+            )
+            .order_by("section_id")
+            .values_list("section_id", flat=True)
+            .distinct()
+        )
+        return [
+            {"sections": [str(section_id) for section_id in sections]}
+            for sections in chunked(sections, self.chunk_size)
+        ]
+
+    def run_chunk(self, job, payload):
+        as_of = date.fromisoformat(job.params["as_of"])
+        institutions = dict(
+            Section.objects.filter(pk__in=payload["sections"]).values_list(
+                "pk", "curriculum_track__institution_info_id"
+            )
+        )
+        students = flagged = 0
+        for section_id, institution_id in institutions.items():
+            counts = flag_section(section_id, institution_id, as_of)
+            students += counts[0]
+            flagged += counts[1]
+        return {"sections": len(institutions), "students": students, "flagged": flagged}
+
+    def finalize(self, job, results):
+        # Sections without recent attendance keep no flags
+        stale, _ = AbsenteeismFlag.objects.filter(
+            as_of__lt=job.params["as_of"]
+        ).delete()
+        totals = {"sections": 0, "students": 0, "flagged": 0}
+        for result in results:
+            for key in totals:
+                totals[key] += result[key]
+        return {**totals, "cleared": stale}
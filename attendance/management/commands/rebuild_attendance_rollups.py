@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from attendance.rollups import rebuild_rollups, rebuild_section_days
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the monthly attendance rollups (status counts and packed "
+        "day statuses) and the section day counts from the attendance rows, "
+        "e.g. to backfill them. "
+        "Needed after writes that bypass the Attendance signals, such as "
+        "bulk_create or queryset.update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rebuild_rollups(batch_size=options["batch_size"], stdout=self.stdout)
+        rebuild_section_days(batch_size=options["batch_size"], stdout=self.stdout)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 00:47
+
+import institution.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendance',
+            name='id',
+            field=models.UUIDField(default=institution.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2 on 2026-10-19 01:51
+
+from django.db import migrations, models
+from django.db.models import Case, Count, Q, Sum, Value, When
+from django.db.models.functions import Cast, ExtractDay, TruncMonth
+
+# As of this migration; attendance.rollups and attendance.packed build the
+# same counts for later writes
+STATUSES = ("present", "absent", "late", "excused")
+STATUS_CODES = {"present": 0, "absent": 1, "late": 2, "excused": 3}
+
+
+def backfill(apps, schema_editor):
+    # Also fills the counts of the rollups created by 0005
+    Attendance = apps.get_model("attendance", "Attendance")
+    AttendanceRollup = apps.get_model("attendance", "AttendanceRollup")
+    day = Cast(ExtractDay("date"), models.IntegerField()) - 1
+    code = Cast(
+        Case(
+            *[
+                When(status=status, then=Value(value))
+                for status, value in STATUS_CODES.items()
+            ],
+            default=Value(0),
+        ),
+        models.BigIntegerField(),
+    )
+    counts = (
+        Attendance.objects.annotate(month=TruncMonth("date"))
+        .values("institution_id", "student_id", "section_id", "subject_id", "month")
+        .annotate(
+            **{status: Count("pk", filter=Q(status=status)) for status in STATUSES},
+            # Each day sets its own bits, so summing the shifted values ORs them
+            days=Sum(Cast(Value(1), models.BigIntegerField()).bitleftshift(day)),
+            statuses=Sum(code.bitleftshift(day * 2)),
+        )
+        .order_by()
+    )
+    AttendanceRollup.objects.all().delete()
+    AttendanceRollup.objects.bulk_create(
+        (AttendanceRollup(**row) for row in counts.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0005_attendancerollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attendancerollup",
+            name="days",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="attendancerollup",
+            name="statuses",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2 on 2026-10-19 02:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0006_attendancerollup_packed"),
+        ("institution", "0006_academicsession"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AbsenteeismFlag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("as_of", models.DateField()),
+                ("school_days", models.PositiveSmallIntegerField()),
+                ("absent_days", models.PositiveSmallIntegerField()),
+                ("absence_rate", models.FloatField()),
+                ("longest_streak", models.PositiveSmallIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "institution",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="institution.institutioninfo",
+                    ),
+                ),
+                (
+                    "section",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="institution.section",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Absenteeism Flag",
+                "verbose_name_plural": "Absenteeism Flags",
+                "indexes": [
+                    models.Index(
+                        fields=["institution", "-absence_rate"],
+                        name="attendance__institu_47bf89_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("section", "student"), name="absenteeism_flag_key"
+                    )
+                ],
+            },
+        ),
+    ]
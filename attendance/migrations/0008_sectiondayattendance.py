@@ -0,0 +1,85 @@
+# Generated by Django 5.2 on 2026-10-19 02:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+# As of this migration; attendance.rollups keeps the counts up to date
+STATUSES = ("present", "absent", "late", "excused")
+
+
+def backfill(apps, schema_editor):
+    Attendance = apps.get_model("attendance", "Attendance")
+    SectionDayAttendance = apps.get_model("attendance", "SectionDayAttendance")
+    counts = (
+        Attendance.objects.values("institution_id", "section_id", "date")
+        .annotate(
+            **{status: Count("pk", filter=Q(status=status)) for status in STATUSES}
+        )
+        .order_by()
+    )
+    SectionDayAttendance.objects.bulk_create(
+        (SectionDayAttendance(**row) for row in counts.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0007_absenteeismflag"),
+        ("institution", "0006_academicsession"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SectionDayAttendance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("present", models.PositiveIntegerField(default=0)),
+                ("absent", models.PositiveIntegerField(default=0)),
+                ("late", models.PositiveIntegerField(default=0)),
+                ("excused", models.PositiveIntegerField(default=0)),
+                (
+                    "institution",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="institution.institutioninfo",
+                    ),
+                ),
+                (
+                    "section",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="institution.section",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Section Day Attendance",
+                "verbose_name_plural": "Section Day Attendance",
+                "indexes": [
+                    models.Index(
+                        fields=["institution", "date"],
+                        name="attendance__institu_e5054a_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("section", "date"), name="section_day_attendance_key"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
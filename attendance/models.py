@@ -1,12 +1,19 @@
-import uuid
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from institution.models import InstitutionInfo, Section, Subject, StudentEnrollment
+from institution.models import (
+    InstitutionInfo,
+    Section,
+    Subject,
+    StudentEnrollment,
+    uuid7,
+)
+from institution.archive import archive_model
+from institution.validation import BatchValidationMixin, lookup
 
 
-class Attendance(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+class Attendance(BatchValidationMixin, models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     institution = models.ForeignKey(
         InstitutionInfo,
         on_delete=models.CASCADE,
@@ -62,16 +69,144 @@ class Attendance(models.Model):
     def __str__(self):
         return f"{self.student} - {self.subject} - {self.date} - {self.status}"
 
-    def clean(self):
+    @classmethod
+    def build_validation_context(cls, instances):
+        enrollments = StudentEnrollment.objects.filter(
+            user_id__in={attendance.student_id for attendance in instances},
+            section_id__in={attendance.section_id for attendance in instances},
+            is_active=True,
+        ).values_list("user_id", "section_id", "institution_id")
+        return {
+            "enrollments": set(enrollments),
+            "subject_sections": lookup(
+                Subject, instances, "subject_id", "stream__section_id"
+            ),
+        }
 
+    def clean_with_context(self, context):
         # Ensure student is enrolled in the section
-        if not StudentEnrollment.objects.filter(
-            user=self.student,
-            section=self.section,
-            institution=self.institution,
-            is_active=True,
-        ).exists():
+        if (
+            self.student_id,
+            self.section_id,
+            self.institution_id,
+        ) not in context["enrollments"]:
             raise ValidationError("Student is not enrolled in this section.")
         # Ensure subject belongs to the section's curriculum track
-        if self.subject.stream.section != self.section:
+        if context["subject_sections"].get(self.subject_id) != self.section_id:
             raise ValidationError("Subject does not belong to this section.")
+
+
+ArchivedAttendance = archive_model(Attendance, indexes=[["student", "date"]])
+
+
+class AttendanceRollup(models.Model):
+    """
+    Status counts of a student in a section and subject for one month
+    (``month`` is its first day), and the statuses of its days packed two
+    bits each. Kept in step with Attendance by attendance.rollups, in the
+    same transaction as the writes.
+    """
+
+    institution = models.ForeignKey(
+        InstitutionInfo, on_delete=models.CASCADE, related_name="+"
+    )
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name="+")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="+")
+    month = models.DateField()
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+    # The month's statuses, bit-packed (see attendance.packed)
+    days = models.IntegerField(default=0)
+    statuses = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Attendance Rollup"
+        verbose_name_plural = "Attendance Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["section", "subject", "month", "student"],
+                name="attendance_rollup_key",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["institution", "month"]),
+            models.Index(fields=["student", "month"]),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.subject} - {self.month:%Y-%m}"
+
+
+class SectionDayAttendance(models.Model):
+    """
+    Status counts of all the attendance of a section on one day, every
+    subject included. Kept in step with Attendance by attendance.rollups
+    along with the monthly rollups; read by the institution dashboard.
+    """
+
+    institution = models.ForeignKey(
+        InstitutionInfo, on_delete=models.CASCADE, related_name="+"
+    )
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name="+")
+    date = models.DateField()
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Section Day Attendance"
+        verbose_name_plural = "Section Day Attendance"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["section", "date"], name="section_day_attendance_key"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["institution", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.section} - {self.date}"
+
+
+class AbsenteeismFlag(models.Model):
+    """
+    A student flagged as chronically absent in a section by the nightly
+    run of attendance.absenteeism, with the figures that flagged them over
+    the section's last school days up to ``as_of``.
+    """
+
+    institution = models.ForeignKey(
+        InstitutionInfo, on_delete=models.CASCADE, related_name="+"
+    )
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name="+")
+    as_of = models.DateField()
+    school_days = models.PositiveSmallIntegerField()
+    absent_days = models.PositiveSmallIntegerField()
+    absence_rate = models.FloatField()
+    longest_streak = models.PositiveSmallIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Absenteeism Flag"
+        verbose_name_plural = "Absenteeism Flags"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["section", "student"], name="absenteeism_flag_key"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["institution", "-absence_rate"]),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.section} - {self.absence_rate:.0%}"
@@ -0,0 +1,117 @@
+"""
+Absence notifications to parents.
+
+Recording an absence only queues a task once the transaction commits
+(attendance.tasks.notify_absences), so the teacher's request never waits on
+Redis or the SMS gateway. The task adds the students to a Redis set per
+institution and date; the first absence of a window schedules the send
+ABSENCE_BATCH_WINDOW seconds later. The send drains the set, drops the
+students no longer absent (a correction within the window) or already
+notified that day, and sends their parents' messages in batches of
+SMS_BATCH_SIZE over the pooled SMS session. A student is marked notified
+before the send, so a failed SMS is counted in the metrics, not retried.
+"""
+
+from django.conf import settings
+
+from attendance.models import Attendance
+from institution.models import InstitutionInfo
+from user_management.models import ParentChildRelationship
+
+redis_client = settings.REDIS_CLIENT
+
+ABSENCE_BATCH_WINDOW = 5 * 60  # seconds
+SMS_BATCH_SIZE = 50
+NOTIFIED_TTL = 60 * 60 * 48
+
+
+def _pending_key(institution_id, day):
+    return f"absences:{institution_id}:{day}"
+
+
+def _scheduled_key(institution_id, day):
+    return f"absences:{institution_id}:{day}:scheduled"
+
+
+def _notified_key(student_id, day):
+    return f"absences:notified:{student_id}:{day}"
+
+
+def collect(institution_id, day, student_ids):
+    """
+    Add ``student_ids`` to the pending absences of ``day``. Returns True
+    when this opened a window, i.e. the caller must schedule the send.
+    """
+    pending = _pending_key(institution_id, day)
+    pipe = redis_client.pipeline()
+    pipe.sadd(pending, *student_ids)
+    pipe.expire(pending, NOTIFIED_TTL)
+    # Expires on its own should the scheduled send be lost
+    pipe.set(
+        _scheduled_key(institution_id, day), 1, nx=True, ex=2 * ABSENCE_BATCH_WINDOW
+    )
+    return bool(pipe.execute()[-1])
+
+
+def drain(institution_id, day):
+    """Take the pending absences of ``day`` and close its window."""
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.smembers(_pending_key(institution_id, day))
+    pipe.delete(_pending_key(institution_id, day))
+    pipe.delete(_scheduled_key(institution_id, day))
+    return sorted(pipe.execute()[0])
+
+
+def claim(day, student_ids):
+    """The ``student_ids`` not notified yet for ``day``, now marked notified."""
+    pipe = redis_client.pipeline()
+    for student_id in student_ids:
+        pipe.set(_notified_key(student_id, day), 1, nx=True, ex=NOTIFIED_TTL)
+    return [
+        student_id
+        for student_id, claimed in zip(student_ids, pipe.execute())
+        if claimed
+    ]
+
+
+def still_absent(institution_id, day, student_ids):
+    """The ``student_ids`` with an absence recorded on ``day`` in any subject."""
+    return {
+        str(student_id)
+        for student_id in Attendance.objects.filter(
+            institution_id=institution_id,
+            date=day,
+            status="absent",
+            student_id__in=student_ids,
+        )
+        .values_list("student_id", flat=True)
+        .distinct()
+    }
+
+
+def absence_messages(institution_id, day, student_ids):
+    """``[(phone number, message)]`` for the parents of ``student_ids``."""
+    institution = (
+        InstitutionInfo.objects.filter(pk=institution_id)
+        .values_list("name", flat=True)
+        .first()
+    )
+    parents = (
+        ParentChildRelationship.objects.filter(
+            child_id__in=student_ids, parent__phone_number__isnull=False
+        )
+        .exclude(parent__phone_number="")
+        .values_list("parent__phone_number", "child__first_name", "child__last_name")
+        .order_by("parent__phone_number", "child_id")
+    )
+    messages = []
+    for phone_number, first_name, last_name in parents:
+        name = " ".join(part for part in (first_name, last_name) if part)
+        messages.append(
+            (
+                phone_number,
+                f"Dear parent, {name or 'your child'} was absent from "
+                f"{institution} on {day:%d %b %Y}.",
+            )
+        )
+    return messages
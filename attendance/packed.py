@@ -0,0 +1,227 @@
+"""
+Bit-packed monthly attendance.
+
+Besides its counts, each AttendanceRollup row stores the whole month of
+its (student, section, subject) in two integers:
+
+- ``days``: bit ``d - 1`` is set when day ``d`` has a record (31 bits);
+- ``statuses``: bits ``2(d - 1)`` and ``2(d - 1) + 1`` hold the status code
+  of day ``d`` (62 bits, so it fits a signed BIGINT).
+
+That is 12 bytes of payload for a month, against one ~100 byte row (plus
+three index entries) per day in Attendance. The helpers below encode and
+decode single months and count statuses over many months at once with
+NumPy (plain integer bit operations remain as a fallback should it be
+missing); ``read_packed`` and ``section_calendar`` serve day records and
+month grids from the packed months.
+"""
+
+from calendar import monthrange
+
+from django.db.models import OuterRef, Subquery
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is in requirements.txt
+    np = None
+
+from attendance.models import Attendance, AttendanceRollup
+from institution.models import StudentEnrollment
+
+STATUS_CODES = {"present": 0, "absent": 1, "late": 2, "excused": 3}
+CODE_STATUSES = {code: status for status, code in STATUS_CODES.items()}
+
+ALL_DAYS = (1 << 31) - 1
+EVEN_BITS = 0x5555555555555555
+# Masks of the spread() steps, from the widest gap to the narrowest
+SPREAD_STEPS = (
+    (16, 0x0000FFFF0000FFFF),
+    (8, 0x00FF00FF00FF00FF),
+    (4, 0x0F0F0F0F0F0F0F0F),
+    (2, 0x3333333333333333),
+    (1, EVEN_BITS),
+)
+
+
+def encode_month(statuses):
+    """``{day of month: status}`` -> ``(days, statuses)`` integers."""
+    days = packed = 0
+    for day, status in statuses.items():
+        days |= 1 << (day - 1)
+        packed |= STATUS_CODES[status] << (2 * (day - 1))
+    return days, packed
+
+
+def decode_month(days, statuses):
+    """``(days, statuses)`` -> ``{day of month: status}`` of the recorded days."""
+    decoded = {}
+    while days:
+        bit = days & -days
+        day = bit.bit_length()
+        decoded[day] = CODE_STATUSES[(statuses >> (2 * (day - 1))) & 3]
+        days ^= bit
+    return decoded
+
+
+def day_mask(month, start=None, end=None):
+    """Bits of the days of ``month`` (its first day) within ``[start, end]``."""
+    key = (month.year, month.month)
+    if start is not None and (start.year, start.month) > key:
+        return 0
+    if end is not None and (end.year, end.month) < key:
+        return 0
+    first = start.day if start is not None and (start.year, start.month) == key else 1
+    last = end.day if end is not None and (end.year, end.month) == key else 31
+    return ((1 << last) - 1) & ~((1 << (first - 1)) - 1)
+
+
+def spread(mask):
+    """Move bit ``i`` of a 31-bit mask to bit ``2i`` (works on NumPy arrays)."""
+    for shift, bits in SPREAD_STEPS:
+        mask = (mask | (mask << shift)) & bits
+    return mask
+
+
+def _matches(statuses, code, even_bits):
+    """Even bits set where the 2-bit field of ``statuses`` equals ``code``."""
+    low = statuses & even_bits
+    high = (statuses >> 1) & even_bits
+    if not code & 1:
+        low = ~low & even_bits
+    if not code & 2:
+        high = ~high & even_bits
+    return low & high
+
+
+def count_statuses(months):
+    """
+    Status counts of each of ``months``, a list of ``(days, statuses,
+    mask)`` where ``mask`` selects the days to count. Returns ``{status:
+    [count of each month]}``.
+    """
+    if not months:
+        return {status: [] for status in STATUS_CODES}
+    if np is not None:
+        return _count_numpy(months)
+    counts = {status: [] for status in STATUS_CODES}
+    for days, statuses, mask in months:
+        selected = spread(days & mask)
+        for status, code in STATUS_CODES.items():
+            counts[status].append(
+                (_matches(statuses, code, EVEN_BITS) & selected).bit_count()
+            )
+    return counts
+
+
+def popcount(values):
+    """Set bits of each element of a uint64 NumPy array."""
+    if hasattr(np, "bitwise_count"):  # NumPy 2
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def _count_numpy(months):
+    days, statuses, masks = (
+        np.array(column, dtype=np.uint64) for column in zip(*months)
+    )
+    selected = days & masks
+    for shift, bits in SPREAD_STEPS:
+        selected = (selected | (selected << np.uint64(shift))) & np.uint64(bits)
+    even_bits = np.uint64(EVEN_BITS)
+    return {
+        status: popcount(_matches(statuses, code, even_bits) & selected).tolist()
+        for status, code in STATUS_CODES.items()
+    }
+
+
+def read_packed(filters, start=None, end=None):
+    """
+    Read adapter: the attendance matching ``filters`` (a Q over the columns
+    Attendance and AttendanceRollup share) between ``start`` and ``end``,
+    decoded from the packed rollups as unsaved Attendance instances, latest
+    first. They carry no id nor audit fields.
+    """
+    rollups = AttendanceRollup.objects.filter(filters).select_related(
+        "section", "subject__name"
+    )
+    if start is not None:
+        rollups = rollups.filter(month__gte=start.replace(day=1))
+    if end is not None:
+        rollups = rollups.filter(month__lte=end)
+    records = []
+    for rollup in rollups:
+        days = rollup.days & day_mask(rollup.month, start, end)
+        for day, status in decode_month(days, rollup.statuses).items():
+            records.append(
+                Attendance(
+                    id=None,
+                    institution_id=rollup.institution_id,
+                    student_id=rollup.student_id,
+                    section=rollup.section,
+                    subject=rollup.subject,
+                    date=rollup.month.replace(day=day),
+                    status=status,
+                )
+            )
+    records.sort(key=lambda record: record.date, reverse=True)
+    return records
+
+
+# Letter of each status in section_calendar rows; "." is a day without record
+STATUS_LETTERS = {"present": "P", "absent": "A", "late": "L", "excused": "E"}
+
+
+def section_calendar(section_id, subject_id, month):
+    """
+    Attendance of the students enrolled in a section for one subject and
+    ``month`` (its first day), as a students x days matrix with per-day and
+    per-student totals. One query: the roster, with each student's packed
+    month from the rollups.
+    """
+    rollups = AttendanceRollup.objects.filter(
+        student_id=OuterRef("user_id"),
+        section_id=section_id,
+        subject_id=subject_id,
+        month=month,
+    )
+    roster = list(
+        StudentEnrollment.objects.filter(section_id=section_id, is_active=True)
+        .annotate(
+            days=Subquery(rollups.values("days")[:1]),
+            statuses=Subquery(rollups.values("statuses")[:1]),
+        )
+        .order_by("user__first_name", "user__last_name", "user_id")
+        .values_list(
+            "user_id", "user__first_name", "user__last_name", "days", "statuses"
+        )
+    )
+    length = monthrange(month.year, month.month)[1]
+    day_totals = {status: [0] * length for status in STATUS_CODES}
+    rows = []
+    for *_, days, statuses in roster:
+        decoded = decode_month(days or 0, statuses or 0)
+        for day, status in decoded.items():
+            day_totals[status][day - 1] += 1
+        rows.append(
+            "".join(
+                STATUS_LETTERS[decoded[day]] if day in decoded else "."
+                for day in range(1, length + 1)
+            )
+        )
+    student_totals = count_statuses(
+        [(days or 0, statuses or 0, ALL_DAYS) for *_, days, statuses in roster]
+    )
+    return {
+        "section": str(section_id),
+        "subject": str(subject_id),
+        "month": f"{month:%Y-%m}",
+        "days": length,
+        "legend": {letter: status for status, letter in STATUS_LETTERS.items()},
+        "students": [
+            {"id": str(user_id), "first_name": first_name, "last_name": last_name}
+            for user_id, first_name, last_name, *_ in roster
+        ],
+        "matrix": rows,
+        "day_totals": day_totals,
+        "student_totals": student_totals,
+    }
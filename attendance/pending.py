@@ -0,0 +1,92 @@
+"""
+Attendance a teacher still has to take today.
+
+A teacher's assignments are the (section, subject) pairs of their active
+TeacherEnrollments whose subject is taught in the section. The pending
+ones are found with a single query: those pairs anti-joined (NOT EXISTS)
+with the day's Attendance. The list is cached per teacher and day; writes
+that create or delete attendance call ``forget_pending`` once they commit,
+which drops the entries of every teacher of the pairs they touched.
+Assignment changes show up when the entry expires.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+
+from attendance.models import Attendance
+from institution.models import TeacherEnrollment
+
+PENDING_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(teacher_id, day):
+    return f"attendance_pending:{teacher_id}:{day}"
+
+
+def pending_pairs(teacher_id, day):
+    """
+    ``[{"section_id", "section_name", "subject_id", "subject_name"}]`` of
+    the assignments of ``teacher_id`` without attendance on ``day``.
+    """
+    recorded = Attendance.objects.filter(
+        section_id=OuterRef("section"), subject_id=OuterRef("subjects"), date=day
+    )
+    # One filter() call so every condition uses the same section and
+    # subject joins
+    return list(
+        TeacherEnrollment.objects.filter(
+            ~Exists(recorded),
+            user_id=teacher_id,
+            is_active=True,
+            section__is_active=True,
+            subjects__stream__section=F("section"),
+        )
+        .values(
+            section_id=F("section"),
+            section_name=F("section__name"),
+            subject_id=F("subjects"),
+            subject_name=F("subjects__name__name"),
+        )
+        .order_by("section_name", "subject_name", "section_id", "subject_id")
+        .distinct()
+    )
+
+
+def get_pending(teacher_id, day):
+    """Cached ``pending_pairs``."""
+    key = _cache_key(teacher_id, day)
+    pairs = cache.get(key)
+    if pairs is None:
+        pairs = pending_pairs(teacher_id, day)
+        cache.set(key, pairs, PENDING_CACHE_TIMEOUT)
+    return pairs
+
+
+def forget_pending(keys):
+    """
+    After the current transaction commits, drop the cached lists of the
+    teachers of ``keys``, ``(section_id, subject_id, day)`` tuples.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+
+    def forget():
+        teacher_ids = (
+            TeacherEnrollment.objects.filter(
+                section__in={section_id for section_id, _, _ in keys},
+                subjects__in={subject_id for _, subject_id, _ in keys},
+            )
+            .values_list("user_id", flat=True)
+            .distinct()
+        )
+        cache.delete_many(
+            [
+                _cache_key(teacher_id, day)
+                for teacher_id in teacher_ids
+                for day in {day for _, _, day in keys}
+            ]
+        )
+
+    transaction.on_commit(forget)
@@ -0,0 +1,392 @@
+"""
+Monthly attendance rollups.
+
+AttendanceRollup holds the status counts of each (student, section,
+subject, month). ``refresh_rollups`` recounts the keys a write touched
+from the raw rows with one INSERT ... SELECT ... GROUP BY ... ON CONFLICT
+DO UPDATE per (section, subject, month), so it is idempotent and safe to
+run again, and the SectionDayAttendance counts of the (section, day)
+pairs touched the same way, one statement per section. The Attendance
+signals in attendance.signals call it for single-row saves; bulk writes
+and deletes (attendance.bulk) call it themselves.
+
+``attendance_statistics`` reads the counts of the whole months of a date
+range and the packed day statuses (attendance.packed) of the partial
+months at its edges, so it never reads the raw rows.
+"""
+
+from calendar import monthrange
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import (
+    BigIntegerField,
+    Case,
+    Count,
+    DateField,
+    Exists,
+    IntegerField,
+    OuterRef,
+    Q,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, ExtractDay, TruncMonth
+
+from attendance.models import Attendance, AttendanceRollup, SectionDayAttendance
+from attendance.packed import STATUS_CODES, count_statuses, day_mask
+from institution.models import Section, Subject
+from user_management.models import User
+
+STATUSES = ("present", "absent", "late", "excused")
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def month_end(day):
+    return day.replace(day=monthrange(day.year, day.month)[1])
+
+
+def _status_counts(suffix=""):
+    return {
+        f"{status}{suffix}": Count("pk", filter=Q(status=status)) for status in STATUSES
+    }
+
+
+def _packed_sums():
+    """Aggregates building the packed ``days`` and ``statuses`` of a month."""
+    # Each day sets its own bits, so summing the shifted values ORs them
+    day = Cast(ExtractDay("date"), IntegerField()) - 1
+    code = Cast(
+        Case(
+            *[
+                When(status=status, then=Value(value))
+                for status, value in STATUS_CODES.items()
+            ],
+            default=Value(0),
+        ),
+        BigIntegerField(),
+    )
+    return {
+        "days": Sum(Cast(Value(1), BigIntegerField()).bitleftshift(day)),
+        "statuses": Sum(code.bitleftshift(day * 2)),
+    }
+
+
+def _upsert(model, counts, columns, unique):
+    """
+    INSERT the rows of ``counts`` (a values() queryset selecting
+    ``columns`` in order) into ``model`` in one statement, updating the
+    counts of the rows whose ``unique`` columns already exist.
+    """
+    sql, params = counts.query.sql_with_params()
+    quote = connection.ops.quote_name
+    updated = [
+        column for column in columns if column not in unique + ["institution_id"]
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(model._meta.db_table)} "
+            f"({', '.join(quote(column) for column in columns)}) {sql} "
+            f"ON CONFLICT ({', '.join(quote(column) for column in unique)}) "
+            f"DO UPDATE SET "
+            + ", ".join(
+                f"{quote(column)} = excluded.{quote(column)}" for column in updated
+            ),
+            params,
+        )
+
+
+def _recount(section_id, subject_id, month, student_ids, prune):
+    raw = Attendance.objects.filter(
+        section_id=section_id,
+        subject_id=subject_id,
+        date__gte=month,
+        date__lte=month_end(month),
+        student_id__in=student_ids,
+    )
+    counts = (
+        raw.order_by()
+        .values("institution_id", "student_id", "section_id", "subject_id")
+        .annotate(
+            month=Value(month, output_field=DateField()),
+            **_status_counts(),
+            **_packed_sums(),
+        )
+    )
+    _upsert(
+        AttendanceRollup,
+        counts,
+        [
+            "institution_id",
+            "student_id",
+            "section_id",
+            "subject_id",
+            "month",
+            *STATUSES,
+            "days",
+            "statuses",
+        ],
+        ["student_id", "section_id", "subject_id", "month"],
+    )
+    if prune:
+        # Keys whose last raw row was deleted or moved away
+        AttendanceRollup.objects.filter(
+            section_id=section_id,
+            subject_id=subject_id,
+            month=month,
+            student_id__in=student_ids,
+        ).exclude(Exists(raw.filter(student_id=OuterRef("student_id")))).delete()
+
+
+def _recount_days(section_id, days, prune):
+    raw = Attendance.objects.filter(section_id=section_id, date__in=days)
+    counts = (
+        raw.order_by()
+        .values("institution_id", "section_id", "date")
+        .annotate(**_status_counts())
+    )
+    _upsert(
+        SectionDayAttendance,
+        counts,
+        ["institution_id", "section_id", "date", *STATUSES],
+        ["section_id", "date"],
+    )
+    if prune:
+        SectionDayAttendance.objects.filter(
+            section_id=section_id, date__in=days
+        ).exclude(Exists(raw.filter(date=OuterRef("date")))).delete()
+
+
+def refresh_rollups(keys, prune=False):
+    """
+    Recount the rollups of ``keys``, ``(student, section, subject, day)``
+    tuples (any day of the month), and the SectionDayAttendance of their
+    sections and days. Pass ``prune=True`` after deletes so keys left
+    without rows are removed.
+    """
+    groups = {}
+    section_days = {}
+    for student_id, section_id, subject_id, day in keys:
+        groups.setdefault((section_id, subject_id, month_start(day)), set()).add(
+            student_id
+        )
+        section_days.setdefault(section_id, set()).add(day)
+    for (section_id, subject_id, month), student_ids in groups.items():
+        _recount(section_id, subject_id, month, list(student_ids), prune)
+    for section_id, days in section_days.items():
+        _recount_days(section_id, sorted(days), prune)
+
+
+def rebuild_rollups(batch_size=1000, stdout=None):
+    """Recount every rollup from the attendance rows in one aggregate query."""
+    counts = (
+        Attendance.objects.annotate(month=TruncMonth("date"))
+        .values("institution_id", "student_id", "section_id", "subject_id", "month")
+        .annotate(**_status_counts(), **_packed_sums())
+        .order_by()
+    )
+    with transaction.atomic():
+        AttendanceRollup.objects.all().delete()
+        rollups = AttendanceRollup.objects.bulk_create(
+            (AttendanceRollup(**row) for row in counts.iterator()),
+            batch_size=batch_size,
+        )
+    if stdout:
+        stdout.write(f"Rebuilt {len(rollups)} attendance rollups")
+
+
+def rebuild_section_days(batch_size=1000, stdout=None):
+    """Recount every SectionDayAttendance, as rebuild_rollups does the rollups."""
+    counts = (
+        Attendance.objects.values("institution_id", "section_id", "date")
+        .annotate(**_status_counts())
+        .order_by()
+    )
+    with transaction.atomic():
+        SectionDayAttendance.objects.all().delete()
+        section_days = SectionDayAttendance.objects.bulk_create(
+            (SectionDayAttendance(**row) for row in counts.iterator()),
+            batch_size=batch_size,
+        )
+    if stdout:
+        stdout.write(f"Rebuilt {len(section_days)} section attendance days")
+
+
+def split_range(start=None, end=None):
+    """
+    Split ``[start, end]`` (either may be None for open-ended) into the
+    ``(first, last)`` whole months it covers (month starts, None when
+    open-ended) or None, and the ``(start, end)`` day ranges of the partial
+    months at its edges, each within one month.
+    """
+    if start is None or start.day == 1:
+        first = start
+    else:
+        first = month_end(start) + timedelta(days=1)
+    if end is None or end == month_end(end):
+        last = end and month_start(end)
+    else:
+        last = month_start(month_start(end) - timedelta(days=1))
+    edges = []
+    if start is not None and start != first:
+        edges.append(
+            (start, month_end(start) if end is None else min(month_end(start), end))
+        )
+    if end is not None and end != month_end(end):
+        low = month_start(end) if start is None else max(month_start(end), start)
+        # Unless start and end are in the same month, already covered above
+        if not edges or low > edges[0][1]:
+            edges.append((low, end))
+    if first is not None and last is not None and first > last:
+        return None, edges
+    return (first, last), edges
+
+
+def attendance_statistics(filters, start=None, end=None):
+    """
+    Status counts per (student, section, subject) of the attendance
+    matching ``filters`` (a Q over the columns Attendance and
+    AttendanceRollup share) between ``start`` and ``end``, ordered by
+    student name.
+    """
+    keys = ("student_id", "section_id", "subject_id")
+    months, edges = split_range(start, end)
+    totals = {}
+
+    def add(key, counts):
+        total = totals.setdefault(key, dict.fromkeys(STATUSES, 0))
+        for status in STATUSES:
+            total[status] += counts[status] or 0
+
+    if months:
+        rollups = AttendanceRollup.objects.filter(filters)
+        if months[0]:
+            rollups = rollups.filter(month__gte=months[0])
+        if months[1]:
+            rollups = rollups.filter(month__lte=months[1])
+        for row in (
+            rollups.values(*keys)
+            .annotate(**{f"{status}_total": Sum(status) for status in STATUSES})
+            .order_by()
+        ):
+            add(
+                tuple(row[field] for field in keys),
+                {status: row[f"{status}_total"] for status in STATUSES},
+            )
+    if edges:
+        # Partial months: count the selected days of the packed statuses
+        masks = {
+            month_start(low): day_mask(month_start(low), low, high)
+            for low, high in edges
+        }
+        rows = list(
+            AttendanceRollup.objects.filter(filters, month__in=list(masks)).values_list(
+                *keys, "month", "days", "statuses"
+            )
+        )
+        counts = count_statuses(
+            [(days, statuses, masks[month]) for *_, month, days, statuses in rows]
+        )
+        for index, row in enumerate(rows):
+            if any(counts[status][index] for status in STATUSES):
+                add(row[:3], {status: counts[status][index] for status in STATUSES})
+    if not totals:
+        return []
+
+    students = dict(
+        User.objects.filter(pk__in={key[0] for key in totals}).values_list(
+            "pk", "first_name"
+        )
+    )
+    sections = dict(
+        Section.objects.filter(pk__in={key[1] for key in totals}).values_list(
+            "pk", "name"
+        )
+    )
+    subjects = dict(
+        Subject.objects.filter(pk__in={key[2] for key in totals}).values_list(
+            "pk", "name__name"
+        )
+    )
+    rows = [
+        {
+            "student_id": student_id,
+            "student_name": students.get(student_id),
+            "section_name": sections.get(section_id),
+            "subject_name": subjects.get(subject_id),
+            **{f"{status}_count": count for status, count in counts.items()},
+        }
+        for (student_id, section_id, subject_id), counts in totals.items()
+    ]
+    return sorted(
+        rows, key=lambda row: (row["student_name"] or "", str(row["student_id"]))
+    )
+
+
+def _rates(counts):
+    total = sum(counts.values())
+    attended = counts["present"] + counts["late"]
+    return {
+        **counts,
+        "total": total,
+        "rate": round(attended / total, 4) if total else None,
+    }
+
+
+def institution_overview(institution_id, today):
+    """
+    Today's and this week's (Monday to ``today``) attendance of an
+    institution per curriculum track and section, from SectionDayAttendance
+    in one query. ``rate`` is the share of present or late records.
+    """
+    week_start = today - timedelta(days=today.weekday())
+    sums = {}
+    for period, condition in (("today", Q(date=today)), ("week", Q())):
+        for status in STATUSES:
+            sums[f"{period}_{status}"] = Sum(status, filter=condition)
+    rows = (
+        SectionDayAttendance.objects.filter(
+            institution_id=institution_id, date__gte=week_start, date__lte=today
+        )
+        .values(
+            "section_id",
+            "section__name",
+            "section__curriculum_track_id",
+            "section__curriculum_track__name__name",
+        )
+        .annotate(**sums)
+        .order_by("section__curriculum_track__name__name", "section__name")
+    )
+    tracks = {}
+    for row in rows:
+        track = tracks.setdefault(
+            row["section__curriculum_track_id"],
+            {
+                "id": row["section__curriculum_track_id"],
+                "name": row["section__curriculum_track__name__name"],
+                "totals": {
+                    period: dict.fromkeys(STATUSES, 0) for period in ("today", "week")
+                },
+                "sections": [],
+            },
+        )
+        section = {"id": row["section_id"], "name": row["section__name"]}
+        for period in ("today", "week"):
+            counts = {status: row[f"{period}_{status}"] or 0 for status in STATUSES}
+            section[period] = _rates(counts)
+            for status, count in counts.items():
+                track["totals"][period][status] += count
+        track["sections"].append(section)
+    for track in tracks.values():
+        totals = track.pop("totals")
+        track["today"] = _rates(totals["today"])
+        track["week"] = _rates(totals["week"])
+    return {
+        "date": today,
+        "week_start": week_start,
+        "curriculum_tracks": list(tracks.values()),
+    }
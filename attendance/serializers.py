@@ -1,8 +1,8 @@
 import uuid
 from rest_framework import serializers
-from .models import Attendance
-from institution.models import InstitutionInfo, Section, Subject
-from user_management.models.authentication import User, ParentChildRelationship
+from .models import AbsenteeismFlag, Attendance
+from attendance.ingest import MAX_INGEST_ROWS
+from user_management.models.authentication import ParentChildRelationship
 from django.db.models import Q
 from datetime import date
 
@@ -82,12 +82,11 @@ class AttendanceSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class BulkAttendanceSerializer(serializers.Serializer):
-    institution = serializers.PrimaryKeyRelatedField(
-        queryset=InstitutionInfo.objects.all()
-    )
-    section = serializers.PrimaryKeyRelatedField(queryset=Section.objects.all())
-    subject = serializers.PrimaryKeyRelatedField(queryset=Subject.objects.all())
+class AttendanceRosterSerializer(serializers.Serializer):
+    """One day's statuses for a section and subject."""
+
+    section = serializers.UUIDField()
+    subject = serializers.UUIDField()
     date = serializers.DateField()
     attendances = serializers.ListField(
         child=serializers.DictField(
@@ -118,62 +117,102 @@ class BulkAttendanceSerializer(serializers.Serializer):
                 raise serializers.ValidationError(
                     f"Invalid UUID for student_id: {att['student_id']}."
                 )
+        student_ids = [uuid.UUID(att["student_id"]) for att in value]
+        if len(set(student_ids)) != len(student_ids):
+            raise serializers.ValidationError("Each student may appear only once.")
+        return value
+
+    def validate_date(self, value):
+        if value > date.today():
+            raise serializers.ValidationError(
+                "Cannot record attendance for a future date."
+            )
         return value
 
+
+class BulkAttendanceSerializer(AttendanceRosterSerializer):
+    # Plain ids: the teacher enrollment check below covers all three at once
+    institution = serializers.UUIDField()
+
     def validate(self, data):
         request = self.context.get("request")
         user = request.user
         institution = data.get("institution")
         section = data.get("section")
         subject = data.get("subject")
-        date = data.get("date")
 
-        # Teacher authorization
+        # Teacher of the institution, enrolled for this section and subject
         if (
             not user.is_teacher
-            or not user.memberships.filter(
-                institution=institution, role="teacher"
+            or not user.teacher_enrollments.filter(
+                institution_id=institution,
+                section=section,
+                subjects=subject,
+                is_active=True,
+                user__memberships__institution_id=institution,
+                user__memberships__role="teacher",
             ).exists()
         ):
             raise serializers.ValidationError(
                 {
-                    "non_field_errors": "You are not authorized to manage attendance for this institution."
+                    "non_field_errors": "You are not enrolled to teach this subject in this section."
                 }
             )
 
-        # Teacher enrollment
-        if not user.teacher_enrollments.filter(
-            institution=institution, section=section, subjects=subject, is_active=True
-        ).exists():
+        # Student enrollments are checked per row by upsert_attendance
+        return data
+
+
+class AttendanceIngestSerializer(serializers.Serializer):
+    """
+    An offline upload: rosters of any sections, subjects and days of one
+    institution, identified by a client-generated ``batch_id``.
+    """
+
+    batch_id = serializers.UUIDField()
+    institution = serializers.UUIDField()
+    rosters = AttendanceRosterSerializer(many=True, allow_empty=False)
+
+    def validate_rosters(self, value):
+        keys = [
+            (roster["section"], roster["subject"], roster["date"]) for roster in value
+        ]
+        if len(set(keys)) != len(keys):
             raise serializers.ValidationError(
-                {
-                    "non_field_errors": "You are not enrolled to teach this subject in this section."
-                }
+                "Each section, subject and date may appear only once."
             )
-
-        # Validate date
-        if date > date.today():
+        rows = sum(len(roster["attendances"]) for roster in value)
+        if rows > MAX_INGEST_ROWS:
             raise serializers.ValidationError(
-                {"date": "Cannot record attendance for a future date."}
+                f"At most {MAX_INGEST_ROWS} attendances per upload."
             )
+        return value
 
-        # Validate students
-        student_ids = [att["student_id"] for att in data["attendances"]]
-        valid_students = User.objects.filter(
-            id__in=student_ids,
-            is_student=True,
-            student_enrollments__institution=institution,
-            student_enrollments__section=section,
-            student_enrollments__is_active=True,
-        ).values_list("id", flat=True)
-        invalid_students = set(student_ids) - set(str(id) for id in valid_students)
-        if invalid_students:
+    def validate(self, data):
+        user = self.context["request"].user
+        # Every (section, subject) the teacher teaches here, in one query
+        taught = set()
+        if user.is_teacher:
+            taught = set(
+                user.teacher_enrollments.filter(
+                    institution_id=data["institution"],
+                    is_active=True,
+                    user__memberships__institution_id=data["institution"],
+                    user__memberships__role="teacher",
+                ).values_list("section", "subjects")
+            )
+        refused = [
+            index
+            for index, roster in enumerate(data["rosters"])
+            if (roster["section"], roster["subject"]) not in taught
+        ]
+        if refused:
             raise serializers.ValidationError(
                 {
-                    "attendances": f"Invalid or unenrolled student IDs: {', '.join(invalid_students)}"
+                    "rosters": "You are not enrolled to teach the subject in the "
+                    f"section of rosters {', '.join(map(str, refused))}."
                 }
             )
-
         return data
 
 
@@ -199,10 +238,10 @@ class StudentAttendanceSerializer(serializers.ModelSerializer):
 
 
 class AttendanceStatisticsSerializer(serializers.Serializer):
-    student_id = serializers.UUIDField(source="student__id")
-    student_name = serializers.CharField(source="student__first_name")
-    section_name = serializers.CharField(source="section__name", allow_null=True)
-    subject_name = serializers.CharField(source="subject__name", allow_null=True)
+    student_id = serializers.UUIDField()
+    student_name = serializers.CharField()
+    section_name = serializers.CharField(allow_null=True)
+    subject_name = serializers.CharField(allow_null=True)
     present_count = serializers.IntegerField()
     absent_count = serializers.IntegerField()
     late_count = serializers.IntegerField()
@@ -219,3 +258,25 @@ class AttendanceStatisticsSerializer(serializers.Serializer):
             "late_count",
             "excused_count",
         )
+
+
+class AbsenteeismFlagSerializer(serializers.ModelSerializer):
+    student_first_name = serializers.CharField(source="student.first_name")
+    student_last_name = serializers.CharField(source="student.last_name")
+    section_name = serializers.CharField(source="section.name")
+
+    class Meta:
+        model = AbsenteeismFlag
+        fields = (
+            "student",
+            "student_first_name",
+            "student_last_name",
+            "section",
+            "section_name",
+            "as_of",
+            "school_days",
+            "absent_days",
+            "absence_rate",
+            "longest_streak",
+        )
+        read_only_fields = fields
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_save, pre_save
+
+from attendance.models import Attendance
+from attendance.pending import forget_pending
+from attendance.rollups import refresh_rollups
+from attendance.tasks import notify_absences
+
+ROLLUP_KEY = ("student_id", "section_id", "subject_id", "date")
+
+
+def _key(instance):
+    return tuple(getattr(instance, field) for field in ROLLUP_KEY)
+
+
+def remember_rollup_key(sender, instance, **kwargs):
+    instance._rollup_key = (
+        None
+        if instance._state.adding
+        else Attendance.objects.filter(pk=instance.pk).values_list(*ROLLUP_KEY).first()
+    )
+
+
+def attendance_saved(sender, instance, created=False, **kwargs):
+    refresh_rollups([_key(instance)])
+    if created:
+        forget_pending([_key(instance)[1:]])
+    previous = getattr(instance, "_rollup_key", None)
+    if previous and previous != _key(instance):
+        refresh_rollups([previous], prune=True)
+    if instance.status == "absent":
+        notify_absences(instance.institution_id, instance.date, [instance.student_id])
+
+
+# No delete receiver: it would turn the cascades from sections, subjects,
+# students and institutions (whose rollups cascade too) into row-by-row
+# deletes. Code deleting attendance calls attendance.bulk.delete_attendance.
+pre_save.connect(remember_rollup_key, sender=Attendance)
+post_save.connect(attendance_saved, sender=Attendance)
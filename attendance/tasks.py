@@ -0,0 +1,74 @@
+import logging
+from datetime import date
+
+import redis
+from celery import shared_task
+from django.db import transaction
+
+from attendance import notifications
+from attendance.jobs import ChronicAbsenteeismJob
+from job_management.handlers import chunked
+from job_management.services import submit_job
+from user_management.utils.third_party_api import send_sms_batch
+
+logger = logging.getLogger("attendance")
+
+
+def notify_absences(institution_id, day, student_ids):
+    """Queue absence notifications for ``student_ids`` once the write commits."""
+    student_ids = sorted({str(student_id) for student_id in student_ids})
+    if not student_ids:
+        return
+
+    def queue():
+        try:
+            collect_absences.delay(str(institution_id), str(day), student_ids)
+        except Exception as e:
+            logger.error(f"Could not queue absence notifications: {str(e)}")
+
+    transaction.on_commit(queue)
+
+
+@shared_task(autoretry_for=(redis.RedisError,), retry_backoff=True, max_retries=3)
+def collect_absences(institution_id, day, student_ids):
+    if notifications.collect(institution_id, day, student_ids):
+        send_absence_notifications.apply_async(
+            (institution_id, day), countdown=notifications.ABSENCE_BATCH_WINDOW
+        )
+
+
+@shared_task(autoretry_for=(redis.RedisError,), retry_backoff=True, max_retries=3)
+def send_absence_notifications(institution_id, day):
+    student_ids = notifications.drain(institution_id, day)
+    if not student_ids:
+        return
+    day = date.fromisoformat(day)
+    absent = notifications.still_absent(institution_id, day, student_ids)
+    student_ids = notifications.claim(
+        day, [student_id for student_id in student_ids if student_id in absent]
+    )
+    messages = notifications.absence_messages(institution_id, day, student_ids)
+    for batch in chunked(messages, notifications.SMS_BATCH_SIZE):
+        send_absence_sms.delay(batch)
+    logger.info(
+        f"Queued {len(messages)} absence messages for {len(student_ids)} students "
+        f"of institution {institution_id} on {day}"
+    )
+
+
+@shared_task
+def send_absence_sms(messages):
+    result = send_sms_batch(messages)
+    if result["failed"]:
+        logger.error(
+            f"{result['failed']} of {len(messages)} absence messages failed: "
+            f"{result['errors']}"
+        )
+    return {"sent": result["sent"], "failed": result["failed"]}
+
+
+@shared_task
+def detect_chronic_absenteeism():
+    """Nightly: queue the ChronicAbsenteeismJob of today."""
+    job = submit_job(ChronicAbsenteeismJob.kind, None)
+    return str(job.id)
@@ -1,3 +1,1058 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import random
+import tempfile
+import uuid
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
 
-# Create your tests here.
+import fakeredis
+import openpyxl
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from attendance import absenteeism, ingest, packed
+from attendance.bulk import delete_attendance
+from attendance.models import (
+    AbsenteeismFlag,
+    Attendance,
+    AttendanceRollup,
+    SectionDayAttendance,
+)
+from attendance.rollups import rebuild_rollups, rebuild_section_days, split_range
+from attendance.tasks import detect_chronic_absenteeism
+from educational_management.celery import app as celery_app
+from institution.models import (
+    CurriculumTrack,
+    GlobalCurriculumTrack,
+    GlobalStream,
+    GlobalSubject,
+    InstitutionInfo,
+    Section,
+    Stream,
+    StudentEnrollment,
+    Subject,
+    TeacherEnrollment,
+)
+from institution.validation import validate_batch
+from job_management.models import Job
+from user_management.models import (
+    InstitutionMembership,
+    ParentChildRelationship,
+    User,
+)
+from user_management.utils.third_party_api import sms_metrics
+
+
+class AttendanceFixture(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email="admin@example.com", password="pass12345", is_institution=True
+        )
+        self.teacher = User.objects.create_user(
+            email="teacher@example.com", password="pass12345", is_teacher=True
+        )
+        self.institution = InstitutionInfo.objects.create(
+            name="Test School", admin=self.admin
+        )
+        self.track = CurriculumTrack.objects.create(
+            institution_info=self.institution,
+            name=GlobalCurriculumTrack.objects.create(name="Class 9"),
+        )
+        self.section = Section.objects.create(
+            curriculum_track=self.track, name="Section A"
+        )
+        other_section = Section.objects.create(
+            curriculum_track=self.track, name="Section B"
+        )
+        physics = GlobalSubject.objects.create(name="Physics")
+        self.subject = Subject.objects.create(
+            stream=Stream.objects.create(
+                curriculum_track=self.track,
+                section=self.section,
+                name=GlobalStream.objects.create(name="Science"),
+            ),
+            name=physics,
+        )
+        self.other_subject = Subject.objects.create(
+            stream=Stream.objects.create(
+                curriculum_track=self.track,
+                section=other_section,
+                name=GlobalStream.objects.create(name="Arts"),
+            ),
+            name=physics,
+        )
+        self.students = []
+        for index in range(3):
+            student = User.objects.create_user(
+                email=f"student{index}@example.com",
+                password="pass12345",
+                is_student=True,
+            )
+            StudentEnrollment.objects.create(
+                institution=self.institution,
+                user=student,
+                curriculum_track=self.track,
+                section=self.section,
+            )
+            self.students.append(student)
+        self.outsider = User.objects.create_user(
+            email="outsider@example.com", password="pass12345", is_student=True
+        )
+        InstitutionMembership.objects.create(
+            user=self.teacher, institution=self.institution, role="teacher"
+        )
+        enrollment = TeacherEnrollment.objects.create(
+            institution=self.institution, user=self.teacher
+        )
+        enrollment.curriculum_track.add(self.track)
+        enrollment.section.add(self.section)
+        enrollment.subjects.add(self.subject, self.other_subject)
+
+    def record(self, day, status_="present", student=None):
+        return Attendance.objects.create(
+            institution=self.institution,
+            student=student or self.students[0],
+            section=self.section,
+            subject=self.subject,
+            date=day,
+            status=status_,
+        )
+
+
+class AttendanceBatchValidationTests(AttendanceFixture):
+    def attendance(self, student, subject=None):
+        return Attendance(
+            institution=self.institution,
+            student=student,
+            section=self.section,
+            subject=subject or self.subject,
+            date=date.today(),
+        )
+
+    def test_validate_batch_reports_rows_in_constant_queries(self):
+        rows = [self.attendance(student) for student in self.students]
+        rows.append(self.attendance(self.outsider))
+        rows.append(self.attendance(self.students[0], self.other_subject))
+        with self.assertNumQueries(2):
+            errors = validate_batch(rows)
+        self.assertEqual(
+            errors,
+            [
+                {"index": 3, "errors": ["Student is not enrolled in this section."]},
+                {"index": 4, "errors": ["Subject does not belong to this section."]},
+            ],
+        )
+
+    def test_clean_uses_the_same_rules(self):
+        self.attendance(self.students[0]).clean()
+        with self.assertRaisesMessage(Exception, "not enrolled"):
+            self.attendance(self.outsider).clean()
+
+    def test_bulk_endpoint_returns_per_row_errors(self):
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        payload = {
+            "institution": str(self.institution.pk),
+            "section": str(self.section.pk),
+            "date": date.today().isoformat(),
+            "attendances": [
+                {"student_id": str(student.pk), "status": "present"}
+                for student in self.students
+            ],
+        }
+        url = reverse("attendance:attendance-bulk-create")
+
+        response = client.post(
+            url, {**payload, "subject": str(self.other_subject.pk)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data["attendances"]), 3)
+        self.assertFalse(Attendance.objects.exists())
+
+        response = client.post(
+            url, {**payload, "subject": str(self.subject.pk)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(Attendance.objects.count(), 3)
+
+    def test_bulk_endpoint_upserts_a_roster_in_constant_queries(self):
+        for index in range(3, 60):
+            student = User.objects.create_user(
+                email=f"student{index}@example.com", is_student=True
+            )
+            StudentEnrollment.objects.create(
+                institution=self.institution,
+                user=student,
+                curriculum_track=self.track,
+                section=self.section,
+            )
+            self.students.append(student)
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        url = reverse("attendance:attendance-bulk-create")
+
+        def post(statuses):
+            return client.post(
+                url,
+                {
+                    "institution": str(self.institution.pk),
+                    "section": str(self.section.pk),
+                    "subject": str(self.subject.pk),
+                    "date": date.today().isoformat(),
+                    "attendances": [
+                        {"student_id": str(student.pk), "status": status_}
+                        for student, status_ in zip(self.students, statuses)
+                    ],
+                },
+                format="json",
+            )
+
+        # Auth check, validation (2), current statuses, upsert, rollups,
+        # section day counts
+        with self.assertNumQueries(7):
+            response = post(["present"] * 60)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(
+            {row["result"] for row in response.data["results"]}, {"created"}
+        )
+
+        # Posting the day again corrects it instead of failing
+        response = post(["absent", "present"])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(
+            [row["result"] for row in response.data["results"]],
+            ["updated", "unchanged"],
+        )
+        self.assertEqual(Attendance.objects.count(), 60)
+        self.assertEqual(
+            Attendance.objects.get(student=self.students[0]).status, "absent"
+        )
+        rollup = AttendanceRollup.objects.get(student=self.students[0])
+        self.assertEqual((rollup.present, rollup.absent), (0, 1))
+        self.assertEqual(AttendanceRollup.objects.count(), 60)
+
+        duplicate = client.post(
+            url,
+            {
+                "institution": str(self.institution.pk),
+                "section": str(self.section.pk),
+                "subject": str(self.subject.pk),
+                "date": date.today().isoformat(),
+                "attendances": [
+                    {"student_id": str(self.students[0].pk), "status": "present"}
+                ]
+                * 2,
+            },
+            format="json",
+        )
+        self.assertEqual(duplicate.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AttendanceRollupTests(AttendanceFixture):
+    def rollups(self):
+        return {
+            (rollup.student_id, rollup.month): (
+                rollup.present,
+                rollup.absent,
+                rollup.late,
+                rollup.excused,
+            )
+            for rollup in AttendanceRollup.objects.all()
+        }
+
+    def test_single_writes_keep_rollups_in_step(self):
+        student = self.students[0].pk
+        first = self.record(date(2026, 1, 5))
+        self.record(date(2026, 1, 6), "late")
+        self.assertEqual(self.rollups(), {(student, date(2026, 1, 1)): (1, 0, 1, 0)})
+
+        first.status = "absent"
+        first.date = date(2026, 2, 2)
+        first.save()
+        self.assertEqual(
+            self.rollups(),
+            {
+                (student, date(2026, 1, 1)): (0, 0, 1, 0),
+                (student, date(2026, 2, 1)): (0, 1, 0, 0),
+            },
+        )
+        delete_attendance(Attendance.objects.filter(pk=first.pk))
+        self.assertEqual(self.rollups(), {(student, date(2026, 1, 1)): (0, 0, 1, 0)})
+
+        AttendanceRollup.objects.all().delete()
+        rebuild_rollups()
+        self.assertEqual(self.rollups(), {(student, date(2026, 1, 1)): (0, 0, 1, 0)})
+
+    def test_cascaded_deletes_do_not_grow_with_attendance_rows(self):
+        queries = []
+        for student, days in ((self.students[0], 3), (self.students[1], 6)):
+            for day in range(1, days + 1):
+                self.record(date(2026, 1, day), student=student)
+            with CaptureQueriesContext(connection) as captured:
+                with self.captureOnCommitCallbacks(execute=True):
+                    student.delete()
+            queries.append(len(captured))
+        self.assertEqual(queries[0], queries[1])
+        self.assertFalse(AttendanceRollup.objects.exists())
+
+    def test_destroy_recounts_the_rollups(self):
+        first = self.record(date(2026, 1, 5))
+        self.record(date(2026, 1, 6), "late")
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.delete(
+                reverse("attendance:attendance-detail", args=[first.pk])
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            self.rollups(), {(self.students[0].pk, date(2026, 1, 1)): (0, 0, 1, 0)}
+        )
+
+    def test_split_range_unpacks_days_only_at_partial_edges(self):
+        self.assertEqual(
+            split_range(date(2026, 1, 20), date(2026, 4, 10)),
+            (
+                (date(2026, 2, 1), date(2026, 3, 1)),
+                [
+                    (date(2026, 1, 20), date(2026, 1, 31)),
+                    (date(2026, 4, 1), date(2026, 4, 10)),
+                ],
+            ),
+        )
+        self.assertEqual(
+            split_range(date(2026, 2, 1), date(2026, 2, 28)),
+            ((date(2026, 2, 1), date(2026, 2, 1)), []),
+        )
+        self.assertEqual(
+            split_range(date(2026, 1, 20), date(2026, 2, 10)),
+            (
+                None,
+                [
+                    (date(2026, 1, 20), date(2026, 1, 31)),
+                    (date(2026, 2, 1), date(2026, 2, 10)),
+                ],
+            ),
+        )
+        self.assertEqual(
+            split_range(None, date(2026, 2, 10))[0], (None, date(2026, 1, 1))
+        )
+        self.assertEqual(split_range(date(2026, 1, 20))[0], (date(2026, 2, 1), None))
+
+    def test_statistics_match_the_raw_rows(self):
+        days = [date(2026, 1, day) for day in (10, 25)] + [
+            date(2026, 2, day) for day in (3, 4, 5)
+        ]
+        for index, day in enumerate(days):
+            self.record(day, "absent" if index % 2 else "present")
+        self.record(date(2026, 3, 15), student=self.students[1])
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+
+        response = client.get(
+            reverse("attendance:attendance-statistics"),
+            {"start_date": "2026-01-20", "end_date": "2026-03-10"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(len(response.data), 1)
+        row = response.data[0]
+        self.assertEqual(row["student_id"], str(self.students[0].pk))
+        self.assertEqual(row["subject_name"], "Physics")
+        # Jan 25 (absent) from January's packed statuses, February from
+        # the rollup counts
+        self.assertEqual((row["present_count"], row["absent_count"]), (2, 2))
+
+        response = client.get(
+            reverse("attendance:attendance-statistics"), {"start_date": "2026-02"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PackedAttendanceTests(AttendanceFixture):
+    def naive_counts(self, months):
+        counts = {name: [] for name in packed.STATUS_CODES}
+        for days, statuses, mask in months:
+            decoded = packed.decode_month(days & mask, statuses)
+            for name in counts:
+                counts[name].append(list(decoded.values()).count(name))
+        return counts
+
+    def random_months(self, count):
+        generator = random.Random(7)
+        months = []
+        for _ in range(count):
+            month = {
+                day: generator.choice(list(packed.STATUS_CODES))
+                for day in range(1, 32)
+                if generator.random() < 0.8
+            }
+            self.assertEqual(packed.decode_month(*packed.encode_month(month)), month)
+            days, statuses = packed.encode_month(month)
+            low = generator.randint(1, 31)
+            high = generator.randint(low, 31)
+            months.append(
+                (
+                    days,
+                    statuses,
+                    packed.day_mask(
+                        date(2026, 1, 1), date(2026, 1, low), date(2026, 1, high)
+                    ),
+                )
+            )
+        return months
+
+    def test_counting_matches_decoding(self):
+        months = self.random_months(200)
+        with patch.object(packed, "np", None):
+            self.assertEqual(packed.count_statuses(months), self.naive_counts(months))
+
+    def test_numpy_counting_matches_decoding(self):
+        months = self.random_months(200)
+        self.assertEqual(packed.count_statuses(months), self.naive_counts(months))
+
+    def test_rollups_pack_the_days_written(self):
+        self.record(date(2026, 1, 1), "late")
+        self.record(date(2026, 1, 31), "excused")
+        with self.captureOnCommitCallbacks(execute=True):
+            absent = self.record(date(2026, 1, 2), "absent")
+            delete_attendance(Attendance.objects.filter(pk=absent.pk))
+        rollup = AttendanceRollup.objects.get()
+        self.assertEqual(
+            packed.decode_month(rollup.days, rollup.statuses),
+            {1: "late", 31: "excused"},
+        )
+
+    def test_packed_list_matches_the_rows(self):
+        for index, day in enumerate([date(2026, 1, 5), date(2026, 2, 7)]):
+            for student in self.students:
+                self.record(day, ["present", "absent"][index], student)
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        url = reverse("attendance:attendance-list")
+        for params in ({}, {"date": "2026-02-07"}):
+            rows = client.get(url, params).data
+            packed_rows = client.get(url, {**params, "source": "packed"}).data
+            self.assertEqual(
+                sorted(
+                    (row["student"], row["date"], row["status"], row["subject_name"])
+                    for row in packed_rows
+                ),
+                sorted(
+                    (row["student"], row["date"], row["status"], row["subject_name"])
+                    for row in rows
+                ),
+            )
+            self.assertTrue(packed_rows)
+
+    def test_calendar_is_one_query_over_the_packed_months(self):
+        self.record(date(2026, 2, 1), "absent", self.students[1])
+        self.record(date(2026, 2, 3), "late", self.students[1])
+        self.record(date(2026, 2, 3), "present", self.students[2])
+        self.record(date(2026, 3, 3), "present", self.students[2])
+        for student, name in zip(self.students, ["Zed", "Ann", "Bob"]):
+            student.first_name = name
+            student.save()
+
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        url = reverse("attendance:attendance-calendar")
+        params = {
+            "section_id": str(self.section.pk),
+            "subject_id": str(self.subject.pk),
+            "month": "2026-02",
+        }
+        # Authorization, then the roster with its packed months
+        with self.assertNumQueries(2):
+            response = client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        data = response.data
+        self.assertEqual(data["days"], 28)
+        self.assertEqual(
+            [student["id"] for student in data["students"]],
+            [str(student.pk) for student in self.students[1:] + self.students[:1]],
+        )
+        self.assertEqual([row[:4] for row in data["matrix"]], ["A.L.", "..P.", "...."])
+        self.assertEqual(data["day_totals"]["late"][2], 1)
+        self.assertEqual(data["day_totals"]["present"][:3], [0, 0, 1])
+        self.assertEqual(data["student_totals"]["absent"], [1, 0, 0])
+
+        outsider = User.objects.create_user(email="t2@example.com", is_teacher=True)
+        client.force_authenticate(outsider)
+        self.assertEqual(client.get(url, params).status_code, status.HTTP_403_FORBIDDEN)
+        client.force_authenticate(self.admin)
+        response = client.get(url, {**params, "month": "2026-3"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["matrix"][1][:3], "..P")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class AttendanceExportTests(AttendanceFixture):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.url = reverse("attendance:attendance-export")
+        for index, student in enumerate(self.students):
+            self.record(date(2026, 1, 30), "present", student)
+            self.record(date(2026, 2, 2), ["absent", "late", "present"][index], student)
+        Attendance.objects.create(
+            institution=self.institution,
+            student=self.students[0],
+            section=self.section,
+            subject=self.other_subject,
+            date=date(2026, 2, 3),
+            status="excused",
+        )
+
+    def test_csv_is_streamed_in_the_users_scope(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(
+            self.url, {"start_date": "2026-01-01", "end_date": "2026-02-28"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn(
+            "attendance_20260101_20260228.csv", response["Content-Disposition"]
+        )
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual(rows[0][0], "Date")
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[1][0], "2026-01-30")
+        self.assertEqual(rows[-1][-1], "excused")
+
+        # Students export only their own rows
+        InstitutionMembership.objects.create(
+            user=self.students[1], institution=self.institution, role="student"
+        )
+        self.client.force_authenticate(self.students[1])
+        response = self.client.get(
+            self.url, {"start_date": "2026-02-01", "end_date": "2026-02-28"}
+        )
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual([row[-1] for row in rows[1:]], ["late"])
+
+    def test_xlsx_export_and_range_checks(self):
+        self.client.force_authenticate(self.teacher)
+        params = {
+            "start_date": "2026-02-01",
+            "end_date": "2026-02-28",
+            "subject_id": str(self.subject.pk),
+            "type": "xlsx",
+        }
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sheet = openpyxl.load_workbook(
+            io.BytesIO(b"".join(response.streaming_content))
+        ).active
+        statuses = [row[-1] for row in sheet.iter_rows(min_row=2, values_only=True)]
+        self.assertEqual(sorted(statuses), ["absent", "late", "present"])
+
+        response = self.client.get(self.url, {**params, "end_date": "2026-12-31"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("end_date", response.data)
+        params["section_id"] = str(self.section.pk)
+        response = self.client.get(self.url, {**params, "end_date": "2026-12-31"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.url, {**params, "type": "pdf"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_rejects_invalid_ids(self):
+        params = {"start_date": "2026-02-01", "end_date": "2026-02-28"}
+        for user, names in (
+            (self.admin, ("institution_id", "section_id", "subject_id")),
+            (self.teacher, ("section_id", "subject_id", "student_id")),
+        ):
+            self.client.force_authenticate(user)
+            for param in names:
+                response = self.client.get(self.url, {**params, param: "nope"})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn(param, response.data)
+        response = self.client.get(
+            reverse("attendance:attendance-list"), {"section_id": "nope"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_background_export_joins_one_part_per_month(self):
+        redis_patch = patch(
+            "job_management.progress.redis_client",
+            fakeredis.FakeRedis(decode_responses=True),
+        )
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+        self.client.force_authenticate(self.teacher)
+        params = {"start_date": "2025-09-01", "end_date": "2026-06-30"}
+        response = self.client.post(self.url, params, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(
+            self.url, {**params, "institution_id": "not-a-uuid"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("institution_id", response.data)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, params, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+        job = Job.objects.get(pk=response.data["id"])
+        self.assertEqual(job.status, Job.Status.COMPLETED, job.error)
+        self.assertEqual(job.institution_id, self.institution.pk)
+        self.assertEqual(job.total_chunks, 10)
+        self.assertEqual(job.result, {"rows": 7})
+        with job.artifact.open("rb") as artifact:
+            rows = list(csv.reader(io.TextIOWrapper(artifact, encoding="utf-8")))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(
+            [row[0] for row in rows[1:]],
+            ["2026-01-30"] * 3 + ["2026-02-02"] * 3 + ["2026-02-03"],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url, {**params, "type": "xlsx"}, format="json"
+            )
+        job = Job.objects.get(pk=response.data["id"])
+        with job.artifact.open("rb") as artifact:
+            sheet = openpyxl.load_workbook(artifact).active
+            self.assertEqual(sheet.max_row, 8)
+            self.assertEqual(sheet["A2"].value.date(), date(2026, 1, 30))
+
+
+class AbsenceNotificationTests(AttendanceFixture):
+    def setUp(self):
+        super().setUp()
+        fake_redis = fakeredis.FakeRedis(decode_responses=True)
+        for target in (
+            "attendance.notifications.redis_client",
+            "user_management.utils.third_party_api.redis_client",
+        ):
+            redis_patch = patch(target, fake_redis)
+            redis_patch.start()
+            self.addCleanup(redis_patch.stop)
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+        self.session = Mock()
+        self.session.post.return_value.json.return_value = {"status": "Success"}
+        session_patch = patch(
+            "user_management.utils.third_party_api.sms_session",
+            return_value=self.session,
+        )
+        session_patch.start()
+        self.addCleanup(session_patch.stop)
+
+        self.students[0].first_name = "Nadia"
+        self.students[0].save()
+        parent = User.objects.create_user(phone_number="01711111111", is_parents=True)
+        unreachable = User.objects.create_user(phone_number="12345", is_parents=True)
+        for child, parent_ in (
+            (self.students[0], parent),
+            (self.students[1], parent),
+            (self.students[2], unreachable),
+        ):
+            ParentChildRelationship.objects.create(parent=parent_, child=child)
+
+    def test_absences_are_batched_deduplicated_and_measured(self):
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        payload = {
+            "institution": str(self.institution.pk),
+            "section": str(self.section.pk),
+            "subject": str(self.subject.pk),
+            "date": "2026-03-02",
+            "attendances": [
+                {"student_id": str(student.pk), "status": "absent"}
+                for student in self.students
+            ],
+        }
+        url = reverse("attendance:attendance-bulk-create")
+        # Nothing is sent before the roster commits
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.session.post.assert_not_called()
+        for callback in callbacks:
+            callback()
+
+        # One message per parent and child; the malformed number fails
+        self.assertEqual(self.session.post.call_count, 2)
+        messages = [call.kwargs["json"] for call in self.session.post.call_args_list]
+        self.assertEqual(
+            {message["MobileNumber"] for message in messages}, {"8801711111111"}
+        )
+        self.assertIn(
+            "Nadia was absent from Test School on 02 Mar 2026",
+            messages[0]["Message"] + messages[1]["Message"],
+        )
+        metrics = sms_metrics()
+        self.assertEqual(
+            (metrics["batches"], metrics["sent"], metrics["failed"]), (1, 2, 1)
+        )
+        self.assertEqual(metrics["failure_rate"], 0.333)
+
+        # Absent again that day, in another subject: already notified
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(
+                institution=self.institution,
+                student=self.students[0],
+                section=self.section,
+                subject=self.other_subject,
+                date=date(2026, 3, 2),
+                status="absent",
+            )
+        self.assertEqual(self.session.post.call_count, 2)
+
+
+class AttendanceIngestTests(AttendanceFixture):
+    def setUp(self):
+        super().setUp()
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        redis_patch = patch("attendance.ingest.redis_client", self.redis)
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+        self.url = reverse("attendance:attendance-ingest")
+
+    def upload(self, days, student=None, batch_id=None, section=None):
+        return {
+            "batch_id": batch_id or str(uuid.uuid4()),
+            "institution": str(self.institution.pk),
+            "rosters": [
+                {
+                    "section": section or str(self.section.pk),
+                    "subject": str(self.subject.pk),
+                    "date": day,
+                    "attendances": [
+                        {"student_id": str(student.pk), "status": "present"}
+                        for student in ([student] if student else self.students)
+                    ],
+                }
+                for day in days
+            ],
+        }
+
+    def test_retries_replay_the_stored_outcome(self):
+        payload = self.upload(["2026-03-02", "2026-03-03"])
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(Attendance.objects.count(), 6)
+        self.assertEqual(
+            [roster["date"] for roster in response.data["rosters"]],
+            ["2026-03-02", "2026-03-03"],
+        )
+        self.assertEqual(
+            {row["result"] for row in response.data["rosters"][1]["results"]},
+            {"created"},
+        )
+
+        # The retry touches neither the database nor the rows
+        with self.assertNumQueries(0):
+            retry = self.client.post(self.url, payload, format="json")
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.data, response.data)
+
+        reused = self.client.post(
+            self.url, {**payload, "rosters": payload["rosters"][:1]}, format="json"
+        )
+        self.assertEqual(reused.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        # A new batch id is a new upload: the same rows are now unchanged
+        response = self.client.post(
+            self.url, {**payload, "batch_id": str(uuid.uuid4())}, format="json"
+        )
+        self.assertEqual(
+            {row["result"] for row in response.data["rosters"][0]["results"]},
+            {"unchanged"},
+        )
+
+    def test_row_errors_are_stored_and_malformed_uploads_are_not(self):
+        payload = self.upload(["2026-03-02"], student=self.outsider)
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["rosters"][0]["roster"], 0)
+        self.assertEqual(
+            response.data["rosters"][0]["student_id"], str(self.outsider.pk)
+        )
+        retry = self.client.post(self.url, payload, format="json")
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertFalse(Attendance.objects.exists())
+
+        batch_id = str(uuid.uuid4())
+        refused = self.upload(
+            ["2026-03-02"], batch_id=batch_id, section=str(uuid.uuid4())
+        )
+        response = self.client.post(self.url, refused, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("rosters", response.data)
+        self.assertFalse(self.redis.keys("attendance:ingest:*" + batch_id))
+        response = self.client.post(
+            self.url, self.upload(["2026-03-02"], batch_id=batch_id), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_concurrent_retry_waits_for_the_first_attempt(self):
+        payload = self.upload(["2026-03-02"])
+        self.redis.set(
+            f"attendance:ingest:{self.teacher.id}:{payload['batch_id']}",
+            json.dumps({"fingerprint": ingest.fingerprint(payload)}),
+        )
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Attendance.objects.exists())
+
+
+class ChronicAbsenteeismTests(AttendanceFixture):
+    def setUp(self):
+        super().setUp()
+        redis_patch = patch(
+            "job_management.progress.redis_client",
+            fakeredis.FakeRedis(decode_responses=True),
+        )
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+        # The last 12 weekdays; students[0] misses one subject once,
+        # students[1] six days in a row and students[2] two separate days
+        days = []
+        day = date.today()
+        while len(days) < 12:
+            if day.weekday() < 5:
+                days.insert(0, day)
+            day -= timedelta(days=1)
+        absences = {1: set(days[3:9]), 2: {days[1], days[7]}}
+        rows = [
+            self.row(
+                student,
+                self.subject,
+                day,
+                "absent" if day in absences.get(index, ()) else "present",
+            )
+            for index, student in enumerate(self.students)
+            for day in days
+        ]
+        # Late still attends; absent from one subject only is not a day off
+        rows[0].status = "late"
+        rows.append(self.row(self.students[0], self.other_subject, days[5], "absent"))
+        Attendance.objects.bulk_create(rows)
+        self.days = days
+
+    def row(self, student, subject, day, status_):
+        return Attendance(
+            institution=self.institution,
+            student=student,
+            section=self.section,
+            subject=subject,
+            date=day,
+            status=status_,
+        )
+
+    def test_absence_stats_are_bit_counts_and_runs(self):
+        recorded = [0b111111111111, 0b111111111111, 0b1111]
+        absent = [0b000111111000, 0b010000000010, 0]
+        if packed.np is not None:
+            recorded = packed.np.array(recorded, dtype=packed.np.uint64)
+            absent = packed.np.array(absent, dtype=packed.np.uint64)
+        self.assertEqual(
+            absenteeism.absence_stats(recorded, absent),
+            ([12, 12, 4], [6, 2, 0], [6, 1, 0]),
+        )
+
+    def test_nightly_job_flags_students_for_the_dashboard(self):
+        # Left from a section without attendance since
+        stale = AbsenteeismFlag.objects.create(
+            institution=self.institution,
+            student=self.students[0],
+            section=Section.objects.create(
+                curriculum_track=self.track, name="Section C"
+            ),
+            as_of=date(2020, 1, 1),
+            school_days=10,
+            absent_days=5,
+            absence_rate=0.5,
+            longest_streak=5,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            detect_chronic_absenteeism.delay()
+        job = Job.objects.get(kind="chronic_absenteeism")
+        self.assertEqual(job.status, Job.Status.COMPLETED, job.error)
+        self.assertIsNone(job.created_by)
+        self.assertEqual(
+            job.result, {"sections": 1, "students": 3, "flagged": 2, "cleared": 1}
+        )
+        self.assertFalse(AbsenteeismFlag.objects.filter(pk=stale.pk).exists())
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get(reverse("attendance:attendance-absenteeism"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (flag["student"], flag["absent_days"], flag["longest_streak"])
+                for flag in response.data
+            ],
+            [(self.students[1].pk, 6, 6), (self.students[2].pk, 2, 1)],
+        )
+        self.assertEqual(response.data[1]["absence_rate"], round(2 / 12, 4))
+        client.force_authenticate(self.teacher)
+        self.assertEqual(
+            client.get(reverse("attendance:attendance-absenteeism")).data, []
+        )
+
+    def test_numpy_and_integer_paths_agree(self):
+        as_of = self.days[-1]
+        vectorized = absenteeism.absence_stats(
+            *absenteeism.section_arrays(self.section.pk, as_of)[1:]
+        )
+        with patch("attendance.absenteeism.np", None):
+            plain = absenteeism.absence_stats(
+                *absenteeism.section_arrays(self.section.pk, as_of)[1:]
+            )
+        self.assertEqual(vectorized, plain)
+
+
+class PendingAttendanceTests(AttendanceFixture):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+        self.url = reverse("attendance:attendance-pending")
+
+    def test_pending_pairs_are_cached_until_attendance_is_taken(self):
+        # other_subject is taught in another section: not an assignment
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (pair["section_id"], pair["subject_id"])
+                for pair in response.data["pending"]
+            ],
+            [(self.section.pk, self.subject.pk)],
+        )
+        self.assertEqual(response.data["pending"][0]["subject_name"], "Physics")
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        # Yesterday's roster leaves today pending
+        yesterday = timezone.localdate() - timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record(yesterday)
+        self.assertEqual(len(self.client.get(self.url).data["pending"]), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("attendance:attendance-bulk-create"),
+                {
+                    "institution": str(self.institution.pk),
+                    "section": str(self.section.pk),
+                    "subject": str(self.subject.pk),
+                    "date": timezone.localdate().isoformat(),
+                    "attendances": [
+                        {"student_id": str(student.pk), "status": "present"}
+                        for student in self.students
+                    ],
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.get(self.url).data["pending"], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_attendance(Attendance.objects.filter(date=timezone.localdate()))
+        self.assertEqual(len(self.client.get(self.url).data["pending"]), 1)
+
+        self.client.force_authenticate(self.students[0])
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class InstitutionDashboardTests(AttendanceFixture):
+    def section_days(self):
+        return {
+            (day.section_id, day.date): (day.present, day.absent, day.late)
+            for day in SectionDayAttendance.objects.all()
+        }
+
+    def test_writes_keep_section_days_in_step(self):
+        first = self.record(date(2026, 3, 2))
+        self.record(date(2026, 3, 2), "absent", self.students[1])
+        key = (self.section.pk, date(2026, 3, 2))
+        self.assertEqual(self.section_days(), {key: (1, 1, 0)})
+        first.status = "late"
+        first.save()
+        self.assertEqual(self.section_days(), {key: (0, 1, 1)})
+        delete_attendance(Attendance.objects.all())
+        self.assertEqual(self.section_days(), {})
+
+        self.record(date(2026, 3, 3))
+        SectionDayAttendance.objects.all().delete()
+        rebuild_section_days()
+        self.assertEqual(
+            self.section_days(), {(self.section.pk, date(2026, 3, 3)): (1, 0, 0)}
+        )
+
+    def test_dashboard_reads_rates_per_track_and_section(self):
+        today = timezone.localdate()
+        for student, status_ in zip(self.students, ["present", "present", "absent"]):
+            self.record(today, status_, student)
+        Attendance.objects.create(
+            institution=self.institution,
+            student=self.students[0],
+            section=self.section,
+            subject=self.other_subject,
+            date=today,
+            status="late",
+        )
+        # Last week: neither today nor this week
+        self.record(today - timedelta(days=today.weekday() + 1), "absent")
+        senior = Section.objects.create(
+            curriculum_track=CurriculumTrack.objects.create(
+                institution_info=self.institution,
+                name=GlobalCurriculumTrack.objects.create(name="Class 10"),
+            ),
+            name="Section A",
+        )
+        Attendance.objects.create(
+            institution=self.institution,
+            student=self.students[1],
+            section=senior,
+            subject=self.subject,
+            date=today,
+            status="present",
+        )
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = reverse("attendance:attendance-dashboard")
+        # The admin's institution, then the section days
+        with self.assertNumQueries(2):
+            response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tracks = response.data["curriculum_tracks"]
+        self.assertEqual([track["name"] for track in tracks], ["Class 10", "Class 9"])
+        junior = tracks[1]
+        self.assertEqual(junior["today"]["rate"], 0.75)
+        self.assertEqual(junior["week"]["total"], 4)
+        self.assertEqual(junior["sections"][0]["id"], self.section.pk)
+        self.assertEqual(junior["sections"][0]["today"]["absent"], 1)
+        self.assertEqual(tracks[0]["today"]["rate"], 1.0)
+
+        client.force_authenticate(self.teacher)
+        self.assertEqual(client.get(url).status_code, status.HTTP_403_FORBIDDEN)
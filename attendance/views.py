@@ -2,10 +2,27 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
 from django.utils import timezone
-from attendance.models import Attendance
+from attendance import ingest as ingestion
+from attendance.bulk import delete_attendance, upsert_attendance, upsert_rows
+from attendance.export import (
+    CONTENT_TYPES,
+    FILE_TYPES,
+    MAX_STREAMED_DAYS,
+    export_filename,
+    export_rows,
+    stream_csv,
+    write_xlsx,
+)
+from attendance.jobs import AttendanceExportJob
+from attendance.models import AbsenteeismFlag, Attendance
+from attendance.packed import read_packed, section_calendar
+from attendance.pending import get_pending
+from attendance.rollups import attendance_statistics, institution_overview
 from attendance.serializers import (
+    AbsenteeismFlagSerializer,
+    AttendanceIngestSerializer,
     AttendanceSerializer,
     AttendanceStatisticsSerializer,
     BulkAttendanceSerializer,
@@ -16,9 +33,14 @@ from user_management.models.authentication import (
     ParentChildRelationship,
 )
 from institution.models import InstitutionInfo
+from job_management.serializers import JobSerializer
+from job_management.services import submit_job
 from rest_framework.exceptions import ValidationError
-from django.db.models import Count, Q
+from django.db.models import Q
+import datetime
 import logging
+import tempfile
+import uuid
 
 logger = logging.getLogger("attendance")
 
@@ -28,15 +50,18 @@ class AttendanceViewSet(viewsets.ModelViewSet):
     serializer_class = AttendanceSerializer
     permission_classes = [IsAuthenticated]
 
-    def get_queryset(self):
+    def scope_filters(self):
+        """
+        Q selecting the attendance the user may see and asked for, over the
+        columns Attendance and AttendanceRollup share (no date).
+        """
         user = self.request.user
-        queryset = super().get_queryset()
 
         # Filter by institution
         institution_ids = InstitutionMembership.objects.filter(user=user).values_list(
             "institution_id", flat=True
         )
-        queryset = queryset.filter(institution__in=institution_ids)
+        filters = Q(institution__in=institution_ids)
 
         # Role-based filtering
         if user.is_teacher:
@@ -49,40 +74,54 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             enrolled_subjects = user.teacher_enrollments.filter(
                 is_active=True
             ).values_list("subjects__id", flat=True)
-            queryset = queryset.filter(
+            filters &= Q(
                 section__id__in=enrolled_sections, subject__id__in=enrolled_subjects
             )
         elif user.is_student:
             # Students see only their own attendance
-            queryset = queryset.filter(student=user)
+            filters &= Q(student=user)
         elif user.is_parents:
             # Parents see attendance of their children
             child_ids = ParentChildRelationship.objects.filter(parent=user).values_list(
                 "child_id", flat=True
             )
-            queryset = queryset.filter(student__id__in=child_ids)
+            filters &= Q(student__id__in=child_ids)
         else:
             # Non-teachers, non-students, non-parents see nothing
-            queryset = queryset.none()
+            filters &= Q(pk__in=[])
 
         # Apply filters from query params
-        date = self.request.query_params.get("date")
-        section_id = self.request.query_params.get("section_id")
-        subject_id = self.request.query_params.get("subject_id")
-        student_id = self.request.query_params.get("student_id")
+        section_id = self.query_uuid("section_id")
+        subject_id = self.query_uuid("subject_id")
+        student_id = self.query_uuid("student_id")
 
-        if date:
-            try:
-                queryset = queryset.filter(date=date)
-            except ValueError:
-                raise ValidationError({"date": "Invalid date format. Use YYYY-MM-DD."})
         if section_id:
-            queryset = queryset.filter(section__id=section_id)
+            filters &= Q(section__id=section_id)
         if subject_id:
-            queryset = queryset.filter(subject__id=subject_id)
+            filters &= Q(subject__id=subject_id)
         if student_id and (user.is_teacher or user.is_parents):
-            queryset = queryset.filter(student__id=student_id)
+            filters &= Q(student__id=student_id)
+        return filters
+
+    def query_uuid(self, param):
+        value = self.request.query_params.get(param)
+        try:
+            return uuid.UUID(value) if value else None
+        except ValueError:
+            raise ValidationError({param: "Invalid UUID."})
 
+    def query_date(self):
+        date = self.request.query_params.get("date")
+        try:
+            return datetime.date.fromisoformat(date) if date else None
+        except ValueError:
+            raise ValidationError({"date": "Invalid date format. Use YYYY-MM-DD."})
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(self.scope_filters())
+        date = self.query_date()
+        if date:
+            queryset = queryset.filter(date=date)
         return queryset.order_by("-date")
 
     def get_serializer_class(self):
@@ -109,40 +148,144 @@ class AttendanceViewSet(viewsets.ModelViewSet):
                 )
         serializer.save()
 
+    def perform_destroy(self, instance):
+        delete_attendance(Attendance.objects.filter(pk=instance.pk))
+
     @action(detail=False, methods=["post"], url_path="bulk")
     def bulk_create(self, request):
+        """
+        Record or correct a day's roster for one section and subject:
+        {"institution", "section", "subject", "date", "attendances":
+        [{"student_id", "status"}]}. Returns the result of each student.
+        """
         serializer = BulkAttendanceSerializer(
             data=request.data, context={"request": request}
         )
-        if serializer.is_valid():
-            try:
-                with transaction.atomic():
-                    attendances = []
-                    for att in serializer.validated_data["attendances"]:
-                        attendance = Attendance(
-                            institution=serializer.validated_data["institution"],
-                            student_id=att["student_id"],
-                            section=serializer.validated_data["section"],
-                            subject=serializer.validated_data["subject"],
-                            date=serializer.validated_data["date"],
-                            status=att["status"],
-                            created_by=request.user,
-                        )
-                        attendance.clean()
-                        attendances.append(attendance)
-                    Attendance.objects.bulk_create(attendances, ignore_conflicts=False)
-                logger.info(f"Bulk attendance created by user {request.user.id}")
-                return Response(
-                    {"message": "Bulk attendance recorded successfully"},
-                    status=status.HTTP_201_CREATED,
-                )
-            except Exception as e:
-                logger.error(f"Bulk attendance creation error: {str(e)}")
-                raise ValidationError(str(e))
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        results, errors = upsert_attendance(
+            data["institution"],
+            data["section"],
+            data["subject"],
+            data["date"],
+            data["attendances"],
+            request.user,
+        )
+        if errors:
+            return Response({"attendances": errors}, status=status.HTTP_400_BAD_REQUEST)
+        logger.info(f"Bulk attendance recorded by user {request.user.id}")
+        return Response(
+            {
+                "message": "Bulk attendance recorded successfully",
+                "results": results,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["post"], url_path="ingest")
+    def ingest(self, request):
+        """
+        Upload rosters taken offline, over any sections, subjects and days:
+        {"batch_id", "institution", "rosters": [{"section", "subject",
+        "date", "attendances": [{"student_id", "status"}]}]}. ``batch_id``
+        is generated by the client and reused on retries, which get the
+        original response back (with an Idempotent-Replayed header).
+        """
+        try:
+            batch_id = uuid.UUID(str(request.data.get("batch_id", "")))
+        except ValueError:
+            raise ValidationError({"batch_id": "A client-generated UUID is required."})
+        user = request.user
+        digest = ingestion.fingerprint(request.data)
+        state, outcome = ingestion.begin(user.id, batch_id, digest)
+        if state == ingestion.REPLAY:
+            return Response(
+                outcome["data"],
+                status=outcome["status"],
+                headers={"Idempotent-Replayed": "true"},
+            )
+        if state == ingestion.IN_PROGRESS:
+            return Response(
+                {"detail": "This upload is still being processed, retry shortly."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if state == ingestion.MISMATCH:
+            return Response(
+                {"batch_id": "This batch id was used for a different upload."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        try:
+            serializer = AttendanceIngestSerializer(
+                data=request.data, context={"request": request}
+            )
+            serializer.is_valid(raise_exception=True)
+            data = serializer.validated_data
+            rows = []
+            positions = []
+            for roster_index, roster in enumerate(data["rosters"]):
+                for index, row in enumerate(roster["attendances"]):
+                    rows.append(
+                        {
+                            "student_id": row["student_id"],
+                            "section_id": roster["section"],
+                            "subject_id": roster["subject"],
+                            "date": roster["date"],
+                            "status": row["status"],
+                        }
+                    )
+                    positions.append((roster_index, index))
+            results, errors = upsert_rows(data["institution"], rows, user)
+        except Exception:
+            # Malformed or failed uploads are not stored: the retry runs again
+            ingestion.release(user.id, batch_id)
+            raise
+
+        if errors:
+            response_status = status.HTTP_400_BAD_REQUEST
+            response_data = {
+                "rosters": [
+                    {
+                        "roster": positions[error["index"]][0],
+                        "index": positions[error["index"]][1],
+                        "student_id": error["student_id"],
+                        "errors": error["errors"],
+                    }
+                    for error in errors
+                ]
+            }
+        else:
+            response_status = status.HTTP_201_CREATED
+            rosters = [
+                {
+                    "section": str(roster["section"]),
+                    "subject": str(roster["subject"]),
+                    "date": roster["date"].isoformat(),
+                    "results": [],
+                }
+                for roster in data["rosters"]
+            ]
+            for (roster_index, _), result in zip(positions, results):
+                rosters[roster_index]["results"].append(result)
+            response_data = {
+                "message": "Attendance uploaded successfully",
+                "batch_id": str(batch_id),
+                "rosters": rosters,
+            }
+            logger.info(
+                f"Offline attendance batch {batch_id} ({len(rows)} rows) "
+                f"uploaded by user {user.id}"
+            )
+        ingestion.finish(user.id, batch_id, digest, response_status, response_data)
+        return Response(response_data, status=response_status)
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        if request.query_params.get("source") == "packed":
+            # Same rows, decoded from the bit-packed monthly rollups
+            date = self.query_date()
+            queryset = read_packed(self.scope_filters(), date, date)
+        else:
+            queryset = self.get_queryset()
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -155,16 +298,207 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["get"], url_path="pending")
+    def pending(self, request):
+        """
+        The teacher's (section, subject) assignments with no attendance
+        recorded yet today.
+        """
+        if not request.user.is_teacher:
+            return Response(
+                {"detail": "Only teachers have attendance to take."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        today = timezone.localdate()
+        return Response({"date": today, "pending": get_pending(request.user.id, today)})
+
+    @action(detail=False, methods=["get"], url_path="calendar")
+    def calendar(self, request):
+        """
+        A section's attendance in one subject for a month as a students x
+        days matrix with per-day and per-student totals:
+        ?section_id=&subject_id=&month=YYYY-MM.
+        """
+        user = request.user
+        params = {}
+        for param in ("section_id", "subject_id"):
+            try:
+                params[param] = uuid.UUID(request.query_params.get(param, ""))
+            except ValueError:
+                raise ValidationError({param: "A valid UUID is required."})
+        try:
+            month = datetime.datetime.strptime(
+                request.query_params.get("month", ""), "%Y-%m"
+            ).date()
+        except ValueError:
+            raise ValidationError({"month": "Invalid month format. Use YYYY-MM."})
+
+        if user.is_teacher:
+            allowed = user.teacher_enrollments.filter(
+                section=params["section_id"],
+                subjects=params["subject_id"],
+                is_active=True,
+            ).exists()
+        else:
+            allowed = InstitutionInfo.objects.filter(
+                admin=user,
+                institution_curriculum_tracks__sections=params["section_id"],
+            ).exists()
+        if not allowed:
+            return Response(
+                {"detail": "You are not authorized to view this section."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(
+            section_calendar(params["section_id"], params["subject_id"], month)
+        )
+
+    @action(detail=False, methods=["get", "post"], url_path="export")
+    def export(self, request):
+        """
+        GET streams the attendance between start_date and end_date as a
+        ``type=csv`` or ``type=xlsx`` file, optionally for one section_id
+        and subject_id. Institution admins export their institution (or
+        institution_id), everyone else what the list endpoint shows them.
+        Admins POST the same parameters to export in the background; that
+        is required for ranges over MAX_STREAMED_DAYS without a section.
+        """
+        params = request.data if request.method == "POST" else request.query_params
+        if request.method == "POST":
+            institution_id = params.get("institution_id") or (
+                InstitutionInfo.objects.filter(admin=request.user)
+                .values_list("pk", flat=True)
+                .first()
+            )
+            job = submit_job(
+                AttendanceExportJob.kind,
+                request.user,
+                params={
+                    "institution_id": institution_id,
+                    "start_date": params.get("start_date"),
+                    "end_date": params.get("end_date"),
+                    "section_id": params.get("section_id"),
+                    "subject_id": params.get("subject_id"),
+                    "file_type": params.get("type"),
+                },
+            )
+            return Response(
+                JobSerializer(job, context={"request": request}).data,
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        # "format" is taken by DRF's content negotiation
+        file_type = params.get("type", "csv")
+        if file_type not in FILE_TYPES:
+            raise ValidationError({"type": "Use csv or xlsx."})
+        dates = {}
+        for param in ("start_date", "end_date"):
+            try:
+                dates[param] = datetime.date.fromisoformat(params.get(param, ""))
+            except ValueError:
+                raise ValidationError({param: "A YYYY-MM-DD date is required."})
+        start, end = dates["start_date"], dates["end_date"]
+        if start > end:
+            raise ValidationError({"end_date": "Must not be before start_date."})
+
+        user = request.user
+        if user.is_teacher or user.is_student or user.is_parents:
+            filters = self.scope_filters()
+        else:
+            filters = Q(institution__admin=user)
+            for param in ("institution_id", "section_id", "subject_id"):
+                value = self.query_uuid(param)
+                if value:
+                    filters &= Q(**{param: value})
+        if not params.get("section_id") and (end - start).days >= MAX_STREAMED_DAYS:
+            raise ValidationError(
+                {
+                    "end_date": f"Export at most {MAX_STREAMED_DAYS} days without a "
+                    "section_id, or POST the same parameters to export in the "
+                    "background."
+                }
+            )
+
+        rows = export_rows(filters, start, end)
+        filename = export_filename(start, end, file_type)
+        if file_type == "csv":
+            response = StreamingHttpResponse(
+                stream_csv(rows), content_type=CONTENT_TYPES["csv"]
+            )
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+        # A workbook is only readable once complete: spool it, then stream it
+        workbook = tempfile.TemporaryFile()
+        write_xlsx(rows, workbook)
+        workbook.seek(0)
+        return FileResponse(
+            workbook,
+            as_attachment=True,
+            filename=filename,
+            content_type=CONTENT_TYPES["xlsx"],
+        )
+
+    @action(detail=False, methods=["get"], url_path="absenteeism")
+    def absenteeism(self, request):
+        """
+        Students flagged as chronically absent by the nightly run, highest
+        absence rate first, for the institutions the user administers:
+        ?institution_id=&section_id= narrow them down.
+        """
+        flags = AbsenteeismFlag.objects.filter(institution__admin=request.user)
+        for param in ("institution_id", "section_id"):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    flags = flags.filter(**{param: uuid.UUID(value)})
+                except ValueError:
+                    raise ValidationError({param: "Invalid UUID."})
+        flags = flags.select_related("student", "section").order_by(
+            "-absence_rate", "-longest_streak", "student_id"
+        )
+        return Response(AbsenteeismFlagSerializer(flags, many=True).data)
+
+    @action(detail=False, methods=["get"], url_path="dashboard")
+    def dashboard(self, request):
+        """
+        Institution admins' overview: today's and this week's attendance
+        rates per curriculum track and section (?institution_id= when
+        administering several).
+        """
+        institutions = InstitutionInfo.objects.filter(admin=request.user)
+        institution_id = request.query_params.get("institution_id")
+        if institution_id:
+            try:
+                institutions = institutions.filter(pk=uuid.UUID(institution_id))
+            except ValueError:
+                raise ValidationError({"institution_id": "Invalid UUID."})
+        institution = institutions.values_list("pk", flat=True).first()
+        if institution is None:
+            return Response(
+                {"detail": "You are not the admin of an institution."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(
+            {
+                "institution": institution,
+                **institution_overview(institution, timezone.localdate()),
+            }
+        )
+
     @action(detail=False, methods=["get"], url_path="statistics")
     def statistics(self, request):
+        """
+        Status counts per student, section and subject. Whole months come
+        from the monthly rollup counts, partial months at the edges of the
+        start_date/end_date range from the rollups' packed day statuses.
+        """
         user = request.user
-        queryset = Attendance.objects.all()
 
         # Filter by institution
         institution_ids = InstitutionMembership.objects.filter(user=user).values_list(
             "institution_id", flat=True
         )
-        queryset = queryset.filter(institution__in=institution_ids)
+        filters = Q(institution__in=institution_ids)
 
         # Role-based filtering
         if user.is_teacher:
@@ -174,11 +508,11 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             enrolled_subjects = user.teacher_enrollments.filter(
                 is_active=True
             ).values_list("subjects__id", flat=True)
-            queryset = queryset.filter(
-                section__id__in=enrolled_sections, subject__id__in=enrolled_subjects
+            filters &= Q(
+                section_id__in=enrolled_sections, subject_id__in=enrolled_subjects
             )
         elif user.is_student:
-            queryset = queryset.filter(student=user)
+            filters &= Q(student=user)
         else:
             return Response(
                 {"detail": "You are not authorized to view attendance statistics."},
@@ -186,45 +520,24 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             )
 
         # Apply filters from query params
-        start_date = request.query_params.get("start_date")
-        end_date = request.query_params.get("end_date")
+        dates = {}
+        for param in ("start_date", "end_date"):
+            value = request.query_params.get(param)
+            try:
+                dates[param] = datetime.date.fromisoformat(value) if value else None
+            except ValueError:
+                raise ValidationError({param: "Invalid date format. Use YYYY-MM-DD."})
         section_id = request.query_params.get("section_id")
         subject_id = request.query_params.get("subject_id")
         student_id = request.query_params.get("student_id")
 
-        if start_date:
-            try:
-                queryset = queryset.filter(date__gte=start_date)
-            except ValueError:
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-        if end_date:
-            try:
-                queryset = queryset.filter(date__lte=end_date)
-            except ValueError:
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
         if section_id:
-            queryset = queryset.filter(section__id=section_id)
+            filters &= Q(section_id=section_id)
         if subject_id:
-            queryset = queryset.filter(subject__id=subject_id)
+            filters &= Q(subject_id=subject_id)
         if student_id and user.is_teacher:
-            queryset = queryset.filter(student__id=student_id)
-
-        # Aggregate statistics
-        stats = (
-            queryset.values(
-                "student__id",
-                "student__first_name",
-                "section__name",
-                "subject__name",
-            )
-            .annotate(
-                present_count=Count("id", filter=Q(status="present")),
-                absent_count=Count("id", filter=Q(status="absent")),
-                late_count=Count("id", filter=Q(status="late")),
-                excused_count=Count("id", filter=Q(status="excused")),
-            )
-            .order_by("student__first_name")
-        )
+            filters &= Q(student_id=student_id)
 
+        stats = attendance_statistics(filters, dates["start_date"], dates["end_date"])
         serializer = AttendanceStatisticsSerializer(stats, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
@@ -13,6 +13,10 @@ app.conf.beat_schedule = {
         "task": "user_management.tasks.example_task",
         "schedule": crontab(minute="*/1"),
     },
+    "detect-chronic-absenteeism": {
+        "task": "attendance.tasks.detect_chronic_absenteeism",
+        "schedule": crontab(hour=1, minute=30),  # Nightly, Asia/Dhaka
+    },
 }
 
 
@@ -0,0 +1,114 @@
+"""
+Database connection lifecycle instrumentation.
+
+Works for both connection strategies configured in settings.DATABASES:
+- psycopg pool (OPTIONS["pool"]): checkout wait time, saturation and churn are
+  read from the pool's own counters.
+- persistent connections (CONN_MAX_AGE): churn is counted from Django's
+  ``connection_created`` signal, there is no checkout queue to measure.
+"""
+
+import logging
+import threading
+import time
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("educational_management")
+
+_lock = threading.Lock()
+_connections_opened = {}
+_started_at = time.monotonic()
+
+
+def _count_connection(sender, connection, **kwargs):
+    with _lock:
+        _connections_opened[connection.alias] = (
+            _connections_opened.get(connection.alias, 0) + 1
+        )
+    logger.debug(f"New database connection opened for alias '{connection.alias}'")
+
+
+connection_created.connect(_count_connection, dispatch_uid="db_connection_churn")
+
+
+def get_pool(alias="default"):
+    """Return the psycopg pool behind ``alias`` or None when pooling is off."""
+    return getattr(connections[alias], "pool", None)
+
+
+def connection_stats(alias="default"):
+    """
+    Snapshot of the connection lifecycle counters for ``alias`` in this process.
+    """
+    connection = connections[alias]
+    uptime = max(time.monotonic() - _started_at, 1e-6)
+    with _lock:
+        opened = _connections_opened.get(alias, 0)
+
+    stats = {
+        "alias": alias,
+        "vendor": connection.vendor,
+        "mode": "persistent",
+        "conn_max_age": connection.settings_dict.get("CONN_MAX_AGE", 0),
+        "health_checks": connection.settings_dict.get("CONN_HEALTH_CHECKS", False),
+        "connections_opened": opened,
+        "connections_opened_per_minute": round(opened / uptime * 60, 3),
+    }
+
+    pool = get_pool(alias)
+    if pool is None:
+        return stats
+
+    raw = pool.get_stats()
+    requests_num = raw.get("requests_num", 0)
+    requests_queued = raw.get("requests_queued", 0)
+    pool_max = raw.get("pool_max", 0) or 1
+    # The pool is opened lazily on first checkout; until then its size
+    # counter already reports min_size although no connection exists.
+    pool_size = 0 if pool.closed else raw.get("pool_size", 0)
+    in_use = pool_size - raw.get("pool_available", 0)
+    stats.update(
+        {
+            "mode": "pool",
+            "pool_open": not pool.closed,
+            "pool_min": raw.get("pool_min", 0),
+            "pool_max": raw.get("pool_max", 0),
+            "pool_size": pool_size,
+            "pool_available": raw.get("pool_available", 0),
+            "connections_in_use": in_use,
+            "saturation": round(in_use / pool_max, 3),
+            "requests_waiting": raw.get("requests_waiting", 0),
+            "checkouts": requests_num,
+            "checkouts_queued": requests_queued,
+            "checkout_errors": raw.get("requests_errors", 0),
+            "checkout_wait_ms_total": raw.get("requests_wait_ms", 0),
+            "checkout_wait_ms_avg": (
+                round(raw.get("requests_wait_ms", 0) / requests_num, 3)
+                if requests_num
+                else 0.0
+            ),
+            "connections_created": raw.get("connections_num", 0),
+            "connection_setup_ms_total": raw.get("connections_ms", 0),
+            "connection_errors": raw.get("connections_errors", 0),
+            "connections_lost": raw.get("connections_lost", 0),
+            "returns_bad": raw.get("returns_bad", 0),
+        }
+    )
+    return stats
+
+
+def check_database(alias="default"):
+    """
+    Run a trivial query on ``alias`` and return (ok, latency_ms).
+    """
+    started = time.perf_counter()
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except Exception as e:
+        logger.error(f"Database health check failed for alias '{alias}': {str(e)}")
+        return False, round((time.perf_counter() - started) * 1000, 3)
+    return True, round((time.perf_counter() - started) * 1000, 3)
@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "drf_yasg",
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
     "exam",
     "result",
     "scholarship",
+    "job_management.apps.JobManagementConfig",
 ]
 
 MIDDLEWARE = [
@@ -102,6 +104,11 @@ if USE_SQLITE:
         }
     }
 else:
+    # Connection reuse. With DB_POOL_ENABLED each process keeps a psycopg pool
+    # (Django does not allow CONN_MAX_AGE together with pooling); otherwise
+    # connections are kept alive for DB_CONN_MAX_AGE seconds. Either way
+    # CONN_HEALTH_CHECKS makes Django/psycopg verify a connection before reuse.
+    DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", "True") == "True"
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.postgresql",
@@ -110,6 +117,25 @@ else:
             "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
             "HOST": "db",
             "PORT": "5432",
+            "CONN_MAX_AGE": (
+                0 if DB_POOL_ENABLED else int(os.getenv("DB_CONN_MAX_AGE", 60))
+            ),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": (
+                {
+                    "pool": {
+                        "name": "default",
+                        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+                        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 8)),
+                        # Seconds a request may wait for a free connection
+                        "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+                        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 300)),
+                        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+                    }
+                }
+                if DB_POOL_ENABLED
+                else {}
+            ),
         }
     }
 
@@ -259,6 +285,16 @@ LOGGING = {
             "level": "DEBUG",  # Changed from INFO
             "propagate": False,
         },
+        "educational_management": {
+            "handlers": ["file", "console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "job_management": {
+            "handlers": ["file", "console"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
 
@@ -6,8 +6,11 @@ from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.static import static
 from educational_management.swagger import schema_view
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_GET
+from rest_framework.decorators import api_view, permission_classes
+from educational_management.db import check_database, connection_stats
+from user_management.utils.third_party_api import sms_metrics
 
 
 @require_GET
@@ -15,9 +18,28 @@ def health_check(request):
     return HttpResponse("OK", status=200)
 
 
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def db_health_check(request):
+    """Liveness for everyone; latency and pool metrics for staff only."""
+    ok, latency_ms = check_database()
+    data = {"ok": ok}
+    if request.user.is_staff:
+        data.update(latency_ms=latency_ms, **connection_stats())
+    return JsonResponse(data, status=200 if ok else 503)
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def sms_health_check(request):
+    return JsonResponse(sms_metrics())
+
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("health/", health_check), #For docker compose and nginx health check
+    path("health/db/", db_health_check),  # Connection pool / churn metrics (staff)
+    path("health/sms/", sms_health_check),  # SMS throughput / failure metrics (staff)
     path("auth/", include("user_management.urls.authentication")),
     path("auth/", include("user_management.urls.admission_seeker")),
     path("bkash/", include("payment_management.urls.bkash")),
@@ -31,6 +53,7 @@ urlpatterns = [
     path("homework/", include("homework.urls")),
     path("exam/", include("exam.urls")),
     path("result/", include("result.urls")),
+    path("jobs/", include("job_management.urls")),
     path(
         "swagger/",
         schema_view.with_ui("swagger", cache_timeout=0),
@@ -0,0 +1,69 @@
+# Generated by Django 5.2 on 2026-10-19 01:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exam", "0003_time_ordered_uuid_pk"),
+        ("institution", "0006_academicsession"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedExamMark",
+            fields=[
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "id",
+                    models.UUIDField(editable=False, primary_key=True, serialize=False),
+                ),
+                ("marks_obtained", models.FloatField()),
+                ("remarks", models.TextField(blank=True, null=True)),
+                (
+                    "exam",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="exam.exam",
+                    ),
+                ),
+                (
+                    "session",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="institution.academicsession",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Exam Mark",
+                "verbose_name_plural": "Archived Exam Marks",
+                "indexes": [
+                    models.Index(fields=["session"], name="exammark_arch_0_idx"),
+                    models.Index(
+                        fields=["session", "student"], name="exammark_arch_1_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
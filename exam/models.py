@@ -1,7 +1,15 @@
 from django.db import models
 from uuid import uuid4
 from django.conf import settings
-from institution.models import CurriculumTrack, Section, Subject, StudentEnrollment
+from institution.models import (
+    CurriculumTrack,
+    Section,
+    Subject,
+    StudentEnrollment,
+    uuid7,
+)
+from institution.archive import archive_model
+from institution.validation import BatchValidationMixin, lookup
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
@@ -22,7 +30,7 @@ class ExamType(models.TextChoices):
     OTHER = "other", "Other"
 
 
-class Exam(CommonFields):
+class Exam(BatchValidationMixin, CommonFields):
     curriculum_track = models.ForeignKey(
         CurriculumTrack,
         on_delete=models.CASCADE,
@@ -64,25 +72,37 @@ class Exam(CommonFields):
     def __str__(self):
         return f"{self.title} - {self.subject} ({self.exam_date})"
 
-    def clean(self):
-        if self.section.curriculum_track != self.curriculum_track:
+    @classmethod
+    def build_validation_context(cls, instances):
+        return {
+            "section_tracks": lookup(
+                Section, instances, "section_id", "curriculum_track_id"
+            ),
+            "subject_tracks": lookup(
+                Subject, instances, "subject_id", "stream__curriculum_track_id"
+            ),
+        }
+
+    def clean_with_context(self, context):
+        if context["section_tracks"].get(self.section_id) != self.curriculum_track_id:
             raise ValidationError(
                 "Section must belong to the specified curriculum track."
             )
-        try:
-            if self.subject.stream.curriculum_track != self.curriculum_track:
-                raise ValidationError(
-                    "Subject does not belong to the specified curriculum track."
-                )
-        except AttributeError:
+        subject_track_id = context["subject_tracks"].get(self.subject_id)
+        if subject_track_id is None:
             raise ValidationError(
                 "Unable to validate subject-curriculum track relationship."
             )
+        if subject_track_id != self.curriculum_track_id:
+            raise ValidationError(
+                "Subject does not belong to the specified curriculum track."
+            )
         if self.exam_date > timezone.now().date():
             raise ValidationError("Exam date cannot be in the future.")
 
 
-class ExamMark(CommonFields):
+class ExamMark(BatchValidationMixin, CommonFields):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     exam = models.ForeignKey(
         Exam,
         on_delete=models.CASCADE,
@@ -107,20 +127,40 @@ class ExamMark(CommonFields):
     def __str__(self):
         return f"{self.student} - {self.exam} ({self.marks_obtained})"
 
-    def clean(self):
-        if self.marks_obtained > self.exam.total_marks:
+    @classmethod
+    def build_validation_context(cls, instances):
+        exams = lookup(
+            Exam,
+            instances,
+            "exam_id",
+            "total_marks",
+            "curriculum_track_id",
+            "section_id",
+        )
+        enrollments = StudentEnrollment.objects.filter(
+            user_id__in={mark.student_id for mark in instances},
+            section_id__in={section_id for _, _, section_id in exams.values()},
+            is_active=True,
+        ).values_list("user_id", "curriculum_track_id", "section_id")
+        return {"exams": exams, "enrollments": set(enrollments)}
+
+    def clean_with_context(self, context):
+        if self.exam_id not in context["exams"]:
+            raise ValidationError("Exam does not exist.")
+        total_marks, curriculum_track_id, section_id = context["exams"][self.exam_id]
+        if self.marks_obtained > total_marks:
             raise ValidationError(
-                f"Marks obtained cannot exceed total marks ({self.exam.total_marks})."
+                f"Marks obtained cannot exceed total marks ({total_marks})."
             )
         if self.marks_obtained < 0:
             raise ValidationError("Marks obtained cannot be negative.")
         # Validate student enrollment
-        if not StudentEnrollment.objects.filter(
-            user=self.student,
-            curriculum_track=self.exam.curriculum_track,
-            section=self.exam.section,
-            is_active=True,
-        ).exists():
+        if (self.student_id, curriculum_track_id, section_id) not in context[
+            "enrollments"
+        ]:
             raise ValidationError(
                 "Student is not enrolled in the specified curriculum track and section."
             )
+
+
+ArchivedExamMark = archive_model(ExamMark, indexes=[["student"]])
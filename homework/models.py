@@ -1,6 +1,13 @@
 from django.db import models
 from uuid import uuid4
-from institution.models import InstitutionInfo, CurriculumTrack, Section, Subject
+from institution.models import (
+    InstitutionInfo,
+    CurriculumTrack,
+    Section,
+    Subject,
+    uuid7,
+)
+from institution.archive import archive_model
 from django.contrib.auth import get_user_model
 from django.core.validators import FileExtensionValidator
 
@@ -51,7 +58,7 @@ class Homework(models.Model):
 
 
 class HomeworkSubmission(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     homework = models.ForeignKey(
         Homework, on_delete=models.CASCADE, related_name="submissions"
     )
@@ -75,3 +82,6 @@ class HomeworkSubmission(models.Model):
 
     def __str__(self):
         return f"{self.student} - {self.homework} ({'Submitted' if self.submitted else 'Not Submitted'})"
+
+
+ArchivedHomeworkSubmission = archive_model(HomeworkSubmission, indexes=[["student"]])
@@ -126,6 +126,12 @@ class StudentEnrollmentAdmin(admin.ModelAdmin):
     list_filter = ("institution", "section", "is_active")
 
 
+@admin.register(AcademicSession)
+class AcademicSessionAdmin(admin.ModelAdmin):
+    list_display = ("name", "institution", "start_date", "end_date", "is_current")
+    list_filter = ("institution", "is_current")
+
+
 @admin.register(InstitutionFee)
 class InstitutionFeeAdmin(admin.ModelAdmin):
     list_display = (
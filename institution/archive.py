@@ -0,0 +1,99 @@
+"""
+Archive tables for rows of closed academic sessions.
+
+``archive_model(Model)`` declares ``ArchivedModel``: the same columns as
+``Model`` plus the ``session`` the rows belong to, without the foreign key
+constraints, unique constraints and indexes of the hot table (only the
+``indexes`` given). ``move_to_archive`` copies rows over with INSERT ...
+SELECT and deletes them from the hot table, batch by batch, so the hot
+tables and their indexes only hold the current session.
+"""
+
+from django.db import connection, models, transaction
+
+ARCHIVE_BATCH_SIZE = 2000
+
+
+def _archive_field(field):
+    if field.is_relation:
+        return models.ForeignKey(
+            field.remote_field.model,
+            on_delete=models.DO_NOTHING,
+            related_name="+",
+            db_constraint=False,
+            db_index=False,
+            null=field.null,
+        )
+    _, _, args, kwargs = field.deconstruct()
+    for option in ("auto_now", "auto_now_add", "default", "unique", "db_index"):
+        kwargs.pop(option, None)
+    return field.__class__(*args, **kwargs)
+
+
+def archive_model(model, indexes=()):
+    """Declare the archive model of ``model``; call it in the app's models.py."""
+    name = f"Archived{model.__name__}"
+    attrs = {field.name: _archive_field(field) for field in model._meta.concrete_fields}
+    attrs["session"] = models.ForeignKey(
+        "institution.AcademicSession",
+        on_delete=models.PROTECT,
+        related_name="+",
+        db_index=False,
+    )
+    attrs["__module__"] = model.__module__
+    attrs["Meta"] = type(
+        "Meta",
+        (),
+        {
+            "verbose_name": f"Archived {model._meta.verbose_name}",
+            "verbose_name_plural": f"Archived {model._meta.verbose_name_plural}",
+            "indexes": [
+                models.Index(
+                    fields=["session", *fields],
+                    name=f"{model._meta.model_name[:14]}_arch_{index}_idx",
+                )
+                for index, fields in enumerate([(), *indexes])
+            ],
+        },
+    )
+    return type(name, (models.Model,), attrs)
+
+
+def move_to_archive(
+    queryset, archive, session, batch_size=ARCHIVE_BATCH_SIZE, on_batch=None
+):
+    """
+    Move the rows of ``queryset`` to ``archive`` under ``session``. Each
+    batch is copied and deleted in one transaction, so an interrupted move
+    can simply be run again. ``on_batch`` is called with the primary keys
+    of each batch, in that transaction once they are in ``archive``, to
+    update what the skipped delete signals would have. Returns the number
+    of rows moved.
+    """
+    model = queryset.model
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(field.column) for field in model._meta.concrete_fields)
+    pk = model._meta.pk
+    session_id = session._meta.pk.get_db_prep_value(session.pk, connection)
+    moved = 0
+    while True:
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return moved
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote(archive._meta.db_table)} ({columns}, "
+                f"{quote('session_id')}) SELECT {columns}, %s "
+                f"FROM {quote(model._meta.db_table)} "
+                f"WHERE {quote(pk.column)} IN ({', '.join(['%s'] * len(pks))})",
+                [
+                    session_id,
+                    *(pk.get_db_prep_value(value, connection) for value in pks),
+                ],
+            )
+            # Moved, not deleted: no delete signals or cascades (dependent
+            # rows are archived first, the foreign keys catch any left)
+            model._base_manager.filter(pk__in=pks)._raw_delete(connection.alias)
+            if on_batch:
+                on_batch(pks)
+        moved += len(pks)
@@ -0,0 +1,174 @@
+"""
+Ranked search over the Global* catalog, for the curriculum builder's
+autocomplete.
+
+Every query term is matched as a prefix ("mot" finds "Motion"). On
+PostgreSQL the match uses expression GIN indexes on the same to_tsvector()
+expressions the queries build, plus pg_trgm indexes on the titles for
+typo-tolerant word similarity when that extension can be installed. On
+SQLite (development) an FTS5 table kept in sync by triggers is queried
+instead. The indexes, table and triggers are created by migration 0005.
+"""
+
+import re
+from functools import lru_cache
+from uuid import UUID
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast
+
+from institution.models import (
+    GlobalLesson,
+    GlobalMicroLesson,
+    GlobalModule,
+    GlobalSubject,
+    GlobalUnit,
+)
+
+SEARCH_CONFIG = "simple"
+FTS_TABLE = "institution_catalogsearch"
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+# Kind -> (model, title field, other searched fields)
+SEARCH_KINDS = {
+    "subject": (GlobalSubject, "name", ("code",)),
+    "module": (GlobalModule, "title", ()),
+    "unit": (GlobalUnit, "title", ()),
+    "lesson": (GlobalLesson, "title", ("content",)),
+    "micro_lesson": (GlobalMicroLesson, "title", ()),
+}
+
+
+def search_vector(kind):
+    """
+    Weighted document of a kind; the GIN indexes of migration 0005 are built
+    on this exact expression, so keep the two in step.
+    """
+    _, title, others = SEARCH_KINDS[kind]
+    vector = SearchVector(title, config=SEARCH_CONFIG, weight="A")
+    for field in others:
+        # Codes rank like titles, long text below them
+        weight = "A" if field == "code" else "B"
+        vector += SearchVector(field, config=SEARCH_CONFIG, weight=weight)
+    return vector
+
+
+def search_terms(text):
+    return re.findall(r"\w+", text.lower())[:10]
+
+
+@lru_cache(maxsize=None)
+def has_trigram():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def _postgres_search(terms, text, kinds, institution_type, limit):
+    query = SearchQuery(
+        " & ".join(f"{term}:*" for term in terms),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+    trigram = has_trigram()
+    querysets = []
+    for kind in kinds:
+        model, title, _ = SEARCH_KINDS[kind]
+        vector = search_vector(kind)
+        match = Q(document=query)
+        rank = SearchRank(vector, query)
+        if trigram:
+            match |= Q(**{f"{title}__trigram_word_similar": text})
+            rank += TrigramWordSimilarity(text, title)
+        queryset = model.objects.filter(is_active=True)
+        if institution_type:
+            queryset = queryset.filter(institution_type=institution_type)
+        querysets.append(
+            queryset.alias(document=vector)
+            .filter(match)
+            .annotate(
+                kind=Value(kind),
+                label=F(title),
+                rank=Cast(rank, FloatField()),
+            )
+            .values("id", "kind", "label", "institution_type", "rank")
+        )
+    queryset = querysets[0]
+    if len(querysets) > 1:
+        queryset = queryset.union(*querysets[1:], all=True)
+    return list(queryset.order_by("-rank", "label")[:limit])
+
+
+def _fts_match(terms):
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _sqlite_search(terms, kinds, institution_type, limit):
+    sql = (
+        f"SELECT object_id, kind, label, institution_type, "
+        f"-bm25({FTS_TABLE}, 0, 0, 0, 0, 10.0, 1.0) AS rank "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+        f"AND kind IN ({', '.join(['%s'] * len(kinds))})"
+    )
+    params = [_fts_match(terms), *kinds]
+    if institution_type:
+        sql += " AND institution_type = %s"
+        params.append(institution_type)
+    sql += " ORDER BY rank DESC, label LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {
+            "id": UUID(object_id),
+            "kind": kind,
+            "label": label,
+            "institution_type": row_type,
+            "rank": rank,
+        }
+        for object_id, kind, label, row_type, rank in rows
+    ]
+
+
+def _contains_search(terms, kinds, institution_type, limit):
+    """Unranked fallback for databases without a search backend here."""
+    results = []
+    for kind in kinds:
+        model, title, _ = SEARCH_KINDS[kind]
+        queryset = model.objects.filter(is_active=True)
+        for term in terms:
+            queryset = queryset.filter(**{f"{title}__icontains": term})
+        if institution_type:
+            queryset = queryset.filter(institution_type=institution_type)
+        results.extend(
+            queryset.annotate(kind=Value(kind), label=F(title), rank=Value(0.0))
+            .order_by(title)
+            .values("id", "kind", "label", "institution_type", "rank")[:limit]
+        )
+    return sorted(results, key=lambda row: row["label"])[:limit]
+
+
+def search_catalog(text, kinds=None, institution_type=None, limit=DEFAULT_LIMIT):
+    """
+    Best matches for ``text`` among the active catalog rows of ``kinds``
+    (default: all), best first, as ``{"id", "kind", "label",
+    "institution_type", "rank"}`` dicts.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    kinds = list(kinds or SEARCH_KINDS)
+    if connection.vendor == "postgresql":
+        return _postgres_search(terms, text, kinds, institution_type, limit)
+    if connection.vendor == "sqlite":
+        return _sqlite_search(terms, kinds, institution_type, limit)
+    return _contains_search(terms, kinds, institution_type, limit)
@@ -0,0 +1,266 @@
+"""
+Materialized curriculum tree of an institution.
+
+The tree (CurriculumTrack > Section > Stream > Subject > Module > Unit >
+Lesson > MicroLesson) is loaded with one query per level and cached under a
+per-institution version number. Any curriculum write bumps the version (see
+institution.signals), so stale trees are never served; they simply expire.
+Writes that bypass model signals (bulk_create, queryset.update) must call
+``bump_curriculum_version`` themselves.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from institution.models import (
+    CurriculumNode,
+    CurriculumTrack,
+    Lesson,
+    MicroLesson,
+    Module,
+    Section,
+    Stream,
+    Subject,
+    Unit,
+)
+
+TREE_CACHE_TIMEOUT = 60 * 60
+GLOBAL_VERSION_KEY = "curriculum_version:global"
+
+
+def _version_key(institution_id):
+    return f"curriculum_version:{institution_id}"
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old value
+        cache.add(key, time.time_ns() // 1_000_000, None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns() // 1_000_000, None)
+
+
+def get_curriculum_version(institution_id):
+    return (
+        _get_version(_version_key(institution_id)),
+        _get_version(GLOBAL_VERSION_KEY),
+    )
+
+
+def bump_curriculum_version(institution_id=None):
+    """
+    Invalidate the cached trees of ``institution_id``, or of every
+    institution when it is None (Global* names changed).
+    """
+    _bump(_version_key(institution_id) if institution_id else GLOBAL_VERSION_KEY)
+
+
+# Level name -> (model, lookup from the model to its institution id)
+LEVELS = {
+    "curriculum_track": (CurriculumTrack, "institution_info_id"),
+    "section": (Section, "curriculum_track__institution_info_id"),
+    "stream": (Stream, "curriculum_track__institution_info_id"),
+    "subject": (Subject, "stream__curriculum_track__institution_info_id"),
+    "module": (Module, "institution_id"),
+    "unit": (Unit, "institution_id"),
+    "lesson": (Lesson, "institution_id"),
+    "micro_lesson": (MicroLesson, "institution_id"),
+}
+
+
+INSTITUTION_LOOKUPS = {model: lookup for model, lookup in LEVELS.values()}
+
+# Model -> (parent model, attname of the foreign key to it)
+PARENTS = {
+    Section: (CurriculumTrack, "curriculum_track_id"),
+    Stream: (CurriculumTrack, "curriculum_track_id"),
+    Subject: (Stream, "stream_id"),
+}
+
+
+def curriculum_institution_id(instance):
+    """Institution id of a curriculum row, resolved through its parent."""
+    if isinstance(instance, CurriculumTrack):
+        return instance.institution_info_id
+    if isinstance(instance, CurriculumNode):
+        return instance.institution_id
+    parent_model, attname = PARENTS[type(instance)]
+    return (
+        parent_model.objects.filter(pk=getattr(instance, attname))
+        .values_list(INSTITUTION_LOOKUPS[parent_model], flat=True)
+        .first()
+    )
+
+
+def _level_queryset(model, active_only):
+    queryset = model.objects.all()
+    if model is not Section:
+        name_field = "name" if model in (CurriculumTrack, Stream, Subject) else "title"
+        queryset = queryset.select_related(name_field)
+    if active_only:
+        queryset = queryset.filter(is_active=True)
+    return queryset
+
+
+def _prefetches(relations, active_only, prefix=""):
+    lookups = []
+    path = prefix
+    for relation, model in relations:
+        path = f"{path}__{relation}" if path else relation
+        lookups.append(Prefetch(path, queryset=_level_queryset(model, active_only)))
+    return lookups
+
+
+BELOW_SUBJECT = [
+    ("modules", Module),
+    ("units", Unit),
+    ("lessons", Lesson),
+    ("micro_lessons", MicroLesson),
+]
+BELOW_STREAM = [("subjects", Subject)] + BELOW_SUBJECT
+
+
+def _root_prefetches(level, active_only):
+    if level == "curriculum_track":
+        # Streams hang off the track and are grouped under their section
+        # in Python, so sections and streams are one query each.
+        return _prefetches([("sections", Section)], active_only) + _prefetches(
+            [("streams", Stream)] + BELOW_STREAM, active_only
+        )
+    if level == "section":
+        return _prefetches([("streams", Stream)] + BELOW_STREAM, active_only)
+    if level == "stream":
+        return _prefetches(BELOW_STREAM, active_only)
+    relations = {
+        "subject": BELOW_SUBJECT,
+        "module": BELOW_SUBJECT[1:],
+        "unit": BELOW_SUBJECT[2:],
+        "lesson": BELOW_SUBJECT[3:],
+        "micro_lesson": [],
+    }[level]
+    return _prefetches(relations, active_only)
+
+
+def _node(obj, name, **extra):
+    return {
+        "id": str(obj.id),
+        "name": name,
+        "order": obj.order,
+        "is_active": obj.is_active,
+        **extra,
+    }
+
+
+def _micro_lesson(obj):
+    return _node(obj, obj.title.title, content_type=obj.title.content_type)
+
+
+def _lesson(obj):
+    return _node(
+        obj,
+        obj.title.title,
+        micro_lessons=[_micro_lesson(child) for child in obj.micro_lessons.all()],
+    )
+
+
+def _unit(obj):
+    return _node(
+        obj, obj.title.title, lessons=[_lesson(child) for child in obj.lessons.all()]
+    )
+
+
+def _module(obj):
+    return _node(
+        obj, obj.title.title, units=[_unit(child) for child in obj.units.all()]
+    )
+
+
+def _subject(obj):
+    return _node(
+        obj,
+        obj.name.name,
+        code=obj.name.code,
+        modules=[_module(child) for child in obj.modules.all()],
+    )
+
+
+def _stream(obj):
+    return _node(
+        obj, obj.name.name, subjects=[_subject(child) for child in obj.subjects.all()]
+    )
+
+
+def _section(obj, streams=None):
+    if streams is None:
+        streams = obj.streams.all()
+    return _node(obj, obj.name, streams=[_stream(stream) for stream in streams])
+
+
+def _curriculum_track(obj):
+    streams_by_section = {}
+    for stream in obj.streams.all():
+        streams_by_section.setdefault(stream.section_id, []).append(stream)
+    return _node(
+        obj,
+        obj.name.name,
+        sections=[
+            _section(section, streams_by_section.get(section.id, []))
+            for section in obj.sections.all()
+        ],
+        streams=[_stream(stream) for stream in streams_by_section.get(None, [])],
+    )
+
+
+SERIALIZERS = {
+    "curriculum_track": _curriculum_track,
+    "section": _section,
+    "stream": _stream,
+    "subject": _subject,
+    "module": _module,
+    "unit": _unit,
+    "lesson": _lesson,
+    "micro_lesson": _micro_lesson,
+}
+
+
+def build_curriculum_tree(
+    institution_id, level="curriculum_track", root_id=None, active_only=False
+):
+    """
+    Return the list of ``level`` nodes of the institution (or just the one
+    with ``root_id``) with all their descendants.
+    """
+    model, institution_lookup = LEVELS[level]
+    queryset = _level_queryset(model, active_only).filter(
+        **{institution_lookup: institution_id}
+    )
+    if root_id:
+        queryset = queryset.filter(id=root_id)
+    queryset = queryset.prefetch_related(*_root_prefetches(level, active_only))
+    return [SERIALIZERS[level](obj) for obj in queryset]
+
+
+def get_curriculum_tree(
+    institution_id, level="curriculum_track", root_id=None, active_only=False
+):
+    """Cached ``build_curriculum_tree``."""
+    institution_version, global_version = get_curriculum_version(institution_id)
+    key = (
+        f"curriculum_tree:{institution_id}:{institution_version}:{global_version}:"
+        f"{level}:{root_id or 'all'}:{int(active_only)}"
+    )
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_curriculum_tree(institution_id, level, root_id, active_only)
+        cache.set(key, tree, TREE_CACHE_TIMEOUT)
+    return tree
@@ -0,0 +1,329 @@
+"""
+Bulk student admission from a CSV or XLSX file.
+
+Each row names a student (``email`` and/or ``phone_number``, optional
+``first_name``/``last_name``) and where to enroll them (``section``, by id
+or name, and ``curriculum_track``, by id or name, which is only needed to
+tell apart sections with the same name). Rows are streamed from the file
+and imported in chunks: every chunk resolves or creates its Users, their
+student memberships and their enrollments with a fixed number of queries,
+whatever its size. Students created here get an unusable password and
+sign in through the usual OTP / password reset flows.
+"""
+
+import csv
+import io
+import os
+import re
+from uuid import UUID
+
+import openpyxl
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from institution.models import Section, StudentEnrollment, uuid7
+from institution.visibility import refresh_user_visibility
+from user_management.models import InstitutionMembership, User
+
+UPLOAD_DIR = "jobs/uploads"
+FILE_TYPES = (".csv", ".xlsx")
+
+COLUMN_ALIASES = {
+    "phone": "phone_number",
+    "mobile": "phone_number",
+    "class": "curriculum_track",
+    "track": "curriculum_track",
+}
+COLUMNS = {
+    "email",
+    "phone_number",
+    "first_name",
+    "last_name",
+    "curriculum_track",
+    "section",
+}
+
+
+def store_upload(user, upload):
+    """Save an uploaded admission file for a job and return its path."""
+    extension = os.path.splitext(upload.name)[1].lower()
+    return default_storage.save(f"{UPLOAD_DIR}/{user.id}/{uuid7()}{extension}", upload)
+
+
+def _column(header):
+    name = re.sub(r"[\s-]+", "_", str(header or "").strip().lower())
+    name = COLUMN_ALIASES.get(name, name)
+    return name if name in COLUMNS else None
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets store phone numbers as numbers
+        value = int(value)
+    return str(value).strip()
+
+
+def read_rows(file, filename):
+    """
+    Yield ``(row number, {column: value})`` for the data rows of a CSV or
+    XLSX file object, reading it incrementally. Unknown columns and blank
+    rows are skipped.
+    """
+    if filename.lower().endswith(".xlsx"):
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+    else:
+        workbook = None
+        rows = csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    try:
+        columns = [_column(header) for header in next(rows, None) or []]
+        for number, values in enumerate(rows, start=2):
+            row = {
+                column: _cell(value) for column, value in zip(columns, values) if column
+            }
+            if any(row.values()):
+                yield number, row
+    finally:
+        if workbook is not None:
+            workbook.close()
+
+
+def normalize_phone(value):
+    """Return the 11 digit local form (01XXXXXXXXX) of a phone number."""
+    phone = re.sub(r"[\s()-]", "", value)
+    if phone.startswith("+880"):
+        phone = "0" + phone[4:]
+    elif phone.startswith("880"):
+        phone = "0" + phone[3:]
+    elif re.fullmatch(r"1\d{9}", phone):
+        phone = "0" + phone
+    if not re.fullmatch(r"0\d{10}", phone):
+        raise DjangoValidationError("Phone number must be 11 digits starting with '0'.")
+    return phone
+
+
+def _track_key(value):
+    try:
+        return str(UUID(value))
+    except ValueError:
+        return value.lower()
+
+
+def _section_index(institution):
+    """
+    Map section ids, and (track id or name or None, section name) pairs, to
+    the matching ``(section id, track id, track name)`` rows.
+    """
+    index = {}
+    sections = Section.objects.filter(
+        curriculum_track__institution_info=institution
+    ).values_list("id", "name", "curriculum_track_id", "curriculum_track__name__name")
+    for section_id, name, track_id, track_name in sections:
+        section = (section_id, track_id, track_name.lower())
+        index[str(section_id)] = {section}
+        for track in (str(track_id), track_name.lower(), None):
+            index.setdefault((track, name.lower()), set()).add(section)
+    return index
+
+
+def _resolve_section(index, row):
+    """Return ``((section id, track id), None)`` or ``(None, error)``."""
+    section, track = row.get("section", ""), row.get("curriculum_track", "")
+    if not section:
+        return None, "section is required."
+    track = _track_key(track) if track else None
+    try:
+        matches = index.get(str(UUID(section)), set())
+        matches = {
+            match for match in matches if track in (None, str(match[1]), match[2])
+        }
+    except ValueError:
+        matches = index.get((track, section.lower()), set())
+    if not matches:
+        return None, f"Section '{section}' not found in this institution."
+    if len(matches) > 1:
+        return None, (
+            f"Section '{section}' exists in several curriculum tracks, "
+            "set curriculum_track."
+        )
+    section_id, track_id, _ = next(iter(matches))
+    return (section_id, track_id), None
+
+
+def _parse(row):
+    """Validate the student columns of a row; returns (values, errors)."""
+    errors = []
+    email = row.get("email", "").lower()
+    phone = row.get("phone_number", "")
+    if email:
+        try:
+            validate_email(email)
+        except DjangoValidationError:
+            errors.append(f"Invalid email address '{email}'.")
+    if phone:
+        try:
+            phone = normalize_phone(phone)
+        except DjangoValidationError as e:
+            errors.extend(e.messages)
+    if not (email or phone):
+        errors.append("Either email or phone_number is required.")
+    for field in ("first_name", "last_name"):
+        max_length = User._meta.get_field(field).max_length
+        if len(row.get(field, "")) > max_length:
+            errors.append(f"{field} is longer than {max_length} characters.")
+    values = {
+        "email": email or None,
+        "phone_number": phone or None,
+        "first_name": row.get("first_name") or None,
+        "last_name": row.get("last_name") or None,
+    }
+    return values, errors
+
+
+def import_enrollment_rows(institution, rows):
+    """
+    Enroll the students of ``rows`` (``[(row number, {column: value})]``) in
+    ``institution``. Existing Users are matched by normalized email or phone
+    number, missing ones are created; memberships and enrollments are
+    inserted with ``ignore_conflicts`` so re-running a chunk is harmless.
+    """
+    sections = _section_index(institution)
+    errors = {}
+    parsed = []
+    seen = {}
+    for number, row in rows:
+        values, row_errors = _parse(row)
+        section, error = _resolve_section(sections, row)
+        if error:
+            row_errors.append(error)
+        keys = [
+            (identifier, section)
+            for identifier in (values["email"], values["phone_number"])
+            if identifier
+        ]
+        duplicate = next((seen[key] for key in keys if key in seen), None)
+        if duplicate:
+            row_errors.append(f"Duplicate of row {duplicate}.")
+        if row_errors:
+            errors[number] = row_errors
+            continue
+        seen.update(dict.fromkeys(keys, number))
+        parsed.append((number, values, section))
+
+    def find_users():
+        emails = {values["email"] for _, values, _ in parsed} - {None}
+        phones = {values["phone_number"] for _, values, _ in parsed} - {None}
+        by_email, by_phone = {}, {}
+        users = (
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(Q(email_lower__in=emails) | Q(phone_number__in=phones))
+            .values_list("id", "email_lower", "phone_number", "is_student")
+        )
+        for user_id, email, phone, is_student in users:
+            if email:
+                by_email[email] = (user_id, is_student)
+            if phone:
+                by_phone[phone] = (user_id, is_student)
+        return by_email, by_phone
+
+    created = set()
+    with transaction.atomic():
+        by_email, by_phone = find_users()
+        new_users = [
+            User(**values, is_student=True)
+            for _, values, _ in parsed
+            if values["email"] not in by_email
+            and values["phone_number"] not in by_phone
+        ]
+        for user in new_users:
+            user.set_unusable_password()
+        if new_users:
+            User.objects.bulk_create(new_users, ignore_conflicts=True)
+            # Re-read: rows inserted concurrently by another chunk, or a
+            # second row with the same email or phone, were skipped
+            by_email, by_phone = find_users()
+            # Users get their id here, so only the inserted ones are found
+            created = {user.pk for user in new_users} & {
+                user_id for user_id, _ in (*by_email.values(), *by_phone.values())
+            }
+
+        students = []
+        for number, values, section in parsed:
+            user = by_email.get(values["email"]) or by_phone.get(values["phone_number"])
+            phone_user = by_phone.get(values["phone_number"])
+            if user is None:
+                errors[number] = ["User could not be created."]
+            elif phone_user and phone_user[0] != user[0]:
+                errors[number] = ["Email and phone number belong to different users."]
+            else:
+                students.append((number, user, section))
+
+        user_ids = {user_id for _, (user_id, _), _ in students}
+        User.objects.filter(
+            pk__in=[
+                user_id for _, (user_id, is_student), _ in students if not is_student
+            ]
+        ).update(is_student=True)
+        roles = dict(
+            InstitutionMembership.objects.filter(
+                institution=institution, user_id__in=user_ids
+            ).values_list("user_id", "role")
+        )
+        enrolled = set(
+            StudentEnrollment.objects.filter(
+                institution=institution, user_id__in=user_ids
+            ).values_list("user_id", "section_id")
+        )
+
+        memberships, enrollments = {}, {}
+        already_enrolled = 0
+        for number, (user_id, _), (section_id, track_id) in students:
+            if roles.get(user_id, "student") != "student":
+                errors[number] = [
+                    f"User is already a {roles[user_id]} of this institution."
+                ]
+                continue
+            if (user_id, section_id) in enrolled:
+                already_enrolled += 1
+                continue
+            memberships.setdefault(
+                user_id,
+                InstitutionMembership(
+                    user_id=user_id, institution=institution, role="student"
+                ),
+            )
+            enrollments.setdefault(
+                (user_id, section_id),
+                StudentEnrollment(
+                    institution=institution,
+                    user_id=user_id,
+                    curriculum_track_id=track_id,
+                    section_id=section_id,
+                ),
+            )
+        InstitutionMembership.objects.bulk_create(
+            [m for user_id, m in memberships.items() if user_id not in roles],
+            ignore_conflicts=True,
+        )
+        StudentEnrollment.objects.bulk_create(
+            list(enrollments.values()), ignore_conflicts=True
+        )
+        # bulk_create skips the signals that maintain the visibility index
+        refresh_user_visibility(user_id for user_id, _ in enrollments)
+
+    return {
+        "rows": len(rows),
+        "users_created": len(created),
+        "enrolled": len(enrollments),
+        "already_enrolled": already_enrolled,
+        "errors": [
+            {"row": number, "errors": messages}
+            for number, messages in sorted(errors.items())
+        ],
+    }
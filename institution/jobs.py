@@ -0,0 +1,223 @@
+import csv
+import io
+from datetime import date
+from itertools import islice
+from uuid import UUID
+
+from django.core.files.storage import default_storage
+from rest_framework.exceptions import ValidationError
+
+from institution.enrollment_import import (
+    FILE_TYPES,
+    UPLOAD_DIR,
+    import_enrollment_rows,
+    read_rows,
+)
+from institution.models import AcademicSession, InstitutionInfo, Section
+from institution.rollover import ARCHIVE_STEPS, archive_session, start_next_session
+from job_management.handlers import JobHandler, register
+
+# Row errors kept in job.result; the full list is in the CSV artifact
+RESULT_ERROR_LIMIT = 100
+
+
+@register
+class StudentEnrollmentImportJob(JobHandler):
+    """
+    Params: ``institution_id``, ``file`` (a path saved by store_upload) and
+    ``filename`` (the original name, used to pick the CSV or XLSX reader).
+
+    Chunks hold ``start``/``stop`` offsets into the file's data rows rather
+    than the rows themselves; each one re-reads its slice from the upload,
+    which stays in storage until finalize.
+    """
+
+    kind = "student_enrollment_import"
+    label = "Student enrollment import"
+
+    def validate(self, params, user):
+        try:
+            institution_id = UUID(str(params.get("institution_id")))
+        except ValueError:
+            raise ValidationError({"institution_id": "Invalid institution ID."})
+        if not InstitutionInfo.objects.filter(id=institution_id, admin=user).exists():
+            raise ValidationError(
+                {"institution_id": "You are not the admin of this institution."}
+            )
+        path = str(params.get("file", ""))
+        if not path.startswith(f"{UPLOAD_DIR}/{user.id}/") or ".." in path:
+            raise ValidationError({"file": "Unknown upload."})
+        filename = str(params.get("filename", path))
+        if not filename.lower().endswith(FILE_TYPES):
+            raise ValidationError({"file": "Upload a .csv or .xlsx file."})
+        return {
+            "institution_id": str(institution_id),
+            "file": path,
+            "filename": filename,
+        }
+
+    def chunks(self, job):
+        with default_storage.open(job.params["file"], "rb") as f:
+            total = sum(1 for _ in read_rows(f, job.params["filename"]))
+        return [
+            {"start": start, "stop": min(start + self.chunk_size, total)}
+            for start in range(0, total, self.chunk_size)
+        ]
+
+    def run_chunk(self, job, payload):
+        institution = InstitutionInfo.objects.get(pk=job.params["institution_id"])
+        with default_storage.open(job.params["file"], "rb") as f:
+            rows = list(
+                islice(
+                    read_rows(f, job.params["filename"]),
+                    payload["start"],
+                    payload["stop"],
+                )
+            )
+        return import_enrollment_rows(institution, rows)
+
+    def finalize(self, job, results):
+        totals = {"rows": 0, "users_created": 0, "enrolled": 0, "already_enrolled": 0}
+        errors = []
+        for result in results:
+            for key in totals:
+                totals[key] += result[key]
+            errors.extend(result["errors"])
+        if errors:
+            out = io.StringIO()
+            writer = csv.writer(out)
+            writer.writerow(["row", "error"])
+            for error in errors:
+                writer.writerows([error["row"], message] for message in error["errors"])
+            job.attach_artifact("enrollment_import_errors.csv", out.getvalue().encode())
+        default_storage.delete(job.params["file"])
+        return {
+            **totals,
+            "failed": len(errors),
+            "errors": errors[:RESULT_ERROR_LIMIT],
+        }
+
+
+def _uuid(value, field):
+    try:
+        return UUID(str(value))
+    except ValueError:
+        raise ValidationError({field: "Invalid ID."})
+
+
+def _date(value, field):
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValidationError({field: "Use the YYYY-MM-DD format."})
+
+
+@register
+class AcademicSessionRolloverJob(JobHandler):
+    """
+    Params: ``session_id`` (the session to close), ``next_session``
+    (``{"name", "start_date", "end_date"}``), ``promotions`` (a list of
+    ``{"from_section", "to_section"}``, ``to_section`` null for final
+    years) and ``hold_back`` (user ids of students repeating the year).
+
+    Each chunk archives one family of tables (ARCHIVE_STEPS); finalize
+    closes the session, opens the next one and promotes the students.
+    """
+
+    kind = "academic_session_rollover"
+    label = "Academic session rollover"
+
+    def validate(self, params, user):
+        session_id = _uuid(params.get("session_id"), "session_id")
+        session = AcademicSession.objects.filter(
+            pk=session_id, institution__admin=user
+        ).first()
+        if not session:
+            raise ValidationError({"session_id": "Unknown academic session."})
+        if session.closed_at:
+            raise ValidationError({"session_id": "This session is already closed."})
+
+        next_session = params.get("next_session")
+        if not isinstance(next_session, dict) or not next_session.get("name"):
+            raise ValidationError({"next_session": "Provide a name and dates."})
+        start = _date(next_session.get("start_date"), "next_session")
+        end = _date(next_session.get("end_date"), "next_session")
+        if end <= start:
+            raise ValidationError({"next_session": "End date must be after start."})
+        if start <= session.end_date:
+            raise ValidationError(
+                {"next_session": "Must start after the closing session ends."}
+            )
+        if AcademicSession.objects.filter(
+            institution_id=session.institution_id, name=next_session["name"]
+        ).exists():
+            raise ValidationError({"next_session": "This name is already used."})
+
+        promotions = params.get("promotions") or []
+        if not isinstance(promotions, list):
+            raise ValidationError({"promotions": "Must be a list."})
+        mapping = {}
+        for promotion in promotions:
+            if not isinstance(promotion, dict):
+                raise ValidationError({"promotions": "Items must be mappings."})
+            source = _uuid(promotion.get("from_section"), "promotions")
+            target = promotion.get("to_section")
+            if source in mapping:
+                raise ValidationError(
+                    {"promotions": f"Section {source} is promoted twice."}
+                )
+            mapping[source] = _uuid(target, "promotions") if target else None
+        sections = {*mapping, *filter(None, mapping.values())}
+        known = set(
+            Section.objects.filter(
+                pk__in=sections,
+                curriculum_track__institution_info_id=session.institution_id,
+            ).values_list("pk", flat=True)
+        )
+        if sections - known:
+            raise ValidationError(
+                {"promotions": "Sections must belong to this institution."}
+            )
+        hold_back = params.get("hold_back") or []
+        if not isinstance(hold_back, list):
+            raise ValidationError({"hold_back": "Must be a list of user ids."})
+
+        return {
+            "institution_id": str(session.institution_id),
+            "session_id": str(session.pk),
+            "next_session": {
+                "name": str(next_session["name"]),
+                "start_date": start.isoformat(),
+                "end_date": end.isoformat(),
+            },
+            "promotions": {
+                str(source): str(target) if target else None
+                for source, target in mapping.items()
+            },
+            "hold_back": [str(_uuid(pk, "hold_back")) for pk in hold_back],
+        }
+
+    def chunks(self, job):
+        return [{"step": step} for step in ARCHIVE_STEPS]
+
+    def run_chunk(self, job, payload):
+        session = AcademicSession.objects.get(pk=job.params["session_id"])
+        return archive_session(session, payload["step"])
+
+    def finalize(self, job, results):
+        session = AcademicSession.objects.get(pk=job.params["session_id"])
+        new, promoted, graduated = start_next_session(
+            session,
+            job.params["next_session"],
+            job.params["promotions"],
+            job.params["hold_back"],
+        )
+        archived = {}
+        for result in results:
+            archived.update(result)
+        return {
+            "archived": archived,
+            "promoted": promoted,
+            "graduated": graduated,
+            "session": str(new.pk),
+        }
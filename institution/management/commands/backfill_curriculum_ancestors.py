@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+# Model name -> (parent model name, parent foreign key, lookups on the parent
+# giving institution_id, curriculum_track_id and subject_id). Parents come
+# first so each level copies already repaired values.
+ANCESTOR_SOURCES = [
+    (
+        "Module",
+        "Subject",
+        "subject_id",
+        {
+            "institution_id": "stream__curriculum_track__institution_info_id",
+            "curriculum_track_id": "stream__curriculum_track_id",
+        },
+    ),
+    (
+        "Unit",
+        "Module",
+        "module_id",
+        {
+            "institution_id": "institution_id",
+            "curriculum_track_id": "curriculum_track_id",
+            "subject_id": "subject_id",
+        },
+    ),
+    (
+        "Lesson",
+        "Unit",
+        "unit_id",
+        {
+            "institution_id": "institution_id",
+            "curriculum_track_id": "curriculum_track_id",
+            "subject_id": "subject_id",
+        },
+    ),
+    (
+        "MicroLesson",
+        "Lesson",
+        "lesson_id",
+        {
+            "institution_id": "institution_id",
+            "curriculum_track_id": "curriculum_track_id",
+            "subject_id": "subject_id",
+        },
+    ),
+]
+
+
+def backfill_curriculum_ancestors(apps, batch_size=None, stdout=None):
+    """
+    Recompute the denormalized ancestor columns of Module, Unit, Lesson and
+    MicroLesson from their parents with set-based UPDATEs. Takes an app
+    registry so migrations can pass their historical one.
+    """
+    for model_name, parent_name, parent_fk, lookups in ANCESTOR_SOURCES:
+        model = apps.get_model("institution", model_name)
+        parent = apps.get_model("institution", parent_name)
+        values = {
+            field: Subquery(
+                parent.objects.filter(pk=OuterRef(parent_fk)).values(lookup)[:1]
+            )
+            for field, lookup in lookups.items()
+        }
+        updated = 0
+        if batch_size is None:
+            updated = model.objects.update(**values)
+        else:
+            last_pk = None
+            while True:
+                queryset = model.objects.order_by("pk")
+                if last_pk is not None:
+                    queryset = queryset.filter(pk__gt=last_pk)
+                pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+                if not pks:
+                    break
+                with transaction.atomic():
+                    updated += model.objects.filter(pk__in=pks).update(**values)
+                last_pk = pks[-1]
+        if stdout:
+            stdout.write(f"{model_name}: {updated} rows updated")
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute institution, curriculum_track and subject on Module, Unit, "
+        "Lesson and MicroLesson from their parents. Needed after writes that "
+        "bypass save(), such as bulk_create or queryset.update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        from django.apps import apps
+
+        backfill_curriculum_ancestors(
+            apps, batch_size=options["batch_size"], stdout=self.stdout
+        )
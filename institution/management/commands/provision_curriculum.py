@@ -0,0 +1,65 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from institution.models import InstitutionInfo
+from institution.provisioning import (
+    load_template,
+    provision_curriculum,
+    template_from_institution,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the curriculum of an institution from a YAML/JSON template, "
+        "or by cloning the curriculum of another institution."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("institution_id")
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument("--template", help="Path to a YAML or JSON template")
+        source.add_argument(
+            "--clone-from", help="Id of the institution whose curriculum to copy"
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate and report counts without writing anything",
+        )
+
+    def handle(self, *args, **options):
+        institution = self.get_institution(options["institution_id"])
+        if options["template"]:
+            try:
+                with open(options["template"], "rb") as f:
+                    template = load_template(f.read(), options["template"])
+            except OSError as e:
+                raise CommandError(f"Could not read template: {e}")
+            except ValidationError as e:
+                raise CommandError(" ".join(e.detail["template"]))
+        else:
+            source = self.get_institution(options["clone_from"])
+            template = template_from_institution(source.id)
+
+        try:
+            with transaction.atomic():
+                counts = provision_curriculum(institution, template)
+                if options["dry_run"]:
+                    transaction.set_rollback(True)
+        except ValidationError as e:
+            raise CommandError(
+                "Template is invalid:\n" + "\n".join(e.detail["template"])
+            )
+
+        verb = "would be created" if options["dry_run"] else "created"
+        for level, count in counts.items():
+            self.stdout.write(f"{level}: {count} {verb}")
+
+    def get_institution(self, institution_id):
+        try:
+            return InstitutionInfo.objects.get(pk=institution_id)
+        except (InstitutionInfo.DoesNotExist, DjangoValidationError):
+            raise CommandError(f"Institution {institution_id} does not exist.")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from institution.visibility import rebuild_user_visibility
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the visibility index behind the My* endpoints from the "
+        "teacher and student enrollments. Needed after writes that bypass "
+        "the enrollment signals, such as bulk_create or queryset.update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        rebuild_user_visibility(batch_size=options["batch_size"], stdout=self.stdout)
@@ -0,0 +1,110 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from institution.models import uuid7
+
+# Model label -> field whose timestamp seeds the new key
+REKEY_MODELS = {
+    "attendance.Attendance": "created_at",
+    "quiz.QuizAttempt": "created_at",
+    "quiz.QuizResponse": "created_at",
+    "homework.HomeworkSubmission": "updated_at",
+    "exam.ExamMark": "created_at",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Replace random uuid4 primary keys of existing rows with time-ordered "
+        "uuid7 keys derived from their creation time. Foreign keys pointing "
+        "at the rewritten rows are updated in the same transaction, batch by "
+        "batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help=f"Models to rekey (default: all of {', '.join(REKEY_MODELS)})",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the rows that would be rekeyed",
+        )
+
+    def handle(self, *args, **options):
+        labels = options["models"] or list(REKEY_MODELS)
+        unknown = [label for label in labels if label not in REKEY_MODELS]
+        if unknown:
+            raise CommandError(f"Unsupported models: {', '.join(unknown)}")
+
+        for label in labels:
+            model = apps.get_model(label)
+            rekeyed = self.rekey(
+                model,
+                REKEY_MODELS[label],
+                options["batch_size"],
+                options["dry_run"],
+            )
+            verb = "would be rekeyed" if options["dry_run"] else "rekeyed"
+            self.stdout.write(f"{label}: {rekeyed} rows {verb}")
+
+        if not options["dry_run"] and connection.vendor == "postgresql":
+            self.stdout.write(
+                "Run REINDEX on the rekeyed tables to compact their primary "
+                "key indexes."
+            )
+
+    def rekey(self, model, time_field, batch_size, dry_run):
+        """
+        Walk ``model`` in primary key order, ``batch_size`` rows at a time,
+        and rewrite each batch's keys with one UPDATE ... FROM (VALUES ...)
+        on the table and one on each foreign key pointing at it.
+        """
+        pk = model._meta.pk
+        tables = [(model._meta.db_table, pk.column)] + [
+            (rel.related_model._meta.db_table, rel.field.column)
+            for rel in model._meta.related_objects
+            if rel.field.target_field.primary_key
+        ]
+        rows = model.objects.order_by("pk").values_list("pk", time_field)
+        rekeyed = 0
+        last = None
+        while True:
+            batch = list(
+                (rows if last is None else rows.filter(pk__gt=last))[:batch_size]
+            )
+            if not batch:
+                return rekeyed
+            last = batch[-1][0]
+            # Keys already rewritten may come round again: they are uuid7
+            mapping = [
+                (old_pk, uuid7(int(timestamp.timestamp() * 1000)))
+                for old_pk, timestamp in batch
+                if old_pk.version != 7
+            ]
+            rekeyed += len(mapping)
+            if dry_run or not mapping:
+                continue
+            params = [
+                pk.get_db_prep_value(value, connection)
+                for pair in mapping
+                for value in pair
+            ]
+            values = ", ".join(["(%s, %s)"] * len(mapping))
+            quote = connection.ops.quote_name
+            # Foreign keys are created DEFERRABLE INITIALLY DEFERRED, so the
+            # parent and its children can be rewritten in either order.
+            with transaction.atomic(), connection.cursor() as cursor:
+                for table, column in tables:
+                    cursor.execute(
+                        # column1/column2 name VALUES columns on both
+                        # PostgreSQL and SQLite: (old key, new key)
+                        f"UPDATE {quote(table)} SET {quote(column)} = mapping.column2 "
+                        f"FROM (VALUES {values}) AS mapping "
+                        f"WHERE {quote(table)}.{quote(column)} = mapping.column1",
+                        params,
+                    )
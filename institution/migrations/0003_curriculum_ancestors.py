@@ -0,0 +1,204 @@
+# Generated by Django 5.2 on 2026-10-19 01:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from institution.management.commands.backfill_curriculum_ancestors import (
+    backfill_curriculum_ancestors,
+)
+
+
+def backfill(apps, schema_editor):
+    backfill_curriculum_ancestors(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("institution", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lesson",
+            name="curriculum_track",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.curriculumtrack",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="institution",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.institutioninfo",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="subject",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.subject",
+            ),
+        ),
+        migrations.AddField(
+            model_name="microlesson",
+            name="curriculum_track",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.curriculumtrack",
+            ),
+        ),
+        migrations.AddField(
+            model_name="microlesson",
+            name="institution",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.institutioninfo",
+            ),
+        ),
+        migrations.AddField(
+            model_name="microlesson",
+            name="subject",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.subject",
+            ),
+        ),
+        migrations.AddField(
+            model_name="module",
+            name="curriculum_track",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.curriculumtrack",
+            ),
+        ),
+        migrations.AddField(
+            model_name="module",
+            name="institution",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.institutioninfo",
+            ),
+        ),
+        migrations.AddField(
+            model_name="unit",
+            name="curriculum_track",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.curriculumtrack",
+            ),
+        ),
+        migrations.AddField(
+            model_name="unit",
+            name="institution",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.institutioninfo",
+            ),
+        ),
+        migrations.AddField(
+            model_name="unit",
+            name="subject",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="institution.subject",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["institution", "subject"], name="institution_institu_0b69fb_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["curriculum_track", "subject"],
+                name="institution_curricu_9d858b_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="microlesson",
+            index=models.Index(
+                fields=["institution", "subject"], name="institution_institu_5e0ed0_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="microlesson",
+            index=models.Index(
+                fields=["curriculum_track", "subject"],
+                name="institution_curricu_588ff7_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="module",
+            index=models.Index(
+                fields=["institution", "subject"], name="institution_institu_ae0a88_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="module",
+            index=models.Index(
+                fields=["curriculum_track", "subject"],
+                name="institution_curricu_b8f84b_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="unit",
+            index=models.Index(
+                fields=["institution", "subject"], name="institution_institu_ad09f1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="unit",
+            index=models.Index(
+                fields=["curriculum_track", "subject"],
+                name="institution_curricu_92a1d0_idx",
+            ),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
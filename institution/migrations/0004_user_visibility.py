@@ -0,0 +1,112 @@
+# Generated by Django 5.2 on 2026-10-19 01:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from institution.visibility import rebuild_user_visibility
+
+
+def backfill(apps, schema_editor):
+    rebuild_user_visibility(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("institution", "0003_curriculum_ancestors"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserVisibility",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[("teacher", "Teacher"), ("student", "Student")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "curriculum_track",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="institution.curriculumtrack",
+                    ),
+                ),
+                (
+                    "institution",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="institution.institutioninfo",
+                    ),
+                ),
+                (
+                    "section",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="institution.section",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="institution.subject",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "User Visibility",
+                "verbose_name_plural": "User Visibility",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(
+                            ("section__isnull", True), ("subject__isnull", True)
+                        ),
+                        fields=["user", "role", "curriculum_track"],
+                        name="visibility_track_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(
+                            ("section__isnull", False), ("subject__isnull", True)
+                        ),
+                        fields=["user", "role", "section"],
+                        name="visibility_section_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("subject__isnull", False)),
+                        fields=["user", "role", "institution", "subject"],
+                        name="visibility_subject_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
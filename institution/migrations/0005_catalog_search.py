@@ -0,0 +1,126 @@
+# Generated by Django 5.2 on 2026-10-19 01:40
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import DatabaseError, migrations
+
+SEARCH_CONFIG = "simple"
+FTS_TABLE = "institution_catalogsearch"
+
+# Kind -> (model, title field, other searched fields), as of this migration;
+# institution.catalog_search queries the same documents
+SEARCH_KINDS = {
+    "subject": ("GlobalSubject", "name", ("code",)),
+    "module": ("GlobalModule", "title", ()),
+    "unit": ("GlobalUnit", "title", ()),
+    "lesson": ("GlobalLesson", "title", ("content",)),
+    "micro_lesson": ("GlobalMicroLesson", "title", ()),
+}
+
+
+def search_indexes(model, title, others):
+    vector = SearchVector(title, config=SEARCH_CONFIG, weight="A")
+    for field in others:
+        vector += SearchVector(
+            field, config=SEARCH_CONFIG, weight="A" if field == "code" else "B"
+        )
+    model_name = model.lower()
+    return [
+        GinIndex(vector, name=f"{model_name}_search_idx"),
+        GinIndex(
+            fields=[title], opclasses=["gin_trgm_ops"], name=f"{model_name}_trgm_idx"
+        ),
+    ]
+
+
+def sqlite_values(kind, title, others, row):
+    """FTS columns of a catalog row, as SQL over the table alias ``row``."""
+    document = f"{row}.{title}"
+    body = " || ' ' || ".join(f"COALESCE({row}.{field}, '')" for field in others)
+    if kind == "subject":
+        # Codes are matched with the title weight
+        document, body = f"{document} || ' ' || {body}", ""
+    body = body or "''"
+    return (
+        f"{row}.id, '{kind}', {row}.institution_type, {row}.{title}, "
+        f"{document}, {body}"
+    )
+
+
+def sqlite_statements(apps):
+    columns = "object_id, kind, institution_type, label, title, body"
+    statements = [
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        "object_id UNINDEXED, kind UNINDEXED, institution_type UNINDEXED, "
+        "label UNINDEXED, title, body)"
+    ]
+    for kind, (model, title, others) in SEARCH_KINDS.items():
+        table = apps.get_model("institution", model)._meta.db_table
+        delete = (
+            f"DELETE FROM {FTS_TABLE} WHERE kind = '{kind}' AND object_id = old.id;"
+        )
+        insert = (
+            f"INSERT INTO {FTS_TABLE} ({columns}) "
+            f"SELECT {sqlite_values(kind, title, others, 'new')} WHERE new.is_active;"
+        )
+        statements += [
+            f"INSERT INTO {FTS_TABLE} ({columns}) "
+            f"SELECT {sqlite_values(kind, title, others, table)} FROM {table} "
+            "WHERE is_active",
+            f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} "
+            f"BEGIN {insert} END",
+            f"CREATE TRIGGER {table}_search_update AFTER UPDATE ON {table} "
+            f"BEGIN {delete} {insert} END",
+            f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} "
+            f"BEGIN {delete} END",
+        ]
+    return statements
+
+
+def create_search_schema(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for statement in sqlite_statements(apps):
+            schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SAVEPOINT trigram")
+            try:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                cursor.execute("RELEASE SAVEPOINT trigram")
+                trigram = True
+            except DatabaseError:
+                # Not installed or not permitted: search falls back to FTS
+                cursor.execute("ROLLBACK TO SAVEPOINT trigram")
+                trigram = False
+        for model, title, others in SEARCH_KINDS.values():
+            full_text, trigram_index = search_indexes(model, title, others)
+            historical = apps.get_model("institution", model)
+            schema_editor.add_index(historical, full_text)
+            if trigram:
+                schema_editor.add_index(historical, trigram_index)
+
+
+def drop_search_schema(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for model, _, _ in SEARCH_KINDS.values():
+            table = apps.get_model("institution", model)._meta.db_table
+            for event in ("insert", "update", "delete"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_search_{event}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == "postgresql":
+        for model, title, others in SEARCH_KINDS.values():
+            for index in search_indexes(model, title, others):
+                schema_editor.execute(f"DROP INDEX IF EXISTS {index.name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("institution", "0004_user_visibility"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_schema, drop_search_schema),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2 on 2026-10-19 01:38
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("institution", "0005_catalog_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AcademicSession",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "name",
+                    models.CharField(help_text="e.g., 2026, 2026-2027", max_length=100),
+                ),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+                ("is_current", models.BooleanField(default=False)),
+                ("closed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "institution",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="academic_sessions",
+                        to="institution.institutioninfo",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Academic Session",
+                "verbose_name_plural": "Academic Sessions",
+                "ordering": ["-start_date"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("is_current", True)),
+                        fields=("institution",),
+                        name="one_current_session_per_institution",
+                    ),
+                    models.CheckConstraint(
+                        condition=models.Q(("end_date__gt", models.F("start_date"))),
+                        name="session_ends_after_start",
+                    ),
+                ],
+                "unique_together": {("institution", "name")},
+            },
+        ),
+    ]
@@ -1,10 +1,57 @@
+import secrets
+import threading
+import time
 from django.db import models
-from uuid import uuid4
+from uuid import UUID, uuid4
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.utils import timezone
+from institution.validation import BatchValidationMixin, lookup
+
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7(timestamp_ms=None):
+    """
+    Time-ordered UUID (RFC 9562 version 7) for insert-heavy tables.
+
+    48 bits of Unix time in milliseconds, then a 12-bit counter that keeps
+    values generated in the same millisecond increasing, then 62 random bits.
+    New keys land at the right edge of the primary key B-tree instead of on
+    random pages, which keeps inserts local and the index compact.
+
+    Pass ``timestamp_ms`` to build a key for an existing row (see the
+    rekey_uuid7 management command); such keys are not counter-ordered.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    if timestamp_ms is not None:
+        counter = secrets.randbits(12)
+    else:
+        with _uuid7_lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > _uuid7_last_ms:
+                _uuid7_last_ms = now_ms
+                # Random start, leaving headroom for the counter to increase
+                _uuid7_counter = secrets.randbits(11)
+            else:
+                _uuid7_counter += 1
+                if _uuid7_counter > 0xFFF:
+                    _uuid7_last_ms += 1
+                    _uuid7_counter = 0
+            timestamp_ms, counter = _uuid7_last_ms, _uuid7_counter
+    value = (
+        (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    return UUID(int=value)
 
 
 # Common abstract model
@@ -241,6 +288,20 @@ class CurriculumTrack(CommonFields):
     def __str__(self):
         return f"{self.name} ({self.institution_info})"
 
+    def save(self, *args, **kwargs):
+        moved = (
+            not self._state.adding
+            and CurriculumTrack.objects.filter(pk=self.pk)
+            .exclude(institution_info_id=self.institution_info_id)
+            .exists()
+        )
+        super().save(*args, **kwargs)
+        if moved:
+            update_curriculum_ancestors(
+                {"curriculum_track_id": self.pk},
+                institution_id=self.institution_info_id,
+            )
+
 
 # Section
 class Section(CommonFields):
@@ -291,6 +352,25 @@ class Stream(CommonFields):
                 "Section must belong to the specified curriculum track."
             )
 
+    def save(self, *args, **kwargs):
+        moved = (
+            not self._state.adding
+            and Stream.objects.filter(pk=self.pk)
+            .exclude(curriculum_track_id=self.curriculum_track_id)
+            .exists()
+        )
+        super().save(*args, **kwargs)
+        if moved:
+            update_curriculum_ancestors(
+                {"subject__stream_id": self.pk},
+                institution_id=CurriculumTrack.objects.filter(
+                    pk=self.curriculum_track_id
+                )
+                .values_list("institution_info_id", flat=True)
+                .get(),
+                curriculum_track_id=self.curriculum_track_id,
+            )
+
 
 # Subject
 class Subject(CommonFields):
@@ -311,9 +391,98 @@ class Subject(CommonFields):
     def __str__(self):
         return str(self.name)
 
+    def save(self, *args, **kwargs):
+        moved = (
+            not self._state.adding
+            and Subject.objects.filter(pk=self.pk)
+            .exclude(stream_id=self.stream_id)
+            .exists()
+        )
+        super().save(*args, **kwargs)
+        if moved:
+            institution_id, curriculum_track_id = (
+                Stream.objects.filter(pk=self.stream_id)
+                .values_list(
+                    "curriculum_track__institution_info_id", "curriculum_track_id"
+                )
+                .get()
+            )
+            update_curriculum_ancestors(
+                {"subject_id": self.pk},
+                institution_id=institution_id,
+                curriculum_track_id=curriculum_track_id,
+            )
+
+
+class CurriculumNode(CommonFields):
+    """
+    Base for Module, Unit, Lesson and MicroLesson. They carry their
+    institution, curriculum track and subject so that scoping queries do
+    not need a join chain up to the institution. The columns are derived
+    from the parent on save and pushed down to descendants when they
+    change; backfill_curriculum_ancestors repairs rows written in bulk.
+    """
+
+    institution = models.ForeignKey(
+        InstitutionInfo,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        editable=False,
+        db_index=False,
+    )
+    curriculum_track = models.ForeignKey(
+        CurriculumTrack,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        editable=False,
+        db_index=False,
+    )
+
+    # Foreign key to the parent node and the lookups on the parent that give
+    # (institution_id, curriculum_track_id, subject_id)
+    parent_field = None
+    ancestor_lookups = ("institution_id", "curriculum_track_id", "subject_id")
+
+    class Meta:
+        abstract = True
+
+    def refresh_ancestors(self):
+        parent = self._meta.get_field(self.parent_field)
+        self.institution_id, self.curriculum_track_id, self.subject_id = (
+            parent.related_model.objects.filter(pk=getattr(self, parent.attname))
+            .values_list(*self.ancestor_lookups)
+            .get()
+        )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        moved = False
+        if update_fields is None or self.parent_field in update_fields:
+            previous = (self.institution_id, self.curriculum_track_id, self.subject_id)
+            self.refresh_ancestors()
+            current = (self.institution_id, self.curriculum_track_id, self.subject_id)
+            moved = not self._state.adding and previous != current
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    "institution",
+                    "curriculum_track",
+                    "subject",
+                }
+        super().save(*args, **kwargs)
+        if moved:
+            for model, lookup in CURRICULUM_DESCENDANTS[type(self)]:
+                model.objects.filter(**{lookup: self.pk}).update(
+                    institution_id=self.institution_id,
+                    curriculum_track_id=self.curriculum_track_id,
+                    subject_id=self.subject_id,
+                )
+
 
 # Module
-class Module(CommonFields):
+class Module(CurriculumNode):
     subject = models.ForeignKey(
         Subject, on_delete=models.CASCADE, related_name="modules"
     )
@@ -323,53 +492,90 @@ class Module(CommonFields):
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)
 
+    parent_field = "subject"
+    ancestor_lookups = (
+        "stream__curriculum_track__institution_info_id",
+        "stream__curriculum_track_id",
+        "id",
+    )
+
     class Meta:
         verbose_name = "Module"
         verbose_name_plural = "Modules"
         ordering = ["order"]
+        indexes = [
+            models.Index(fields=["institution", "subject"]),
+            models.Index(fields=["curriculum_track", "subject"]),
+        ]
 
     def __str__(self):
         return str(self.title)
 
 
 # Unit
-class Unit(CommonFields):
+class Unit(CurriculumNode):
     module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name="units")
     title = models.ForeignKey(
         GlobalUnit, on_delete=models.CASCADE, related_name="units"
     )
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)
+    subject = models.ForeignKey(
+        Subject,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        editable=False,
+    )
+
+    parent_field = "module"
 
     class Meta:
         verbose_name = "Unit"
         verbose_name_plural = "Units"
         ordering = ["order"]
+        indexes = [
+            models.Index(fields=["institution", "subject"]),
+            models.Index(fields=["curriculum_track", "subject"]),
+        ]
 
     def __str__(self):
         return f"{self.module} > {self.title}"
 
 
 # Lesson
-class Lesson(CommonFields):
+class Lesson(CurriculumNode):
     unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name="lessons")
     title = models.ForeignKey(
         GlobalLesson, on_delete=models.CASCADE, related_name="lessons"
     )
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)
+    subject = models.ForeignKey(
+        Subject,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        editable=False,
+    )
+
+    parent_field = "unit"
 
     class Meta:
         verbose_name = "Lesson"
         verbose_name_plural = "Lessons"
         ordering = ["order"]
+        indexes = [
+            models.Index(fields=["institution", "subject"]),
+            models.Index(fields=["curriculum_track", "subject"]),
+        ]
 
     def __str__(self):
         return str(self.title)
 
 
 # Micro Lesson
-class MicroLesson(CommonFields):
+class MicroLesson(CurriculumNode):
     lesson = models.ForeignKey(
         Lesson, on_delete=models.CASCADE, related_name="micro_lessons"
     )
@@ -378,16 +584,51 @@ class MicroLesson(CommonFields):
     )
     order = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    subject = models.ForeignKey(
+        Subject,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        editable=False,
+    )
+
+    parent_field = "lesson"
 
     class Meta:
         verbose_name = "Micro Lesson"
         verbose_name_plural = "Micro Lessons"
         ordering = ["order"]
+        indexes = [
+            models.Index(fields=["institution", "subject"]),
+            models.Index(fields=["curriculum_track", "subject"]),
+        ]
 
     def __str__(self):
         return f"{self.lesson} > {self.title}"
 
 
+# Node model -> descendants as (model, lookup to the node's pk)
+CURRICULUM_DESCENDANTS = {
+    Module: [
+        (Unit, "module"),
+        (Lesson, "unit__module"),
+        (MicroLesson, "lesson__unit__module"),
+    ],
+    Unit: [(Lesson, "unit"), (MicroLesson, "lesson__unit")],
+    Lesson: [(MicroLesson, "lesson")],
+    MicroLesson: [],
+}
+
+
+def update_curriculum_ancestors(filters, **values):
+    """
+    Set denormalized ancestor ``values`` on every Module, Unit, Lesson and
+    MicroLesson matching ``filters``.
+    """
+    for model in (Module, Unit, Lesson, MicroLesson):
+        model.objects.filter(**filters).update(**values)
+
+
 # Teacher Enrollment
 class TeacherEnrollment(CommonFields):
     institution = models.ForeignKey(
@@ -425,7 +666,7 @@ class TeacherEnrollment(CommonFields):
 
 
 # Student Enrollment
-class StudentEnrollment(CommonFields):
+class StudentEnrollment(BatchValidationMixin, CommonFields):
     institution = models.ForeignKey(
         InstitutionInfo,
         on_delete=models.CASCADE,
@@ -459,32 +700,115 @@ class StudentEnrollment(CommonFields):
     def __str__(self):
         return f"{self.user} - {self.section}"
 
-    def clean(self):
-        if self.section.curriculum_track != self.curriculum_track:
+    @classmethod
+    def build_validation_context(cls, instances):
+        return {
+            "section_tracks": lookup(
+                Section, instances, "section_id", "curriculum_track_id"
+            ),
+        }
+
+    def clean_with_context(self, context):
+        if context["section_tracks"].get(self.section_id) != self.curriculum_track_id:
             raise ValidationError(
                 "Section must belong to the specified curriculum track."
             )
 
 
+# What a teacher or student sees in the My* endpoints
+class UserVisibility(models.Model):
+    """
+    One row per curriculum track, section or subject a user is enrolled in,
+    with the levels above it filled in: track rows have no section and no
+    subject, section rows no subject. Rebuilt per user from the enrollments
+    by institution.visibility.
+    """
 
+    class Role(models.TextChoices):
+        TEACHER = "teacher", "Teacher"
+        STUDENT = "student", "Student"
 
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    institution = models.ForeignKey(
+        InstitutionInfo, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+    curriculum_track = models.ForeignKey(
+        CurriculumTrack, on_delete=models.CASCADE, related_name="+"
+    )
+    section = models.ForeignKey(
+        Section, on_delete=models.CASCADE, related_name="+", null=True
+    )
+    subject = models.ForeignKey(
+        Subject, on_delete=models.CASCADE, related_name="+", null=True
+    )
+    role = models.CharField(max_length=10, choices=Role.choices)
 
+    class Meta:
+        verbose_name = "User Visibility"
+        verbose_name_plural = "User Visibility"
+        indexes = [
+            models.Index(
+                fields=["user", "role", "curriculum_track"],
+                condition=models.Q(section__isnull=True, subject__isnull=True),
+                name="visibility_track_idx",
+            ),
+            models.Index(
+                fields=["user", "role", "section"],
+                condition=models.Q(section__isnull=False, subject__isnull=True),
+                name="visibility_section_idx",
+            ),
+            models.Index(
+                fields=["user", "role", "institution", "subject"],
+                condition=models.Q(subject__isnull=False),
+                name="visibility_subject_idx",
+            ),
+        ]
 
+    def __str__(self):
+        return f"{self.user} ({self.role})"
 
 
+# Academic Session (school year)
+class AcademicSession(CommonFields):
+    """
+    A school year of an institution. At most one session is current; the
+    rollover job (institution.rollover) closes it, moves its attendance,
+    quiz, homework and exam rows to the archive tables and promotes the
+    students into the next session.
+    """
 
+    institution = models.ForeignKey(
+        InstitutionInfo,
+        on_delete=models.CASCADE,
+        related_name="academic_sessions",
+    )
+    name = models.CharField(max_length=100, help_text="e.g., 2026, 2026-2027")
+    start_date = models.DateField()
+    end_date = models.DateField()
+    is_current = models.BooleanField(default=False)
+    closed_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        verbose_name = "Academic Session"
+        verbose_name_plural = "Academic Sessions"
+        ordering = ["-start_date"]
+        unique_together = ("institution", "name")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["institution"],
+                condition=models.Q(is_current=True),
+                name="one_current_session_per_institution",
+            ),
+            models.CheckConstraint(
+                condition=models.Q(end_date__gt=models.F("start_date")),
+                name="session_ends_after_start",
+            ),
+        ]
 
-
-
-
-
-
-
-
-
-
-
+    def __str__(self):
+        return f"{self.name} ({self.institution})"
 
 
 # Institution Fee (Default Monthly Fee)
@@ -0,0 +1,154 @@
+"""
+Gap-based ordering of curriculum siblings.
+
+Orders are spaced ORDER_GAP apart, so moving or inserting one row between
+two siblings only writes that row (it takes the midpoint). Siblings are
+renumbered, in one UPDATE, only when there is no room left between the two
+neighbours. Ties (e.g. rows created before gaps existed, all at 0) are
+broken by creation time.
+"""
+
+from django.db import transaction
+from django.db.models import Case, PositiveIntegerField, Value, When
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from institution.curriculum import bump_curriculum_version, curriculum_institution_id
+from institution.models import (
+    CurriculumTrack,
+    Lesson,
+    MicroLesson,
+    Module,
+    Section,
+    Stream,
+    Subject,
+    Unit,
+)
+
+ORDER_GAP = 1024
+
+# Model -> foreign keys shared by the rows ordered together
+SIBLING_FIELDS = {
+    CurriculumTrack: ("institution_info",),
+    Section: ("curriculum_track",),
+    Stream: ("curriculum_track", "section"),
+    Subject: ("stream",),
+    Module: ("subject",),
+    Unit: ("module",),
+    Lesson: ("unit",),
+    MicroLesson: ("lesson",),
+}
+
+
+def sibling_key(instance):
+    return tuple(
+        getattr(instance, f"{name}_id") for name in SIBLING_FIELDS[type(instance)]
+    )
+
+
+def siblings(instance):
+    """Queryset of ``instance`` and its siblings, in display order."""
+    model = type(instance)
+    values = dict(
+        zip((f"{name}_id" for name in SIBLING_FIELDS[model]), sibling_key(instance))
+    )
+    return model.objects.filter(**values).order_by("order", "created_at", "pk")
+
+
+def next_order(model, values):
+    """
+    Order that puts a new row after its last sibling; ``values`` maps the
+    sibling fields to objects or ids (e.g. serializer validated_data).
+    """
+    filters = {name: values.get(name) for name in SIBLING_FIELDS[model]}
+    last = (
+        model.objects.filter(**filters)
+        .order_by("-order")
+        .values_list("order", flat=True)
+        .first()
+    )
+    return (last or 0) + ORDER_GAP
+
+
+def _apply(model, ids):
+    """Number ``ids`` ORDER_GAP apart, in one UPDATE ... CASE statement."""
+    return model.objects.filter(pk__in=ids).update(
+        order=Case(
+            *[
+                When(pk=pk, then=Value((position + 1) * ORDER_GAP))
+                for position, pk in enumerate(ids)
+            ],
+            output_field=PositiveIntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def _changed(instance):
+    institution_id = curriculum_institution_id(instance)
+    transaction.on_commit(lambda: bump_curriculum_version(institution_id))
+
+
+def reorder(queryset, ids):
+    """
+    Apply the complete ordered list ``ids`` of sibling rows, looked up in
+    ``queryset`` (the rows the caller may see). Returns the rows in order.
+    """
+    ids = [str(pk) for pk in ids]
+    if not ids:
+        raise ValidationError({"ids": "This list may not be empty."})
+    if len(set(ids)) != len(ids):
+        raise ValidationError({"ids": "Ids must not repeat."})
+    by_id = {str(instance.pk): instance for instance in queryset.filter(pk__in=ids)}
+    missing = [pk for pk in ids if pk not in by_id]
+    if missing:
+        raise ValidationError({"ids": f"Unknown ids: {', '.join(missing)}."})
+    if len({sibling_key(instance) for instance in by_id.values()}) != 1:
+        raise ValidationError({"ids": "Ids must share the same parent."})
+    first = by_id[ids[0]]
+    sibling_ids = {
+        str(pk)
+        for pk in siblings(first)
+        .filter(pk__in=queryset.values("pk"))
+        .values_list("pk", flat=True)
+    }
+    if sibling_ids != set(ids):
+        raise ValidationError({"ids": "Ids must list every sibling exactly once."})
+    with transaction.atomic():
+        _apply(type(first), ids)
+        _changed(first)
+    for position, pk in enumerate(ids):
+        by_id[pk].order = (position + 1) * ORDER_GAP
+    return [by_id[pk] for pk in ids]
+
+
+def move(instance, after_id=None):
+    """
+    Place ``instance`` right after its sibling ``after_id``, or first when
+    it is None. Only ``instance`` is written unless its neighbours have no
+    gap left between them.
+    """
+    others = list(siblings(instance).exclude(pk=instance.pk).values_list("pk", "order"))
+    ids = [str(pk) for pk, _ in others]
+    if after_id is None:
+        position = 0
+    elif str(after_id) in ids:
+        position = ids.index(str(after_id)) + 1
+    else:
+        raise ValidationError({"after": "Not a sibling of this item."})
+
+    low = others[position - 1][1] if position else -1
+    high = others[position][1] if position < len(others) else low + 2 * ORDER_GAP
+    model = type(instance)
+    with transaction.atomic():
+        if high - low >= 2:
+            instance.order = (low + high) // 2
+            model.objects.filter(pk=instance.pk).update(
+                order=instance.order, updated_at=timezone.now()
+            )
+        else:
+            ids.insert(position, str(instance.pk))
+            _apply(model, ids)
+            instance.order = (position + 1) * ORDER_GAP
+        _changed(instance)
+    return instance
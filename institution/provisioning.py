@@ -0,0 +1,348 @@
+"""
+Bulk provisioning of an institution's curriculum from a template.
+
+A template mirrors the curriculum tree::
+
+    curriculum_tracks:
+      - name: Class 9              # GlobalCurriculumTrack name or id
+        sections:
+          - name: Section A        # plain section name
+            streams:
+              - name: Science      # GlobalStream name or id
+                subjects:
+                  - name: PHY      # GlobalSubject name, code or id
+                    modules:
+                      - title: Motion        # GlobalModule title or id
+                        units:
+                          - title: Velocity
+                            lessons:
+                              - title: Speed
+                                micro_lessons:
+                                  - title: Speed intro
+        streams: []                # streams not tied to a section
+
+Every node may also set ``order`` (defaults to its position, spaced
+ORDER_GAP apart) and ``is_active``. Catalog references are resolved with
+one query per Global* model and checked in memory, then the whole tree is
+written with one bulk_create per level inside a single transaction.
+"""
+
+import json
+from uuid import UUID
+
+import yaml
+from django.db import transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from institution.curriculum import INSTITUTION_LOOKUPS, bump_curriculum_version
+from institution.models import (
+    CurriculumTrack,
+    GlobalCurriculumTrack,
+    GlobalLesson,
+    GlobalMicroLesson,
+    GlobalModule,
+    GlobalStream,
+    GlobalSubject,
+    GlobalUnit,
+    Lesson,
+    MicroLesson,
+    Module,
+    Section,
+    Stream,
+    Subject,
+    Unit,
+)
+from institution.ordering import ORDER_GAP
+
+BATCH_SIZE = 1000
+
+# Level -> (model, Global* model or None, template key naming the node)
+LEVELS = {
+    "curriculum_track": (CurriculumTrack, GlobalCurriculumTrack, "name"),
+    "section": (Section, None, "name"),
+    "stream": (Stream, GlobalStream, "name"),
+    "subject": (Subject, GlobalSubject, "name"),
+    "module": (Module, GlobalModule, "title"),
+    "unit": (Unit, GlobalUnit, "title"),
+    "lesson": (Lesson, GlobalLesson, "title"),
+    "micro_lesson": (MicroLesson, GlobalMicroLesson, "title"),
+}
+
+# Level -> [(template key of the children, child level)]
+CHILDREN = {
+    "curriculum_track": [("sections", "section"), ("streams", "stream")],
+    "section": [("streams", "stream")],
+    "stream": [("subjects", "subject")],
+    "subject": [("modules", "module")],
+    "module": [("units", "unit")],
+    "unit": [("lessons", "lesson")],
+    "lesson": [("micro_lessons", "micro_lesson")],
+    "micro_lesson": [],
+}
+
+# Level -> foreign keys to its possible parents, most specific first
+CLONE_PARENTS = {
+    "section": ["curriculum_track_id"],
+    "stream": ["section_id", "curriculum_track_id"],
+    "subject": ["stream_id"],
+    "module": ["subject_id"],
+    "unit": ["module_id"],
+    "lesson": ["unit_id"],
+    "micro_lesson": ["lesson_id"],
+}
+
+
+def load_template(content, filename=""):
+    """Parse a JSON or YAML template from text or bytes."""
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+    try:
+        if filename.lower().endswith(".json"):
+            template = json.loads(content)
+        else:
+            # YAML is a superset of JSON, so this also reads unnamed JSON.
+            template = yaml.safe_load(content)
+    except (ValueError, yaml.YAMLError) as e:
+        raise ValidationError({"template": f"Could not parse template: {e}"})
+    if not isinstance(template, dict):
+        raise ValidationError({"template": "Template must be a mapping."})
+    return template
+
+
+def _as_uuid(value):
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _reference(value):
+    """Catalog reference of a template value; ids are normalized."""
+    uuid = _as_uuid(value)
+    return str(uuid) if uuid else str(value)
+
+
+def _node_error(level, data):
+    key = LEVELS[level][2]
+    value = data.get(key)
+    if value in (None, "") or isinstance(value, (bool, dict, list)):
+        return f"'{key}' is required."
+    max_length = Section._meta.get_field("name").max_length
+    if level == "section" and len(str(value)) > max_length:
+        return f"section name is longer than {max_length} characters."
+    order = data.get("order", 0)
+    if isinstance(order, bool) or not isinstance(order, int) or order < 0:
+        return "'order' must be a non-negative integer."
+    if not isinstance(data.get("is_active", True), bool):
+        return "'is_active' must be true or false."
+    return None
+
+
+class _Node:
+    __slots__ = ("level", "index", "path", "data", "parent", "reference", "instance")
+
+    def __init__(self, level, index, path, data, parent):
+        self.level = level
+        self.index = index
+        self.path = path
+        self.data = data
+        self.parent = parent
+        self.reference = None
+        self.instance = None
+
+
+def _flatten(container, level, key, parent, nodes, errors):
+    """Collect the template nodes in document order, parents first."""
+    items = container.get(key) or []
+    base = f"{parent.path}.{key}" if parent else key
+    if not isinstance(items, list):
+        errors.append(f"{base}: must be a list.")
+        return
+    for index, data in enumerate(items):
+        path = f"{base}[{index}]"
+        if not isinstance(data, dict):
+            errors.append(f"{path}: must be a mapping.")
+            continue
+        node = _Node(level, index, path, data, parent)
+        nodes.append(node)
+        for child_key, child_level in CHILDREN[level]:
+            _flatten(data, child_level, child_key, node, nodes, errors)
+
+
+def _resolve_catalog(level, references, institution_type):
+    """
+    Map each reference (a Global* id, name/title or subject code) to a row
+    id, preferring rows of the institution's type over untyped ones.
+    Ambiguous references map to None; unknown ones are left out.
+    """
+    _, catalog, field = LEVELS[level]
+    ids = {ref for ref in map(_as_uuid, references) if ref}
+    names = {ref for ref in references if not _as_uuid(ref)}
+    query = Q(pk__in=ids) | Q(**{f"{field}__in": names})
+    columns = ["pk", field, "institution_type"]
+    if catalog is GlobalSubject:
+        query |= Q(code__in=names)
+        columns.append("code")
+    rows = catalog.objects.filter(query, is_active=True).values_list(*columns)
+
+    candidates = {}
+    for pk, name, row_type, *code in rows:
+        candidates.setdefault(str(pk), []).append((pk, row_type))
+        for key in {name, *code} & names:
+            candidates.setdefault(key, []).append((pk, row_type))
+
+    resolved = {}
+    for key, matches in candidates.items():
+        for wanted in (institution_type, None):
+            typed = {pk for pk, row_type in matches if row_type == wanted}
+            if typed:
+                break
+        else:
+            typed = {pk for pk, _ in matches}
+        resolved[key] = typed.pop() if len(typed) == 1 else None
+    return resolved
+
+
+def _build(node, institution, global_id):
+    data = node.data
+    parent = node.parent.instance if node.parent else None
+    common = {
+        "order": data.get("order", (node.index + 1) * ORDER_GAP),
+        "is_active": data.get("is_active", True),
+    }
+    if node.level == "curriculum_track":
+        return CurriculumTrack(
+            institution_info=institution, name_id=global_id, **common
+        )
+    if node.level == "section":
+        return Section(curriculum_track_id=parent.id, name=str(data["name"]), **common)
+    if node.level == "stream":
+        if isinstance(parent, Section):
+            return Stream(
+                curriculum_track_id=parent.curriculum_track_id,
+                section_id=parent.id,
+                name_id=global_id,
+                **common,
+            )
+        return Stream(curriculum_track_id=parent.id, name_id=global_id, **common)
+    if node.level == "subject":
+        subject = Subject(stream_id=parent.id, name_id=global_id, **common)
+        # Not a Subject column; read by the modules built under it.
+        subject.curriculum_track_id = parent.curriculum_track_id
+        return subject
+    # bulk_create skips save(), so the denormalized ancestors are set here.
+    model = LEVELS[node.level][0]
+    values = {
+        "title_id": global_id,
+        "institution_id": institution.id,
+        "curriculum_track_id": parent.curriculum_track_id,
+        "subject_id": getattr(parent, "subject_id", parent.id),
+        f"{model.parent_field}_id": parent.id,
+    }
+    return model(**values, **common)
+
+
+def provision_curriculum(institution, template):
+    """
+    Create the curriculum described by ``template`` under ``institution``
+    in one transaction. Raises ValidationError listing every problem found
+    before anything is written; returns the number of rows per level.
+    """
+    errors = []
+    nodes = []
+    _flatten(template, "curriculum_track", "curriculum_tracks", None, nodes, errors)
+
+    references = {level: set() for level, spec in LEVELS.items() if spec[1]}
+    for node in nodes:
+        error = _node_error(node.level, node.data)
+        if error:
+            errors.append(f"{node.path}: {error}")
+            node.data = None
+            continue
+        node.reference = _reference(node.data[LEVELS[node.level][2]])
+        if node.level in references:
+            references[node.level].add(node.reference)
+    catalog = {
+        level: _resolve_catalog(level, refs, institution.institution_type)
+        for level, refs in references.items()
+        if refs
+    }
+    existing_tracks = set(
+        CurriculumTrack.objects.filter(institution_info=institution).values_list(
+            "name_id", flat=True
+        )
+    )
+
+    section_names = set()
+    created = {level: [] for level in LEVELS}
+    for node in nodes:
+        if node.data is None or (node.parent and node.parent.instance is None):
+            continue
+        value = node.reference
+        global_id = None
+        if node.level in catalog:
+            if value not in catalog[node.level]:
+                errors.append(f"{node.path}: unknown {node.level} '{value}'.")
+                continue
+            global_id = catalog[node.level][value]
+            if global_id is None:
+                errors.append(
+                    f"{node.path}: '{value}' matches several {node.level} "
+                    "entries, use its id instead."
+                )
+                continue
+        if node.level == "curriculum_track":
+            if global_id in existing_tracks:
+                errors.append(
+                    f"{node.path}: curriculum track '{value}' already exists "
+                    "in this institution."
+                )
+                continue
+            existing_tracks.add(global_id)
+        if node.level == "section":
+            if (node.parent.path, value) in section_names:
+                errors.append(f"{node.path}: duplicate section name '{value}'.")
+                continue
+            section_names.add((node.parent.path, value))
+        node.instance = _build(node, institution, global_id)
+        created[node.level].append(node.instance)
+
+    if errors:
+        raise ValidationError({"template": errors})
+
+    with transaction.atomic():
+        for level, instances in created.items():
+            LEVELS[level][0].objects.bulk_create(instances, batch_size=BATCH_SIZE)
+        transaction.on_commit(lambda: bump_curriculum_version(institution.id))
+    return {level: len(instances) for level, instances in created.items()}
+
+
+def template_from_institution(institution_id):
+    """
+    Template reproducing the curriculum of an institution, referencing the
+    Global* catalog by id. One query per level.
+    """
+    template = {}
+    nodes = {}
+    for level, (model, catalog, key) in LEVELS.items():
+        reference = f"{key}_id" if catalog else key
+        parents = CLONE_PARENTS.get(level, [])
+        rows = (
+            model.objects.filter(**{INSTITUTION_LOOKUPS[model]: institution_id})
+            .order_by("order", "created_at")
+            .values("id", reference, "order", "is_active", *parents)
+        )
+        for row in rows:
+            parent_id = next((row[name] for name in parents if row[name]), None)
+            parent = nodes.get(parent_id) if parents else template
+            if parent is None:
+                continue
+            node = {
+                key: str(row[reference]),
+                "order": row["order"],
+                "is_active": row["is_active"],
+            }
+            parent.setdefault(f"{level}s", []).append(node)
+            nodes[row["id"]] = node
+    return template
@@ -0,0 +1,228 @@
+"""
+Academic-year rollover.
+
+Closing a session moves the rows dated inside it from the hot attendance,
+quiz, homework and exam tables to their archive tables (see
+institution.archive), then makes the next session current and promotes
+the students: every active enrollment of a mapped section is moved to its
+target section with one UPDATE, and enrollments of sections mapped to
+nothing (final years) are deactivated with another. A student who already
+has an enrollment in the target section, such as a deactivated earlier
+one, gets that one reactivated instead.
+
+The attendance rollups and section day counts of the moved attendance
+are recounted batch by batch, so like the attendance list they only
+cover the rows still in the hot table.
+"""
+
+from uuid import UUID
+
+from django.db import transaction
+from django.db.models import Case, Q, UUIDField, Value, When
+from django.utils import timezone
+
+from attendance.models import ArchivedAttendance, Attendance
+from attendance.rollups import refresh_rollups
+from exam.models import ArchivedExamMark, ExamMark
+from homework.models import ArchivedHomeworkSubmission, HomeworkSubmission
+from institution.archive import move_to_archive
+from institution.models import AcademicSession, Section, StudentEnrollment
+from institution.visibility import refresh_user_visibility
+from quiz.models import (
+    ArchivedQuizAttempt,
+    ArchivedQuizResponse,
+    QuizAttempt,
+    QuizResponse,
+)
+
+VISIBILITY_BATCH_SIZE = 500
+
+
+def _session_rows(model, institution_lookup, date_lookup, session):
+    return model.objects.filter(
+        **{
+            institution_lookup: session.institution_id,
+            f"{date_lookup}__gte": session.start_date,
+            f"{date_lookup}__lte": session.end_date,
+        }
+    )
+
+
+def _forget_archived_attendance(pks):
+    # The rows were deleted without signals: recount what they counted in
+    refresh_rollups(
+        ArchivedAttendance.objects.filter(pk__in=pks).values_list(
+            "student_id", "section_id", "subject_id", "date"
+        ),
+        prune=True,
+    )
+
+
+def _archive_attendance(session):
+    rows = _session_rows(Attendance, "institution_id", "date", session)
+    return {
+        "attendance": move_to_archive(
+            rows,
+            ArchivedAttendance,
+            session,
+            on_batch=_forget_archived_attendance,
+        )
+    }
+
+
+def _archive_quizzes(session):
+    attempts = _session_rows(
+        QuizAttempt,
+        "quiz__curriculum_track__institution_info_id",
+        "started_at__date",
+        session,
+    )
+    # Responses first: the attempts' foreign keys must not dangle
+    responses = QuizResponse.objects.filter(attempt__in=attempts)
+    return {
+        "quiz_responses": move_to_archive(responses, ArchivedQuizResponse, session),
+        "quiz_attempts": move_to_archive(attempts, ArchivedQuizAttempt, session),
+    }
+
+
+def _archive_homework(session):
+    rows = _session_rows(
+        HomeworkSubmission,
+        "homework__institution_id",
+        "homework__due_date__date",
+        session,
+    )
+    return {
+        "homework_submissions": move_to_archive(
+            rows, ArchivedHomeworkSubmission, session
+        )
+    }
+
+
+def _archive_exams(session):
+    rows = _session_rows(
+        ExamMark,
+        "exam__curriculum_track__institution_info_id",
+        "exam__exam_date",
+        session,
+    )
+    return {"exam_marks": move_to_archive(rows, ArchivedExamMark, session)}
+
+
+# Archive step -> function moving the rows of a session; steps are
+# independent and run as separate job chunks
+ARCHIVE_STEPS = {
+    "attendance": _archive_attendance,
+    "quiz": _archive_quizzes,
+    "homework": _archive_homework,
+    "exam": _archive_exams,
+}
+
+
+def archive_session(session, step):
+    """Run one archive step for ``session``; returns rows moved per table."""
+    return ARCHIVE_STEPS[step](session)
+
+
+def promote_students(institution_id, promotions, hold_back=()):
+    """
+    Move the active enrollments of each ``from section`` of ``promotions``
+    (``{from section id: to section id or None}``) to its target, or
+    deactivate them when the target is None. Students in ``hold_back``
+    stay where they are. Returns ``(promoted, graduated)`` counts.
+    """
+    promotions = {
+        UUID(str(source)): UUID(str(target)) if target else None
+        for source, target in promotions.items()
+    }
+    targets = {
+        section_id: track_id
+        for section_id, track_id in Section.objects.filter(
+            pk__in=[to for to in promotions.values() if to]
+        ).values_list("pk", "curriculum_track_id")
+    }
+    enrollments = StudentEnrollment.objects.filter(
+        institution_id=institution_id,
+        section_id__in=list(promotions),
+        is_active=True,
+    ).exclude(user_id__in=list(hold_back))
+    user_ids = list(enrollments.values_list("user_id", flat=True).distinct())
+    moving = {src: dst for src, dst in promotions.items() if dst}
+    leaving = [src for src, dst in promotions.items() if not dst]
+    now = timezone.now()
+
+    promoted = graduated = 0
+    # Graduate first, or students just promoted into a final year would go too
+    if leaving:
+        graduated = enrollments.filter(section_id__in=leaving).update(
+            is_active=False, updated_at=now
+        )
+    if moving:
+        # Students already holding a row, active or not, for their target
+        # (track, section) would break its unique constraint: reuse that row
+        existing = Q(pk__in=[])
+        for src, dst in moving.items():
+            existing |= Q(
+                section_id=dst,
+                curriculum_track_id=targets[dst],
+                user_id__in=enrollments.filter(section_id=src).values("user_id"),
+            )
+        existing = list(
+            StudentEnrollment.objects.filter(existing).values_list(
+                "pk", "user_id", "section_id"
+            )
+        )
+        if existing:
+            sources = Q(pk__in=[])
+            for _, user_id, section_id in existing:
+                sources |= Q(
+                    user_id=user_id,
+                    section_id__in=[
+                        src for src, dst in moving.items() if dst == section_id
+                    ],
+                )
+            # Deactivated rows drop out of ``enrollments`` for the UPDATE
+            promoted = enrollments.filter(sources).update(
+                is_active=False, updated_at=now
+            )
+        promoted += enrollments.filter(section_id__in=list(moving)).update(
+            section_id=Case(
+                *[When(section_id=src, then=Value(dst)) for src, dst in moving.items()],
+                output_field=UUIDField(),
+            ),
+            curriculum_track_id=Case(
+                *[
+                    When(section_id=src, then=Value(targets[dst]))
+                    for src, dst in moving.items()
+                ],
+                output_field=UUIDField(),
+            ),
+            updated_at=now,
+        )
+        # After the move, so the reused rows are not moved on themselves
+        StudentEnrollment.objects.filter(pk__in=[pk for pk, _, _ in existing]).update(
+            is_active=True, updated_at=now
+        )
+    # queryset.update() skips the signals that maintain the visibility index
+    for start in range(0, len(user_ids), VISIBILITY_BATCH_SIZE):
+        refresh_user_visibility(user_ids[start : start + VISIBILITY_BATCH_SIZE])
+    return promoted, graduated
+
+
+def start_next_session(session, next_session, promotions, hold_back=()):
+    """
+    Close ``session``, create ``next_session`` (name, start and end dates)
+    as the current one and promote the students, in one transaction.
+    """
+    with transaction.atomic():
+        AcademicSession.objects.filter(
+            institution_id=session.institution_id, is_current=True
+        ).update(is_current=False, updated_at=timezone.now())
+        AcademicSession.objects.filter(pk=session.pk).update(closed_at=timezone.now())
+        new = AcademicSession.objects.create(
+            institution_id=session.institution_id, is_current=True, **next_session
+        )
+        promoted, graduated = promote_students(
+            session.institution_id, promotions, hold_back
+        )
+    return new, promoted, graduated
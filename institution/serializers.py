@@ -1,7 +1,9 @@
 from uuid import UUID
+from django.db.models import OuterRef, Subquery
 from rest_framework import serializers
 from user_management.models.authentication import InstitutionMembership
 from .models import *
+from .ordering import next_order
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -146,6 +148,50 @@ class InstitutionInfoSerializer(serializers.ModelSerializer):
         ]
 
 
+class AppendOrderMixin:
+    """Rows created without an explicit order go after their last sibling."""
+
+    def create(self, validated_data):
+        if "order" not in validated_data:
+            validated_data["order"] = next_order(self.Meta.model, validated_data)
+        return super().create(validated_data)
+
+
+class UserAnnotationMixin:
+    """
+    Serializer fields that depend on the request user, computed in SQL.
+
+    ``user_annotations(user)`` maps annotation names to expressions (e.g. a
+    Subquery on OuterRef("pk")). Views annotate their list querysets with
+    ``annotate_for_user`` so a page costs one query; ``user_annotation``
+    reads the value back, evaluating it for the one row when the instance
+    was not loaded that way (e.g. the response of a create).
+    """
+
+    @classmethod
+    def user_annotations(cls, user):
+        return {}
+
+    @classmethod
+    def annotate_for_user(cls, queryset, user):
+        annotations = cls.user_annotations(user)
+        return queryset.annotate(**annotations) if annotations else queryset
+
+    def user_annotation(self, obj, name):
+        if hasattr(obj, name):
+            return getattr(obj, name)
+        expression = self.user_annotations(self.context["request"].user).get(name)
+        if expression is None:
+            return None
+        return (
+            type(obj)
+            .objects.filter(pk=obj.pk)
+            .annotate(**{name: expression})
+            .values_list(name, flat=True)
+            .first()
+        )
+
+
 class CurriculumTrackSerializer(serializers.ModelSerializer):
     institution_info = serializers.PrimaryKeyRelatedField(
         queryset=InstitutionInfo.objects.all(), required=False
@@ -183,10 +229,14 @@ class CurriculumTrackSerializer(serializers.ModelSerializer):
             "institution_info", self.context["institution"]
         )
         validated_data["institution_info"] = institution
+        if "order" not in validated_data:
+            validated_data["order"] = next_order(CurriculumTrack, validated_data)
         return CurriculumTrack.objects.create(**validated_data)
 
 
-class SectionSerializer(serializers.ModelSerializer):
+class SectionSerializer(
+    UserAnnotationMixin, AppendOrderMixin, serializers.ModelSerializer
+):
     curriculum_track = serializers.PrimaryKeyRelatedField(
         queryset=CurriculumTrack.objects.all()
     )
@@ -208,19 +258,22 @@ class SectionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id"]
 
-    def get_enrollment_id(self, obj):
-        user = self.context["request"].user
+    @classmethod
+    def user_annotations(cls, user):
         if user.is_student:
-            enrollment = StudentEnrollment.objects.filter(
-                user=user, section=obj, is_active=True
-            ).first()
-            return str(enrollment.id) if enrollment else None
+            model = StudentEnrollment
         elif user.is_teacher:
-            enrollment = TeacherEnrollment.objects.filter(
-                user=user, section=obj, is_active=True
-            ).first()
-            return str(enrollment.id) if enrollment else None
-        return None
+            model = TeacherEnrollment
+        else:
+            return {}
+        enrollments = model.objects.filter(
+            user=user, section=OuterRef("pk"), is_active=True
+        ).order_by("pk")
+        return {"user_enrollment_id": Subquery(enrollments.values("pk")[:1])}
+
+    def get_enrollment_id(self, obj):
+        enrollment_id = self.user_annotation(obj, "user_enrollment_id")
+        return str(enrollment_id) if enrollment_id else None
 
     def validate(self, data):
         institution = self.context.get("institution")
@@ -240,7 +293,7 @@ class SectionSerializer(serializers.ModelSerializer):
         return data
 
 
-class StreamSerializer(serializers.ModelSerializer):
+class StreamSerializer(AppendOrderMixin, serializers.ModelSerializer):
     curriculum_track = serializers.PrimaryKeyRelatedField(
         queryset=CurriculumTrack.objects.all()
     )
@@ -297,7 +350,7 @@ class StreamSerializer(serializers.ModelSerializer):
         return data
 
 
-class SubjectSerializer(serializers.ModelSerializer):
+class SubjectSerializer(AppendOrderMixin, serializers.ModelSerializer):
     stream = serializers.PrimaryKeyRelatedField(queryset=Stream.objects.all())
     name = serializers.PrimaryKeyRelatedField(queryset=GlobalSubject.objects.all())
     stream_name = serializers.SlugRelatedField(
@@ -353,7 +406,7 @@ class SubjectSerializer(serializers.ModelSerializer):
         return data
 
 
-class ModuleSerializer(serializers.ModelSerializer):
+class ModuleSerializer(AppendOrderMixin, serializers.ModelSerializer):
     subject = serializers.PrimaryKeyRelatedField(queryset=Subject.objects.all())
     title = serializers.PrimaryKeyRelatedField(queryset=GlobalModule.objects.all())
     subject_name = serializers.SlugRelatedField(
@@ -417,7 +470,7 @@ class ModuleSerializer(serializers.ModelSerializer):
         return data
 
 
-class UnitSerializer(serializers.ModelSerializer):
+class UnitSerializer(AppendOrderMixin, serializers.ModelSerializer):
     module = serializers.PrimaryKeyRelatedField(queryset=Module.objects.all())
     title = serializers.PrimaryKeyRelatedField(queryset=GlobalUnit.objects.all())
     module_title = serializers.SlugRelatedField(
@@ -450,7 +503,7 @@ class UnitSerializer(serializers.ModelSerializer):
                 {"institution": "Institution context is required."}
             )
         if user.is_institution:
-            if module.subject.stream.curriculum_track.institution_info != institution:
+            if module.institution_id != institution.id:
                 raise serializers.ValidationError(
                     {"module": "Module does not belong to this institution."}
                 )
@@ -467,12 +520,12 @@ class UnitSerializer(serializers.ModelSerializer):
                     {"institution_id": "Invalid UUID format for institution ID."}
                 )
             if not TeacherEnrollment.objects.filter(
-                user=user, subjects=module.subject, is_active=True
+                user=user, subjects=module.subject_id, is_active=True
             ).exists():
                 raise serializers.ValidationError(
                     {"module": "You are not enrolled to teach this subject."}
                 )
-            if module.subject.stream.curriculum_track.institution_info != institution:
+            if module.institution_id != institution.id:
                 raise serializers.ValidationError(
                     {"module": "Module does not belong to the specified institution."}
                 )
@@ -481,7 +534,7 @@ class UnitSerializer(serializers.ModelSerializer):
         return data
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(AppendOrderMixin, serializers.ModelSerializer):
     unit = serializers.PrimaryKeyRelatedField(queryset=Unit.objects.all())
     title = serializers.PrimaryKeyRelatedField(queryset=GlobalLesson.objects.all())
     unit_title = serializers.SlugRelatedField(
@@ -514,10 +567,7 @@ class LessonSerializer(serializers.ModelSerializer):
                 {"institution": "Institution context is required."}
             )
         if user.is_institution:
-            if (
-                unit.module.subject.stream.curriculum_track.institution_info
-                != institution
-            ):
+            if unit.institution_id != institution.id:
                 raise serializers.ValidationError(
                     {"unit": "Unit does not belong to this institution."}
                 )
@@ -534,15 +584,12 @@ class LessonSerializer(serializers.ModelSerializer):
                     {"institution_id": "Invalid UUID format for institution ID."}
                 )
             if not TeacherEnrollment.objects.filter(
-                user=user, subjects=unit.module.subject, is_active=True
+                user=user, subjects=unit.subject_id, is_active=True
             ).exists():
                 raise serializers.ValidationError(
                     {"unit": "You are not enrolled to teach this subject."}
                 )
-            if (
-                unit.module.subject.stream.curriculum_track.institution_info
-                != institution
-            ):
+            if unit.institution_id != institution.id:
                 raise serializers.ValidationError(
                     {"unit": "Unit does not belong to the specified institution."}
                 )
@@ -551,7 +598,7 @@ class LessonSerializer(serializers.ModelSerializer):
         return data
 
 
-class MicroLessonSerializer(serializers.ModelSerializer):
+class MicroLessonSerializer(AppendOrderMixin, serializers.ModelSerializer):
     lesson = serializers.PrimaryKeyRelatedField(queryset=Lesson.objects.all())
     title = serializers.PrimaryKeyRelatedField(queryset=GlobalMicroLesson.objects.all())
     lesson_title = serializers.SlugRelatedField(
@@ -584,10 +631,7 @@ class MicroLessonSerializer(serializers.ModelSerializer):
                 {"institution": "Institution context is required."}
             )
         if user.is_institution:
-            if (
-                lesson.unit.module.subject.stream.curriculum_track.institution_info
-                != institution
-            ):
+            if lesson.institution_id != institution.id:
                 raise serializers.ValidationError(
                     {"lesson": "Lesson does not belong to this institution."}
                 )
@@ -604,15 +648,12 @@ class MicroLessonSerializer(serializers.ModelSerializer):
                     {"institution_id": "Invalid UUID format for institution ID."}
                 )
             if not TeacherEnrollment.objects.filter(
-                user=user, subjects=lesson.unit.module.subject, is_active=True
+                user=user, subjects=lesson.subject_id, is_active=True
             ).exists():
                 raise serializers.ValidationError(
                     {"lesson": "You are not enrolled to teach this subject."}
                 )
-            if (
-                lesson.unit.module.subject.stream.curriculum_track.institution_info
-                != institution
-            ):
+            if lesson.institution_id != institution.id:
                 raise serializers.ValidationError(
                     {"lesson": "Lesson does not belong to the specified institution."}
                 )
@@ -800,6 +841,50 @@ class StudentEnrollmentSerializer(serializers.ModelSerializer):
         return StudentEnrollment.objects.create(**validated_data)
 
 
+class AcademicSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AcademicSession
+        fields = [
+            "id",
+            "name",
+            "start_date",
+            "end_date",
+            "is_current",
+            "closed_at",
+            "created_at",
+        ]
+        read_only_fields = ["id", "is_current", "closed_at", "created_at"]
+
+    def validate(self, data):
+        if self.instance and self.instance.closed_at:
+            raise serializers.ValidationError("A closed session cannot be changed.")
+        start_date = data.get("start_date", getattr(self.instance, "start_date", None))
+        end_date = data.get("end_date", getattr(self.instance, "end_date", None))
+        if start_date and end_date and end_date <= start_date:
+            raise serializers.ValidationError(
+                {"end_date": "End date must be after the start date."}
+            )
+        name = data.get("name")
+        sessions = AcademicSession.objects.filter(
+            institution=self.context["institution"], name=name
+        )
+        if self.instance:
+            sessions = sessions.exclude(pk=self.instance.pk)
+        if name and sessions.exists():
+            raise serializers.ValidationError(
+                {"name": "A session with this name already exists."}
+            )
+        return data
+
+    def create(self, validated_data):
+        institution = self.context["institution"]
+        # The first session is current; later ones are opened by the rollover
+        validated_data["is_current"] = not institution.academic_sessions.filter(
+            is_current=True
+        ).exists()
+        return AcademicSession.objects.create(institution=institution, **validated_data)
+
+
 # .............................#
 #   PAYMENT FEE SERIALIZERS
 # .............................#
@@ -0,0 +1,165 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+from institution.curriculum import (
+    INSTITUTION_LOOKUPS,
+    bump_curriculum_version,
+    curriculum_institution_id,
+)
+from institution.models import (
+    CurriculumTrack,
+    GlobalCurriculumTrack,
+    GlobalLesson,
+    GlobalMicroLesson,
+    GlobalModule,
+    GlobalStream,
+    GlobalSubject,
+    GlobalUnit,
+    Section,
+    Stream,
+    StudentEnrollment,
+    Subject,
+    TeacherEnrollment,
+    UserVisibility,
+)
+from institution.visibility import refresh_user_visibility
+
+GLOBAL_CURRICULUM_MODELS = (
+    GlobalCurriculumTrack,
+    GlobalStream,
+    GlobalSubject,
+    GlobalModule,
+    GlobalUnit,
+    GlobalLesson,
+    GlobalMicroLesson,
+)
+
+
+def curriculum_changed(sender, instance, **kwargs):
+    institution_id = curriculum_institution_id(instance)
+    if institution_id:
+        # After commit, so a concurrent reader cannot cache the old tree
+        # under the new version
+        transaction.on_commit(lambda: bump_curriculum_version(institution_id))
+
+
+def global_curriculum_changed(sender, instance, **kwargs):
+    transaction.on_commit(bump_curriculum_version)
+
+
+for model in INSTITUTION_LOOKUPS:
+    post_save.connect(curriculum_changed, sender=model)
+    post_delete.connect(curriculum_changed, sender=model)
+
+for model in GLOBAL_CURRICULUM_MODELS:
+    post_save.connect(global_curriculum_changed, sender=model)
+    post_delete.connect(global_curriculum_changed, sender=model)
+
+
+# Visibility index (institution.visibility)
+
+# Model -> parent columns whose change moves the row in the curriculum
+VISIBILITY_PARENTS = {
+    CurriculumTrack: ("institution_info_id",),
+    Section: ("curriculum_track_id",),
+    Stream: ("curriculum_track_id", "section_id"),
+    Subject: ("stream_id",),
+}
+# Model -> UserVisibility lookup of the rows below it
+VISIBILITY_LOOKUPS = {
+    CurriculumTrack: "curriculum_track_id",
+    Section: "section_id",
+    Stream: "subject__stream_id",
+    Subject: "subject_id",
+}
+
+
+def enrollment_saved(sender, instance, **kwargs):
+    refresh_user_visibility([instance.user_id])
+
+
+def enrollment_deleted(sender, instance, **kwargs):
+    # Deferred: in a cascade the curriculum rows may be deleted next
+    user_id = instance.user_id
+    transaction.on_commit(lambda: refresh_user_visibility([user_id]))
+
+
+def teacher_assignments_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # The enrollments are gone by post_clear and pk_set is None
+        instance._visibility_user_ids = list(
+            instance.teacher_enrollments.values_list("user_id", flat=True)
+        )
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        user_ids = [instance.user_id]
+    elif action == "post_clear":
+        user_ids = instance._visibility_user_ids
+    else:
+        user_ids = TeacherEnrollment.objects.filter(pk__in=pk_set).values_list(
+            "user_id", flat=True
+        )
+    refresh_user_visibility(user_ids)
+
+
+def _parents(sender, instance):
+    return tuple(getattr(instance, field) for field in VISIBILITY_PARENTS[sender])
+
+
+def remember_curriculum_parents(sender, instance, **kwargs):
+    instance._visibility_parents = (
+        None
+        if instance._state.adding
+        else sender.objects.filter(pk=instance.pk)
+        .values_list(*VISIBILITY_PARENTS[sender])
+        .first()
+    )
+
+
+def curriculum_moved(sender, instance, created, **kwargs):
+    """
+    Refresh the users who see a curriculum row that moved, and the students
+    of the section a subject was added to.
+    """
+    user_ids = set()
+    if not created:
+        if getattr(instance, "_visibility_parents", None) == _parents(sender, instance):
+            return
+        user_ids.update(
+            UserVisibility.objects.filter(
+                **{VISIBILITY_LOOKUPS[sender]: instance.pk}
+            ).values_list("user_id", flat=True)
+        )
+    if sender is Subject:
+        section_id = (
+            Stream.objects.filter(pk=instance.stream_id)
+            .values_list("section_id", flat=True)
+            .first()
+        )
+    elif sender is Stream and not created:
+        section_id = instance.section_id
+    else:
+        section_id = None
+    if section_id:
+        user_ids.update(
+            StudentEnrollment.objects.filter(section_id=section_id).values_list(
+                "user_id", flat=True
+            )
+        )
+    refresh_user_visibility(user_ids)
+
+
+for model in (StudentEnrollment, TeacherEnrollment):
+    post_save.connect(enrollment_saved, sender=model)
+    post_delete.connect(enrollment_deleted, sender=model)
+
+for field in ("curriculum_track", "section", "subjects"):
+    m2m_changed.connect(
+        teacher_assignments_changed,
+        sender=getattr(TeacherEnrollment, field).through,
+    )
+
+for model in VISIBILITY_PARENTS:
+    pre_save.connect(remember_curriculum_parents, sender=model)
+    post_save.connect(curriculum_moved, sender=model)
@@ -0,0 +1,276 @@
+"""
+Section x subject x teacher assignment grid of an institution.
+
+A TeacherEnrollment assigns a teacher to sets of curriculum tracks, sections
+and subjects; the teacher covers a (section, subject) cell when both are in
+those sets and the subject is taught in the section (its stream belongs to
+the section, or to the section's track without a section). The grid is
+read straight from the three M2M through tables with a fixed number of
+queries, and written back by diffing those tables in bulk.
+"""
+
+from uuid import UUID
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from institution.models import CurriculumTrack, Section, Subject, TeacherEnrollment
+from institution.visibility import refresh_user_visibility
+
+# Assignment field -> target column of its through table
+ASSIGNMENT_FIELDS = {
+    "curriculum_track": "curriculumtrack_id",
+    "section": "section_id",
+    "subjects": "subject_id",
+}
+
+
+def _through(field):
+    return getattr(TeacherEnrollment, field).through
+
+
+def _assigned(field, **enrollment_filters):
+    """``{enrollment id: {target id: through row id}}`` from one through table."""
+    assigned = {}
+    rows = (
+        _through(field)
+        .objects.filter(
+            **{
+                f"teacherenrollment__{key}": value
+                for key, value in enrollment_filters.items()
+            }
+        )
+        .values_list("teacherenrollment_id", ASSIGNMENT_FIELDS[field], "pk")
+    )
+    for enrollment_id, target_id, pk in rows:
+        assigned.setdefault(enrollment_id, {})[target_id] = pk
+    return assigned
+
+
+def assignment_matrix(institution):
+    """
+    Compact grid of ``institution``: its teachers, its sections with the
+    subjects taught in each, its subjects, and the teachers covering each
+    (section, subject) cell. Six queries, whatever the size of the grid.
+    """
+    teachers = list(
+        TeacherEnrollment.objects.filter(institution=institution)
+        .order_by("user__first_name", "user__last_name", "pk")
+        .values("id", "user_id", "user__first_name", "user__last_name", "is_active")
+    )
+    sections = list(
+        Section.objects.filter(curriculum_track__institution_info=institution)
+        .order_by("curriculum_track__order", "order", "name")
+        .values("id", "name", "curriculum_track_id", "curriculum_track__name__name")
+    )
+    subjects = list(
+        Subject.objects.filter(stream__curriculum_track__institution_info=institution)
+        .order_by("order", "name__name")
+        .values(
+            "id",
+            "name__name",
+            "name__code",
+            "stream__section_id",
+            "stream__curriculum_track_id",
+        )
+    )
+    tracks_of = _assigned("curriculum_track", institution=institution)
+    sections_of = _assigned("section", institution=institution)
+    subjects_of = _assigned("subjects", institution=institution)
+
+    taught = {}
+    for subject in subjects:
+        # Track-wide streams (no section) are taught in every section
+        key = subject["stream__section_id"] or subject["stream__curriculum_track_id"]
+        taught.setdefault(key, []).append(subject["id"])
+    cells = {}
+    for teacher in teachers:
+        teacher_subjects = subjects_of.get(teacher["id"], {})
+        for section in sections:
+            if section["id"] not in sections_of.get(teacher["id"], {}):
+                continue
+            for subject_id in taught.get(section["id"], []) + taught.get(
+                section["curriculum_track_id"], []
+            ):
+                if subject_id in teacher_subjects:
+                    cells.setdefault((section["id"], subject_id), []).append(
+                        str(teacher["id"])
+                    )
+
+    return {
+        "teachers": [
+            {
+                "id": str(teacher["id"]),
+                "user": str(teacher["user_id"]),
+                "first_name": teacher["user__first_name"],
+                "last_name": teacher["user__last_name"],
+                "is_active": teacher["is_active"],
+                "curriculum_track": [
+                    str(pk) for pk in tracks_of.get(teacher["id"], {})
+                ],
+            }
+            for teacher in teachers
+        ],
+        "sections": [
+            {
+                "id": str(section["id"]),
+                "name": section["name"],
+                "curriculum_track": str(section["curriculum_track_id"]),
+                "curriculum_track_name": section["curriculum_track__name__name"],
+                "subjects": [
+                    str(pk)
+                    for pk in taught.get(section["id"], [])
+                    + taught.get(section["curriculum_track_id"], [])
+                ],
+            }
+            for section in sections
+        ],
+        "subjects": [
+            {
+                "id": str(subject["id"]),
+                "name": subject["name__name"],
+                "code": subject["name__code"],
+            }
+            for subject in subjects
+        ],
+        "cells": [
+            {"section": str(section_id), "subject": str(subject_id), "teachers": ids}
+            for (section_id, subject_id), ids in cells.items()
+        ],
+    }
+
+
+def _uuids(values, path, errors):
+    if not isinstance(values, list):
+        errors.append(f"{path}: must be a list of ids.")
+        return set()
+    try:
+        return {UUID(str(value)) for value in values}
+    except ValueError:
+        errors.append(f"{path}: ids must be UUIDs.")
+        return set()
+
+
+def _parse(assignments):
+    """``{enrollment id: {field: {target ids}}}`` of the fields given."""
+    if not isinstance(assignments, list) or not assignments:
+        raise ValidationError({"assignments": "Provide a list of assignments."})
+    errors = []
+    wanted = {}
+    for index, assignment in enumerate(assignments):
+        path = f"assignments[{index}]"
+        if not isinstance(assignment, dict):
+            errors.append(f"{path}: must be a mapping.")
+            continue
+        if not assignment.get("enrollment"):
+            errors.append(f"{path}: 'enrollment' is required.")
+            continue
+        enrollment_ids = _uuids([assignment["enrollment"]], path, errors)
+        enrollment_id = next(iter(enrollment_ids), None)
+        if enrollment_id in wanted:
+            errors.append(f"{path}: enrollment {enrollment_id} repeats.")
+        elif enrollment_id:
+            wanted[enrollment_id] = {
+                field: _uuids(assignment[field], f"{path}.{field}", errors)
+                for field in ASSIGNMENT_FIELDS
+                if field in assignment
+            }
+    if errors:
+        raise ValidationError({"assignments": errors})
+    return wanted
+
+
+def bulk_assign(institution, assignments):
+    """
+    Replace the curriculum tracks, sections and/or subjects of several
+    teacher enrollments of ``institution``. ``assignments`` is a list of
+    ``{"enrollment": id, "curriculum_track": [ids], "section": [ids],
+    "subjects": [ids]}``; omitted fields are kept. Only the through rows
+    that change are deleted or inserted, one statement each per field.
+    Returns the number of rows added and removed per field.
+    """
+    wanted = _parse(assignments)
+    users = dict(
+        TeacherEnrollment.objects.filter(
+            institution=institution, pk__in=list(wanted)
+        ).values_list("pk", "user_id")
+    )
+    missing = sorted(str(pk) for pk in set(wanted) - set(users))
+    if missing:
+        raise ValidationError(
+            {"assignments": f"Unknown teacher enrollments: {', '.join(missing)}."}
+        )
+
+    current = {
+        field: _assigned(field, pk__in=list(wanted)) for field in ASSIGNMENT_FIELDS
+    }
+    # Target id -> its curriculum track, for every target of the institution
+    track_of = {
+        "curriculum_track": {
+            pk: pk
+            for pk in CurriculumTrack.objects.filter(
+                institution_info=institution
+            ).values_list("pk", flat=True)
+        },
+        "section": dict(
+            Section.objects.filter(
+                curriculum_track__institution_info=institution
+            ).values_list("pk", "curriculum_track_id")
+        ),
+        "subjects": dict(
+            Subject.objects.filter(
+                stream__curriculum_track__institution_info=institution
+            ).values_list("pk", "stream__curriculum_track_id")
+        ),
+    }
+
+    errors = []
+    final = {}
+    for enrollment_id, fields in wanted.items():
+        final[enrollment_id] = {
+            field: fields.get(field, set(current[field].get(enrollment_id, {})))
+            for field in ASSIGNMENT_FIELDS
+        }
+        tracks = final[enrollment_id]["curriculum_track"]
+        for field, targets in final[enrollment_id].items():
+            unknown = sorted(str(pk) for pk in targets - set(track_of[field]))
+            outside = sorted(
+                str(pk)
+                for pk in targets
+                if pk in track_of[field] and track_of[field][pk] not in tracks
+            )
+            if unknown:
+                errors.append(
+                    f"{enrollment_id}: {field} not in this institution: "
+                    f"{', '.join(unknown)}."
+                )
+            if outside:
+                errors.append(
+                    f"{enrollment_id}: {field} outside the assigned curriculum "
+                    f"tracks: {', '.join(outside)}."
+                )
+    if errors:
+        raise ValidationError({"assignments": errors})
+
+    counts = {}
+    with transaction.atomic():
+        for field, column in ASSIGNMENT_FIELDS.items():
+            through = _through(field)
+            added, removed = [], []
+            for enrollment_id, fields in final.items():
+                before = current[field].get(enrollment_id, {})
+                removed += [
+                    pk for target, pk in before.items() if target not in fields[field]
+                ]
+                added += [
+                    through(teacherenrollment_id=enrollment_id, **{column: target})
+                    for target in fields[field] - set(before)
+                ]
+            if removed:
+                through.objects.filter(pk__in=removed).delete()
+            if added:
+                through.objects.bulk_create(added, ignore_conflicts=True)
+            counts[field] = {"added": len(added), "removed": len(removed)}
+        # Through rows written directly skip the m2m_changed signals
+        refresh_user_visibility(users.values())
+    return counts
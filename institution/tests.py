@@ -1,3 +1,1153 @@
-from django.test import TestCase
+import tempfile
+import time
+from datetime import date
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+import fakeredis
+import openpyxl
+import yaml
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from attendance.models import (
+    ArchivedAttendance,
+    Attendance,
+    AttendanceRollup,
+    SectionDayAttendance,
+)
+from attendance.rollups import attendance_statistics
+from educational_management.celery import app as celery_app
+from exam.models import ArchivedExamMark, Exam, ExamMark
+from institution.curriculum import build_curriculum_tree, get_curriculum_tree
+from institution.enrollment_import import import_enrollment_rows
+from institution.jobs import StudentEnrollmentImportJob
+from institution.models import (
+    AcademicSession,
+    CurriculumTrack,
+    GlobalCurriculumTrack,
+    GlobalLesson,
+    GlobalMicroLesson,
+    GlobalModule,
+    GlobalStream,
+    GlobalSubject,
+    GlobalUnit,
+    InstitutionInfo,
+    Lesson,
+    MicroLesson,
+    Module,
+    Section,
+    Stream,
+    StudentEnrollment,
+    Subject,
+    TeacherEnrollment,
+    Unit,
+    UserVisibility,
+    uuid7,
+)
+from institution.ordering import ORDER_GAP
+from institution.provisioning import provision_curriculum
+from institution.teacher_assignments import assignment_matrix
+from job_management.models import Job
+from user_management.models import InstitutionMembership, User
+
+
+class UUID7Tests(TestCase):
+    def test_version_and_variant(self):
+        value = uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, "specified in RFC 4122")
+
+    def test_keys_are_monotonic_and_unique(self):
+        values = [uuid7() for _ in range(10000)]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+
+    def test_timestamp_prefix(self):
+        now_ms = time.time_ns() // 1_000_000
+        value = uuid7(now_ms - 60_000)
+        self.assertEqual(value.int >> 80, now_ms - 60_000)
+        self.assertLess(value, uuid7())
+
+    def test_rekey_command_dry_run(self):
+        out = StringIO()
+        call_command("rekey_uuid7", "attendance.Attendance", "--dry-run", stdout=out)
+        self.assertIn("attendance.Attendance: 0 rows would be rekeyed", out.getvalue())
+
+
+class CurriculumFixture(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email="admin@example.com", password="pass12345", is_institution=True
+        )
+        self.institution = InstitutionInfo.objects.create(
+            name="Test School", admin=self.admin
+        )
+        self.track = CurriculumTrack.objects.create(
+            institution_info=self.institution,
+            name=GlobalCurriculumTrack.objects.create(name="Class 9"),
+        )
+        self.section = Section.objects.create(
+            curriculum_track=self.track, name="Section A"
+        )
+        stream = Stream.objects.create(
+            curriculum_track=self.track,
+            section=self.section,
+            name=GlobalStream.objects.create(name="Science"),
+        )
+        Stream.objects.create(
+            curriculum_track=self.track, name=GlobalStream.objects.create(name="Common")
+        )
+        self.subject = Subject.objects.create(
+            stream=stream, name=GlobalSubject.objects.create(name="Physics", code="PHY")
+        )
+        self.module = Module.objects.create(
+            subject=self.subject, title=GlobalModule.objects.create(title="Motion")
+        )
+        unit = Unit.objects.create(
+            module=self.module, title=GlobalUnit.objects.create(title="Velocity")
+        )
+        lesson = Lesson.objects.create(
+            unit=unit, title=GlobalLesson.objects.create(title="Speed")
+        )
+        self.micro_lesson = MicroLesson.objects.create(
+            lesson=lesson,
+            title=GlobalMicroLesson.objects.create(
+                title="Speed intro", content_type="video"
+            ),
+        )
+
+
+class CurriculumTreeTests(CurriculumFixture):
+    def test_tree_is_one_query_per_level(self):
+        with self.assertNumQueries(8):
+            tree = build_curriculum_tree(self.institution.id)
+        track = tree[0]
+        self.assertEqual(track["name"], "Class 9")
+        self.assertEqual([s["name"] for s in track["streams"]], ["Common"])
+        section = track["sections"][0]
+        subject = section["streams"][0]["subjects"][0]
+        self.assertEqual((subject["name"], subject["code"]), ("Physics", "PHY"))
+        lesson = subject["modules"][0]["units"][0]["lessons"][0]
+        self.assertEqual(lesson["micro_lessons"][0]["name"], "Speed intro")
+
+    def test_cache_is_invalidated_by_curriculum_writes(self):
+        get_curriculum_tree(self.institution.id)
+        with self.assertNumQueries(0):
+            get_curriculum_tree(self.institution.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.section.name = "Section B"
+            self.section.save()
+        tree = get_curriculum_tree(self.institution.id)
+        self.assertEqual(tree[0]["sections"][0]["name"], "Section B")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GlobalSubject.objects.filter(name="Physics").first().save()
+        with self.assertNumQueries(8):
+            get_curriculum_tree(self.institution.id)
+
+    def test_subtree_endpoint(self):
+        client = APIClient()
+        url = reverse("curriculum-tree", kwargs={"institution_id": self.institution.id})
+        client.force_authenticate(
+            User.objects.create_user(email="other@example.com", password="pass12345")
+        )
+        self.assertEqual(client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        client.force_authenticate(self.admin)
+        response = client.get(url, {"level": "subject", "root_id": self.subject.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["modules"][0]["name"], "Motion")
+        response = client.get(url, {"level": "module", "root_id": self.subject.id})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CurriculumAncestorTests(CurriculumFixture):
+    def ancestors(self, obj):
+        obj.refresh_from_db()
+        return (obj.institution_id, obj.curriculum_track_id, obj.subject_id)
+
+    def test_ancestors_follow_moves(self):
+        expected = (self.institution.id, self.track.id, self.subject.id)
+        self.assertEqual(self.ancestors(self.micro_lesson), expected)
+
+        other_track = CurriculumTrack.objects.create(
+            institution_info=self.institution,
+            name=GlobalCurriculumTrack.objects.create(name="Class 10"),
+        )
+        other_stream = Stream.objects.create(
+            curriculum_track=other_track, name=GlobalStream.objects.get(name="Science")
+        )
+        self.subject.stream = other_stream
+        self.subject.save()
+        self.assertEqual(
+            self.ancestors(self.micro_lesson),
+            (self.institution.id, other_track.id, self.subject.id),
+        )
+
+        other_subject = Subject.objects.create(
+            stream=other_stream, name=GlobalSubject.objects.create(name="Chemistry")
+        )
+        self.module.subject = other_subject
+        self.module.save()
+        self.assertEqual(
+            self.ancestors(self.micro_lesson),
+            (self.institution.id, other_track.id, other_subject.id),
+        )
+
+    def test_backfill_command(self):
+        for model in (Module, Unit, Lesson, MicroLesson):
+            model.objects.update(institution=None, curriculum_track=None)
+        call_command(
+            "backfill_curriculum_ancestors", "--batch-size", "1", stdout=StringIO()
+        )
+        self.assertEqual(
+            self.ancestors(self.micro_lesson),
+            (self.institution.id, self.track.id, self.subject.id),
+        )
+
+    def test_deep_viewsets_scope_by_institution(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        for name in ("module-list", "unit-list", "lesson-list", "micro-lesson-list"):
+            response = client.get(reverse(name))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data), 1)
+
+
+class CurriculumProvisioningTests(CurriculumFixture):
+    def setUp(self):
+        super().setUp()
+        GlobalCurriculumTrack.objects.create(name="Class 10")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.template = yaml.safe_load("""
+            curriculum_tracks:
+              - name: Class 10
+                sections:
+                  - name: Section A
+                    streams:
+                      - name: Science
+                        subjects:
+                          - name: PHY
+                            modules:
+                              - title: Motion
+                                units:
+                                  - title: Velocity
+                                    lessons:
+                                      - title: Speed
+                                        micro_lessons:
+                                          - title: Speed intro
+                  - name: Section B
+                    is_active: false
+                streams:
+                  - name: Common
+            """)
+
+    def url(self, institution=None):
+        return reverse(
+            "curriculum-import",
+            kwargs={"institution_id": (institution or self.institution).id},
+        )
+
+    def test_template_is_created_with_one_insert_per_level(self):
+        # 7 catalog lookups, existing tracks, savepoint, 8 inserts, release
+        with self.assertNumQueries(18):
+            created = provision_curriculum(self.institution, self.template)
+        self.assertEqual(
+            created,
+            {
+                "curriculum_track": 1,
+                "section": 2,
+                "stream": 2,
+                "subject": 1,
+                "module": 1,
+                "unit": 1,
+                "lesson": 1,
+                "micro_lesson": 1,
+            },
+        )
+        track = CurriculumTrack.objects.get(name__name="Class 10")
+        self.assertEqual(
+            list(track.sections.values_list("name", "order", "is_active")),
+            [("Section A", ORDER_GAP, True), ("Section B", 2 * ORDER_GAP, False)],
+        )
+        micro_lesson = MicroLesson.objects.get(
+            lesson__unit__module__subject__stream__curriculum_track=track
+        )
+        self.assertEqual(
+            (
+                micro_lesson.institution_id,
+                micro_lesson.curriculum_track_id,
+                micro_lesson.subject_id,
+            ),
+            (self.institution.id, track.id, micro_lesson.lesson.unit.module.subject_id),
+        )
+
+    def test_invalid_template_reports_every_problem_and_writes_nothing(self):
+        GlobalStream.objects.create(name="Common")
+        self.template["curriculum_tracks"].append({"name": "Class 9"})
+        section = self.template["curriculum_tracks"][0]["sections"][0]
+        section["streams"][0]["subjects"][0]["name"] = "Biology"
+        self.template["curriculum_tracks"][0]["sections"][1]["name"] = "Section A"
+        response = self.client.post(
+            self.url(), {"template": self.template}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["template"],
+            [
+                "curriculum_tracks[0].sections[0].streams[0].subjects[0]: "
+                "unknown subject 'Biology'.",
+                "curriculum_tracks[0].sections[1]: duplicate section name "
+                "'Section A'.",
+                "curriculum_tracks[0].streams[0]: 'Common' matches several "
+                "stream entries, use its id instead.",
+                "curriculum_tracks[1]: curriculum track 'Class 9' already exists "
+                "in this institution.",
+            ],
+        )
+        self.assertEqual(CurriculumTrack.objects.count(), 1)
+
+    def test_clone_from_another_institution(self):
+        new_school = InstitutionInfo.objects.create(name="New School", admin=self.admin)
+        response = self.client.post(
+            self.url(new_school),
+            {"source_institution": str(self.institution.id)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+        def strip_ids(nodes):
+            return [
+                {
+                    key: strip_ids(value) if isinstance(value, list) else value
+                    for key, value in node.items()
+                    if key != "id"
+                }
+                for node in nodes
+            ]
+
+        self.assertEqual(
+            strip_ids(build_curriculum_tree(new_school.id)),
+            strip_ids(build_curriculum_tree(self.institution.id)),
+        )
+
+        outsider = InstitutionInfo.objects.create(
+            name="Other School",
+            admin=User.objects.create_user(
+                email="other@example.com", password="pass12345", is_institution=True
+            ),
+        )
+        response = self.client.post(
+            self.url(new_school),
+            {"source_institution": str(outsider.id)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_management_command_reads_yaml(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml") as f:
+            yaml.safe_dump(self.template, f)
+            f.flush()
+            out = StringIO()
+            call_command(
+                "provision_curriculum",
+                str(self.institution.id),
+                "--template",
+                f.name,
+                "--dry-run",
+                stdout=out,
+            )
+            self.assertIn("micro_lesson: 1 would be created", out.getvalue())
+            self.assertFalse(CurriculumTrack.objects.filter(name__name="Class 10"))
+
+            call_command(
+                "provision_curriculum",
+                str(self.institution.id),
+                "--template",
+                f.name,
+                stdout=StringIO(),
+            )
+        self.assertTrue(CurriculumTrack.objects.filter(name__name="Class 10"))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class EnrollmentImportTests(CurriculumFixture):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        redis_patch = patch(
+            "job_management.progress.redis_client",
+            fakeredis.FakeRedis(decode_responses=True),
+        )
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+        self.existing = User.objects.create_user(
+            email="Old.Student@example.com", phone_number="01711111111"
+        )
+        self.teacher = User.objects.create_user(email="teacher@example.com")
+        InstitutionMembership.objects.create(
+            user=self.teacher, institution=self.institution, role="teacher"
+        )
+
+    def upload(self, name, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("student-enrollment-import"),
+                {"file": SimpleUploadedFile(name, content)},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+        return Job.objects.get(pk=response.data["id"])
+
+    def test_csv_import_resolves_creates_and_reports_rows(self):
+        csv_content = (
+            "Email,Phone,First Name,Class,Section\n"
+            "new@example.com,+880 1722-222222,Nadia,Class 9,Section A\n"
+            "old.student@example.com,,,,section a\n"
+            "NEW@example.com,,,,Section A\n"
+            "teacher@example.com,,,,Section A\n"
+            "broken,,,,Section Z\n"
+            "\n"
+        )
+        job = self.upload("admissions.csv", csv_content.encode())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.COMPLETED, job.error)
+        self.assertEqual(
+            {key: job.result[key] for key in ("rows", "users_created", "enrolled")},
+            {"rows": 5, "users_created": 1, "enrolled": 2},
+        )
+        self.assertEqual(
+            job.result["errors"],
+            [
+                {"row": 4, "errors": ["Duplicate of row 2."]},
+                {
+                    "row": 5,
+                    "errors": ["User is already a teacher of this institution."],
+                },
+                {
+                    "row": 6,
+                    "errors": [
+                        "Invalid email address 'broken'.",
+                        "Section 'Section Z' not found in this institution.",
+                    ],
+                },
+            ],
+        )
+        self.assertTrue(job.artifact)
+
+        new = User.objects.get(email="new@example.com")
+        self.assertEqual((new.phone_number, new.first_name), ("01722222222", "Nadia"))
+        self.assertTrue(new.is_student)
+        self.assertFalse(new.has_usable_password())
+        self.assertEqual(
+            set(
+                StudentEnrollment.objects.filter(section=self.section).values_list(
+                    "user", flat=True
+                )
+            ),
+            {new.id, self.existing.id},
+        )
+        self.assertEqual(
+            InstitutionMembership.objects.get(user=self.existing).role, "student"
+        )
+
+    def test_xlsx_import_and_rerun_is_idempotent(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(["email", "phone_number", "section"])
+        sheet.append([None, 1733333333, str(self.section.id)])
+        content = BytesIO()
+        workbook.save(content)
+
+        job = self.upload("admissions.xlsx", content.getvalue())
+        job.refresh_from_db()
+        self.assertEqual(job.result["enrolled"], 1)
+        self.assertTrue(User.objects.filter(phone_number="01733333333").exists())
+
+        job = self.upload("admissions.xlsx", content.getvalue())
+        job.refresh_from_db()
+        self.assertEqual(
+            (job.result["enrolled"], job.result["already_enrolled"]), (0, 1)
+        )
+
+    @patch.object(StudentEnrollmentImportJob, "chunk_size", 2)
+    def test_chunks_store_offsets_and_count_created_users_once(self):
+        Section.objects.create(curriculum_track=self.track, name="Section B")
+        csv_content = (
+            "email,section\n"
+            "twin@example.com,Section A\n"
+            "twin@example.com,Section B\n"
+            "old.student@example.com,Section B\n"
+        )
+        job = self.upload("admissions.csv", csv_content.encode())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.COMPLETED, job.error)
+        self.assertEqual(
+            [chunk.payload for chunk in job.chunks.order_by("index")],
+            [{"start": 0, "stop": 2}, {"start": 2, "stop": 3}],
+        )
+        self.assertEqual(
+            {key: job.result[key] for key in ("rows", "users_created", "enrolled")},
+            {"rows": 3, "users_created": 1, "enrolled": 3},
+        )
+
+    def test_chunk_queries_do_not_grow_with_rows(self):
+        rows = [
+            (index, {"email": f"student{index}@example.com", "section": "Section A"})
+            for index in range(2, 52)
+        ]
+        # sections, users, insert users, re-read users, memberships,
+        # enrollments, insert memberships, insert enrollments, savepoint x2,
+        # then the visibility refresh (5 reads, delete, insert, savepoint x2)
+        with self.assertNumQueries(19):
+            result = import_enrollment_rows(self.institution, rows)
+        self.assertEqual(result["enrolled"], 50)
+
+    def test_rejects_other_file_types(self):
+        response = self.client.post(
+            reverse("student-enrollment-import"),
+            {"file": SimpleUploadedFile("admissions.txt", b"email")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReorderTests(CurriculumFixture):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_section(self, name):
+        response = self.client.post(
+            reverse("section-list"),
+            {"curriculum_track": str(self.track.id), "name": name},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return Section.objects.get(pk=response.data["id"])
+
+    def orders(self):
+        return list(
+            Section.objects.filter(curriculum_track=self.track).values_list(
+                "name", "order"
+            )
+        )
+
+    def test_new_rows_are_appended_with_gaps(self):
+        self.create_section("Section B")
+        self.create_section("Section C")
+        self.assertEqual(
+            self.orders(),
+            [("Section A", 0), ("Section B", ORDER_GAP), ("Section C", 2 * ORDER_GAP)],
+        )
+
+    def test_reorder_applies_the_full_list_in_one_update(self):
+        b = self.create_section("Section B")
+        c = self.create_section("Section C")
+        url = reverse("section-reorder")
+        response = self.client.post(
+            url, {"ids": [str(c.id), str(self.section.id)]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        ids = [str(c.id), str(self.section.id), str(b.id)]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual([row["id"] for row in response.data], ids)
+        self.assertEqual(
+            self.orders(),
+            [
+                ("Section C", ORDER_GAP),
+                ("Section A", 2 * ORDER_GAP),
+                ("Section B", 3 * ORDER_GAP),
+            ],
+        )
+        tree = get_curriculum_tree(self.institution.id)
+        self.assertEqual(
+            [section["name"] for section in tree[0]["sections"]],
+            ["Section C", "Section A", "Section B"],
+        )
+
+    def test_move_only_writes_the_moved_row_while_there_is_a_gap(self):
+        b = self.create_section("Section B")
+        c = self.create_section("Section C")
+        response = self.client.post(
+            reverse("section-move", kwargs={"pk": c.id}),
+            {"after": str(self.section.id)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(
+            self.orders(),
+            [
+                ("Section A", 0),
+                ("Section C", ORDER_GAP // 2),
+                ("Section B", ORDER_GAP),
+            ],
+        )
+
+        # No room in front of an order of 0: siblings are renumbered
+        response = self.client.post(
+            reverse("section-move", kwargs={"pk": b.id}),
+            {"after": None},
+            format="json",
+        )
+        self.assertEqual(response.data["order"], ORDER_GAP)
+        self.assertEqual(
+            self.orders(),
+            [
+                ("Section B", ORDER_GAP),
+                ("Section A", 2 * ORDER_GAP),
+                ("Section C", 3 * ORDER_GAP),
+            ],
+        )
+
+        response = self.client.post(
+            reverse("section-move", kwargs={"pk": b.id}),
+            {"after": str(self.module.id)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class UserVisibilityTests(CurriculumFixture):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.student = User.objects.create_user(
+            email="student@example.com", is_student=True
+        )
+        self.teacher = User.objects.create_user(
+            email="teacher@example.com", is_teacher=True
+        )
+        self.enrollment = StudentEnrollment.objects.create(
+            institution=self.institution,
+            user=self.student,
+            curriculum_track=self.track,
+            section=self.section,
+        )
+        self.teaching = TeacherEnrollment.objects.create(
+            institution=self.institution, user=self.teacher
+        )
+
+    def names(self, url_name, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return {str(item["id"]) for item in response.data}
+
+    def test_student_sees_their_track_section_and_section_subjects(self):
+        other = Stream.objects.create(
+            curriculum_track=self.track, name=GlobalStream.objects.get(name="Common")
+        )
+        Subject.objects.create(
+            stream=other, name=GlobalSubject.objects.create(name="Bangla")
+        )
+        self.assertEqual(
+            self.names("my-curriculum-track-list", self.student), {str(self.track.id)}
+        )
+        self.assertEqual(
+            self.names("my-section-list", self.student), {str(self.section.id)}
+        )
+        self.assertEqual(
+            self.names("my-subject-list", self.student), {str(self.subject.id)}
+        )
+
+        # Subjects added to the section's streams show up right away
+        chemistry = Subject.objects.create(
+            stream=self.subject.stream,
+            name=GlobalSubject.objects.create(name="Chemistry"),
+        )
+        self.assertEqual(
+            self.names("my-subject-list", self.student),
+            {str(self.subject.id), str(chemistry.id)},
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.enrollment.delete()
+        self.assertEqual(self.names("my-subject-list", self.student), set())
+
+    def test_teacher_follows_assignment_changes(self):
+        self.teaching.curriculum_track.add(self.track)
+        self.teaching.subjects.add(self.subject)
+        self.assertEqual(
+            self.names("my-curriculum-track-list", self.teacher), {str(self.track.id)}
+        )
+        self.assertEqual(self.names("my-section-list", self.teacher), set())
+        self.assertEqual(
+            self.names(
+                "my-subject-by-institution-list",
+                self.teacher,
+                institution_id=str(self.institution.id),
+            ),
+            {str(self.subject.id)},
+        )
+        self.assertEqual(
+            self.names(
+                "my-subject-by-institution-list",
+                self.teacher,
+                institution_id=str(uuid7()),
+            ),
+            set(),
+        )
+
+        self.subject.teacher_enrollments.clear()
+        self.assertEqual(self.names("my-subject-list", self.teacher), set())
+
+        self.teaching.is_active = False
+        self.teaching.save()
+        self.assertEqual(self.names("my-curriculum-track-list", self.teacher), set())
+
+    def test_moving_a_subject_moves_its_visibility(self):
+        section_b = Section.objects.create(curriculum_track=self.track, name="B")
+        stream_b = Stream.objects.create(
+            curriculum_track=self.track,
+            section=section_b,
+            name=GlobalStream.objects.get(name="Science"),
+        )
+        self.subject.stream = stream_b
+        self.subject.save()
+        self.assertEqual(self.names("my-subject-list", self.student), set())
+
+    def test_list_reads_the_index_without_distinct(self):
+        self.client.force_authenticate(self.student)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("my-subject-list"))
+        sql = " ".join(query["sql"] for query in queries).upper()
+        self.assertIn("INSTITUTION_USERVISIBILITY", sql)
+        self.assertNotIn("DISTINCT", sql)
+
+    def test_rebuild_command_restores_the_index(self):
+        UserVisibility.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_user_visibility", stdout=out)
+        self.assertIn("Visibility rebuilt for 2 users", out.getvalue())
+        self.assertEqual(
+            self.names("my-section-list", self.student), {str(self.section.id)}
+        )
+
+    def test_section_enrollment_ids_are_annotated_in_one_query(self):
+        for name in ("B", "C", "D"):
+            StudentEnrollment.objects.create(
+                institution=self.institution,
+                user=self.student,
+                curriculum_track=self.track,
+                section=Section.objects.create(curriculum_track=self.track, name=name),
+            )
+        expected = {
+            str(section_id): str(pk)
+            for pk, section_id in StudentEnrollment.objects.filter(
+                user=self.student
+            ).values_list("pk", "section_id")
+        }
+        self.client.force_authenticate(self.student)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("my-section-list"))
+        self.assertEqual(
+            {item["id"]: item["enrollment_id"] for item in response.data}, expected
+        )
+
+        # Rows not loaded through the view fall back to a single lookup
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(
+            reverse("section-list"),
+            {"curriculum_track": str(self.track.id), "name": "E"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertIsNone(response.data["enrollment_id"])
+
+
+class CatalogSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(email="builder@example.com", is_institution=True)
+        )
+        self.physics = GlobalSubject.objects.create(
+            name="Physics", code="PHY101", institution_type="high_school"
+        )
+        GlobalSubject.objects.create(name="Physical Education", code="PE")
+        self.motion = GlobalModule.objects.create(
+            title="Motion and Forces", institution_type="high_school"
+        )
+        self.lesson = GlobalLesson.objects.create(
+            title="Newton's laws", content="Objects in motion stay in motion."
+        )
+        GlobalUnit.objects.create(title="Motion graphs", is_active=False)
+
+    def search(self, **params):
+        response = self.client.get(reverse("catalog-search"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [(row["type"], row["title"]) for row in response.data]
+
+    def test_prefix_search_ranks_titles_above_content(self):
+        self.assertEqual(
+            self.search(q="moti"),
+            [("module", "Motion and Forces"), ("lesson", "Newton's laws")],
+        )
+        self.assertEqual(self.search(q="phys edu"), [("subject", "Physical Education")])
+        self.assertEqual(self.search(q="phy101"), [("subject", "Physics")])
+
+    def test_filters_by_type_and_institution_type(self):
+        self.assertEqual(
+            self.search(q="moti", type="lesson"), [("lesson", "Newton's laws")]
+        )
+        self.assertEqual(
+            self.search(q="phy", institution_type="high_school"),
+            [("subject", "Physics")],
+        )
+        response = self.client.get(
+            reverse("catalog-search"), {"q": "x", "type": "track"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_catalog_writes(self):
+        self.motion.title = "Kinematics"
+        self.motion.save()
+        self.lesson.delete()
+        self.assertEqual(self.search(q="moti"), [])
+        self.assertEqual(self.search(q="kine"), [("module", "Kinematics")])
+        GlobalSubject.objects.filter(pk=self.physics.pk).update(is_active=False)
+        self.assertEqual(self.search(q="phy"), [("subject", "Physical Education")])
+
+
+class TeacherAssignmentTests(CurriculumFixture):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.teacher = User.objects.create_user(
+            email="teacher@example.com", first_name="Rina", is_teacher=True
+        )
+        self.enrollment = TeacherEnrollment.objects.create(
+            institution=self.institution, user=self.teacher
+        )
+        common = Stream.objects.get(section__isnull=True)
+        self.bangla = Subject.objects.create(
+            stream=common, name=GlobalSubject.objects.create(name="Bangla")
+        )
+
+    def assign(self, **fields):
+        return self.client.post(
+            reverse("teacher-enrollment-bulk-assign"),
+            {"assignments": [{"enrollment": str(self.enrollment.id), **fields}]},
+            format="json",
+        )
+
+    def test_bulk_assign_diffs_the_through_rows(self):
+        response = self.assign(
+            curriculum_track=[str(self.track.id)],
+            section=[str(self.section.id)],
+            subjects=[str(self.subject.id), str(self.bangla.id)],
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(
+            response.data["updated"]["subjects"], {"added": 2, "removed": 0}
+        )
+        self.assertEqual(
+            set(self.enrollment.subjects.all()), {self.subject, self.bangla}
+        )
+
+        # Only the subject that changed is written; other fields are kept
+        response = self.assign(subjects=[str(self.bangla.id)])
+        self.assertEqual(
+            response.data["updated"],
+            {
+                "curriculum_track": {"added": 0, "removed": 0},
+                "section": {"added": 0, "removed": 0},
+                "subjects": {"added": 0, "removed": 1},
+            },
+        )
+        self.assertEqual(list(self.enrollment.section.all()), [self.section])
+        # The visibility index follows writes that skip m2m_changed
+        self.client.force_authenticate(self.teacher)
+        response = self.client.get(reverse("my-subject-list"))
+        self.assertEqual([item["id"] for item in response.data], [str(self.bangla.id)])
+
+    def test_bulk_assign_validates_against_the_institution(self):
+        response = self.assign(section=[str(self.section.id)])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("outside the assigned curriculum tracks", str(response.data))
+        response = self.assign(subjects=[str(uuid7())])
+        self.assertIn("not in this institution", str(response.data))
+        response = self.client.post(
+            reverse("teacher-enrollment-bulk-assign"),
+            {"assignments": [{"enrollment": str(uuid7())}]},
+            format="json",
+        )
+        self.assertIn("Unknown teacher enrollments", str(response.data))
+        self.assertFalse(self.enrollment.section.exists())
+
+    def test_matrix_lists_the_teachers_of_each_cell(self):
+        self.enrollment.curriculum_track.add(self.track)
+        self.enrollment.section.add(self.section)
+        self.enrollment.subjects.add(self.bangla)
+        with self.assertNumQueries(6):
+            matrix = assignment_matrix(self.institution)
+        self.assertEqual(
+            matrix["sections"][0]["subjects"],
+            [str(self.subject.id), str(self.bangla.id)],
+        )
+        self.assertEqual(
+            matrix["cells"],
+            [
+                {
+                    "section": str(self.section.id),
+                    "subject": str(self.bangla.id),
+                    "teachers": [str(self.enrollment.id)],
+                }
+            ],
+        )
+        response = self.client.get(reverse("teacher-enrollment-matrix"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["teachers"][0]["first_name"], "Rina")
+
+
+class AcademicSessionRolloverTests(CurriculumFixture):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        redis_patch = patch(
+            "job_management.progress.redis_client",
+            fakeredis.FakeRedis(decode_responses=True),
+        )
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+        response = self.client.post(
+            reverse("academic-session-list"),
+            {"name": "2026", "start_date": "2026-01-01", "end_date": "2026-12-31"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.session = AcademicSession.objects.get(pk=response.data["id"])
+        self.next_track = CurriculumTrack.objects.create(
+            institution_info=self.institution,
+            name=GlobalCurriculumTrack.objects.create(name="Class 10"),
+        )
+        self.next_section = Section.objects.create(
+            curriculum_track=self.next_track, name="Section A"
+        )
+        self.students = {}
+        for name, section in [
+            ("promoted", self.section),
+            ("repeating", self.section),
+            ("graduating", self.next_section),
+        ]:
+            user = User.objects.create_user(
+                email=f"{name}@example.com", is_student=True
+            )
+            StudentEnrollment.objects.create(
+                institution=self.institution,
+                user=user,
+                curriculum_track=section.curriculum_track,
+                section=section,
+            )
+            self.students[name] = user
+
+        student = self.students["promoted"]
+        for day in [date(2026, 3, 1), date(2026, 12, 31), date(2027, 1, 2)]:
+            Attendance.objects.create(
+                institution=self.institution,
+                student=student,
+                section=self.section,
+                subject=self.subject,
+                date=day,
+            )
+        for day in [date(2026, 6, 1), date(2027, 2, 1)]:
+            exam = Exam.objects.create(
+                curriculum_track=self.track,
+                section=self.section,
+                subject=self.subject,
+                title=f"Test {day}",
+                exam_date=day,
+                total_marks=20,
+            )
+            ExamMark.objects.create(exam=exam, student=student, marks_obtained=15)
+
+    def rollover(self, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("academic-session-rollover", args=[self.session.pk]),
+                data,
+                format="json",
+            )
+
+    def test_first_session_is_current(self):
+        self.assertTrue(self.session.is_current)
+        response = self.client.post(
+            reverse("academic-session-list"),
+            {"name": "2026", "start_date": "2026-01-01", "end_date": "2026-12-31"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rollover_archives_promotes_and_opens_the_next_session(self):
+        response = self.rollover(
+            next_session={
+                "name": "2027",
+                "start_date": "2027-01-01",
+                "end_date": "2027-12-31",
+            },
+            promotions=[
+                {
+                    "from_section": str(self.section.pk),
+                    "to_section": str(self.next_section.pk),
+                },
+                {"from_section": str(self.next_section.pk), "to_section": None},
+            ],
+            hold_back=[str(self.students["repeating"].pk)],
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+        job = Job.objects.get(pk=response.data["id"])
+        self.assertEqual(job.status, Job.Status.COMPLETED, job.error)
+        self.assertEqual(job.result["archived"]["attendance"], 2)
+        self.assertEqual(job.result["archived"]["exam_marks"], 1)
+        self.assertEqual((job.result["promoted"], job.result["graduated"]), (1, 1))
+
+        # Rows dated inside the session moved; later ones stay hot
+        self.assertEqual(
+            list(Attendance.objects.values_list("date", flat=True)),
+            [date(2027, 1, 2)],
+        )
+        self.assertEqual(
+            sorted(
+                ArchivedAttendance.objects.filter(session=self.session).values_list(
+                    "date", flat=True
+                )
+            ),
+            [date(2026, 3, 1), date(2026, 12, 31)],
+        )
+        archived = ArchivedExamMark.objects.get()
+        self.assertEqual(archived.exam.exam_date, date(2026, 6, 1))
+        self.assertEqual(ExamMark.objects.get().exam.exam_date, date(2027, 2, 1))
+
+        enrollments = {
+            enrollment.user_id: enrollment
+            for enrollment in StudentEnrollment.objects.all()
+        }
+        promoted = enrollments[self.students["promoted"].pk]
+        self.assertEqual(
+            (promoted.section, promoted.curriculum_track),
+            (self.next_section, self.next_track),
+        )
+        self.assertEqual(
+            enrollments[self.students["repeating"].pk].section, self.section
+        )
+        self.assertFalse(enrollments[self.students["graduating"].pk].is_active)
+        self.assertTrue(
+            UserVisibility.objects.filter(
+                user=self.students["promoted"], section=self.next_section
+            ).exists()
+        )
+
+        self.session.refresh_from_db()
+        self.assertFalse(self.session.is_current)
+        self.assertIsNotNone(self.session.closed_at)
+        current = AcademicSession.objects.get(is_current=True)
+        self.assertEqual(
+            (current.name, str(current.pk)), ("2027", job.result["session"])
+        )
+
+    def test_promotion_reuses_an_earlier_enrollment_in_the_target_section(self):
+        student = self.students["promoted"]
+        earlier = StudentEnrollment.objects.create(
+            institution=self.institution,
+            user=student,
+            curriculum_track=self.next_track,
+            section=self.next_section,
+            is_active=False,
+        )
+        response = self.rollover(
+            next_session={
+                "name": "2027",
+                "start_date": "2027-01-01",
+                "end_date": "2027-12-31",
+            },
+            promotions=[
+                {
+                    "from_section": str(self.section.pk),
+                    "to_section": str(self.next_section.pk),
+                },
+            ],
+        )
+        job = Job.objects.get(pk=response.data["id"])
+        self.assertEqual(job.status, Job.Status.COMPLETED, job.error)
+        self.assertEqual(job.result["promoted"], 2)
+        self.assertEqual(
+            set(
+                StudentEnrollment.objects.filter(
+                    user=student, is_active=True
+                ).values_list("pk", flat=True)
+            ),
+            {earlier.pk},
+        )
+        self.assertTrue(
+            StudentEnrollment.objects.filter(
+                user=self.students["repeating"], section=self.next_section
+            ).exists()
+        )
+
+    def test_rollover_recounts_the_statistics_of_archived_attendance(self):
+        filters = Q(institution_id=self.institution.pk)
+        start, end = date(2026, 3, 1), date(2027, 1, 15)
+        self.assertEqual(
+            attendance_statistics(filters, start, end)[0]["present_count"], 3
+        )
+        response = self.rollover(
+            next_session={
+                "name": "2027",
+                "start_date": "2027-01-01",
+                "end_date": "2027-12-31",
+            }
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+
+        # Whole months from the counts, January from the packed statuses
+        statistics = attendance_statistics(filters, start, end)
+        self.assertEqual(
+            [(row["student_id"], row["present_count"]) for row in statistics],
+            [(self.students["promoted"].pk, 1)],
+        )
+        self.assertEqual(
+            list(AttendanceRollup.objects.values_list("month", flat=True)),
+            [date(2027, 1, 1)],
+        )
+        self.assertEqual(
+            list(SectionDayAttendance.objects.values_list("date", flat=True)),
+            [date(2027, 1, 2)],
+        )
+
+    def test_rollover_validates_the_next_session(self):
+        response = self.rollover(
+            next_session={
+                "name": "2027",
+                "start_date": "2026-06-01",
+                "end_date": "2027-05-31",
+            }
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("next_session", response.data)
+        self.assertFalse(Job.objects.exists())
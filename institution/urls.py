@@ -22,10 +22,14 @@ from .views import (
     MicroLessonViewSet,
     TeacherEnrollmentViewSet,
     StudentEnrollmentViewSet,
+    AcademicSessionViewSet,
     MyCurriculumTrackViewSet,
     MySectionViewSet,
     MySubjectViewSet,
     MySubjectByInstitutionViewSet,
+    CurriculumTreeView,
+    CurriculumImportView,
+    CatalogSearchView,
 )
 
 urlpatterns = [
@@ -41,6 +45,16 @@ urlpatterns = [
         ),
         name="institution-info-detail",
     ),
+    path(
+        "<uuid:institution_id>/curriculum-tree/",
+        CurriculumTreeView.as_view(),
+        name="curriculum-tree",
+    ),
+    path(
+        "<uuid:institution_id>/curriculum-import/",
+        CurriculumImportView.as_view(),
+        name="curriculum-import",
+    ),
     path(
         "my-institution/",
         MyInstitutionView.as_view(),
@@ -66,6 +80,11 @@ urlpatterns = [
         MySubjectByInstitutionViewSet.as_view({"get": "list"}),
         name="my-subject-by-institution-list",
     ),
+    path(
+        "catalog-search/",
+        CatalogSearchView.as_view(),
+        name="catalog-search",
+    ),
     path(
         "global-curriculum-tracks/",
         GlobalCurriculumTrackViewSet.as_view({"get": "list", "post": "create"}),
@@ -162,6 +181,16 @@ urlpatterns = [
         ),
         name="curriculum-track-detail",
     ),
+    path(
+        "curriculum-tracks/reorder/",
+        CurriculumTrackViewSet.as_view({"post": "reorder"}),
+        name="curriculum-track-reorder",
+    ),
+    path(
+        "curriculum-tracks/<uuid:pk>/move/",
+        CurriculumTrackViewSet.as_view({"post": "move"}),
+        name="curriculum-track-move",
+    ),
     path(
         "sections/",
         SectionViewSet.as_view({"get": "list", "post": "create"}),
@@ -174,6 +203,16 @@ urlpatterns = [
         ),
         name="section-detail",
     ),
+    path(
+        "sections/reorder/",
+        SectionViewSet.as_view({"post": "reorder"}),
+        name="section-reorder",
+    ),
+    path(
+        "sections/<uuid:pk>/move/",
+        SectionViewSet.as_view({"post": "move"}),
+        name="section-move",
+    ),
     path(
         "streams/",
         StreamViewSet.as_view({"get": "list", "post": "create"}),
@@ -186,6 +225,16 @@ urlpatterns = [
         ),
         name="stream-detail",
     ),
+    path(
+        "streams/reorder/",
+        StreamViewSet.as_view({"post": "reorder"}),
+        name="stream-reorder",
+    ),
+    path(
+        "streams/<uuid:pk>/move/",
+        StreamViewSet.as_view({"post": "move"}),
+        name="stream-move",
+    ),
     path(
         "subjects/",
         SubjectViewSet.as_view({"get": "list", "post": "create"}),
@@ -198,6 +247,16 @@ urlpatterns = [
         ),
         name="subject-detail",
     ),
+    path(
+        "subjects/reorder/",
+        SubjectViewSet.as_view({"post": "reorder"}),
+        name="subject-reorder",
+    ),
+    path(
+        "subjects/<uuid:pk>/move/",
+        SubjectViewSet.as_view({"post": "move"}),
+        name="subject-move",
+    ),
     path(
         "modules/",
         ModuleViewSet.as_view({"get": "list", "post": "create"}),
@@ -210,6 +269,16 @@ urlpatterns = [
         ),
         name="module-detail",
     ),
+    path(
+        "modules/reorder/",
+        ModuleViewSet.as_view({"post": "reorder"}),
+        name="module-reorder",
+    ),
+    path(
+        "modules/<uuid:pk>/move/",
+        ModuleViewSet.as_view({"post": "move"}),
+        name="module-move",
+    ),
     path(
         "units/",
         UnitViewSet.as_view({"get": "list", "post": "create"}),
@@ -222,6 +291,16 @@ urlpatterns = [
         ),
         name="unit-detail",
     ),
+    path(
+        "units/reorder/",
+        UnitViewSet.as_view({"post": "reorder"}),
+        name="unit-reorder",
+    ),
+    path(
+        "units/<uuid:pk>/move/",
+        UnitViewSet.as_view({"post": "move"}),
+        name="unit-move",
+    ),
     path(
         "lessons/",
         LessonViewSet.as_view({"get": "list", "post": "create"}),
@@ -234,6 +313,16 @@ urlpatterns = [
         ),
         name="lesson-detail",
     ),
+    path(
+        "lessons/reorder/",
+        LessonViewSet.as_view({"post": "reorder"}),
+        name="lesson-reorder",
+    ),
+    path(
+        "lessons/<uuid:pk>/move/",
+        LessonViewSet.as_view({"post": "move"}),
+        name="lesson-move",
+    ),
     path(
         "micro-lessons/",
         MicroLessonViewSet.as_view({"get": "list", "post": "create"}),
@@ -246,6 +335,16 @@ urlpatterns = [
         ),
         name="micro-lesson-detail",
     ),
+    path(
+        "micro-lessons/reorder/",
+        MicroLessonViewSet.as_view({"post": "reorder"}),
+        name="micro-lesson-reorder",
+    ),
+    path(
+        "micro-lessons/<uuid:pk>/move/",
+        MicroLessonViewSet.as_view({"post": "move"}),
+        name="micro-lesson-move",
+    ),
     path(
         "teacher-enrollments/",
         TeacherEnrollmentViewSet.as_view({"get": "list", "post": "create"}),
@@ -258,6 +357,16 @@ urlpatterns = [
         ),
         name="teacher-enrollment-detail",
     ),
+    path(
+        "teacher-enrollments/matrix/",
+        TeacherEnrollmentViewSet.as_view({"get": "matrix"}),
+        name="teacher-enrollment-matrix",
+    ),
+    path(
+        "teacher-enrollments/bulk-assign/",
+        TeacherEnrollmentViewSet.as_view({"post": "bulk_assign"}),
+        name="teacher-enrollment-bulk-assign",
+    ),
     path(
         "student-enrollments/",
         StudentEnrollmentViewSet.as_view({"get": "list", "post": "create"}),
@@ -270,11 +379,31 @@ urlpatterns = [
         ),
         name="student-enrollment-detail",
     ),
+    path(
+        "student-enrollments/import/",
+        StudentEnrollmentViewSet.as_view({"post": "import_file"}),
+        name="student-enrollment-import",
+    ),
     path(
         "student-enrollments/by-section/",
         StudentEnrollmentViewSet.as_view({"get": "by_section"}),
         name="student-enrollment-by-section",
     ),
+    path(
+        "academic-sessions/",
+        AcademicSessionViewSet.as_view({"get": "list", "post": "create"}),
+        name="academic-session-list",
+    ),
+    path(
+        "academic-sessions/<uuid:pk>/",
+        AcademicSessionViewSet.as_view({"get": "retrieve", "patch": "partial_update"}),
+        name="academic-session-detail",
+    ),
+    path(
+        "academic-sessions/<uuid:pk>/rollover/",
+        AcademicSessionViewSet.as_view({"post": "rollover"}),
+        name="academic-session-rollover",
+    ),
     path(
         "fees/institution/",
         InstitutionFeeViewSet.as_view({"get": "list", "post": "create"}),
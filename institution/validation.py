@@ -0,0 +1,79 @@
+"""
+Batch validation for models whose clean() depends on related rows.
+
+A model opts in by mixing in BatchValidationMixin and implementing:
+- ``build_validation_context(instances)``: load everything a batch of
+  instances refers to in a fixed number of queries.
+- ``clean_with_context(context)``: check one instance against that context
+  without touching the database.
+
+``clean()`` keeps working for single instances (admin, serializers); bulk
+write paths call ``validate_batch`` instead of calling clean() in a loop.
+"""
+
+from django.core.exceptions import ValidationError
+
+
+class BatchValidationMixin:
+    @classmethod
+    def build_validation_context(cls, instances):
+        return {}
+
+    def clean_with_context(self, context):
+        pass
+
+    def clean(self):
+        super().clean()
+        coerce_relations([self])
+        self.clean_with_context(self.build_validation_context([self]))
+
+
+def coerce_relations(instances):
+    """
+    Convert raw foreign key values (e.g. UUID strings from request data) to
+    their Python type so they compare equal to the ids loaded from the
+    database.
+    """
+    for instance in instances:
+        for field in instance._meta.concrete_fields:
+            if not field.is_relation:
+                continue
+            value = getattr(instance, field.attname)
+            if value is None:
+                continue
+            converted = field.to_python(value)
+            if converted != value:
+                setattr(instance, field.attname, converted)
+
+
+def lookup(model, instances, attname, *fields):
+    """
+    Map each distinct ``attname`` value of ``instances`` to ``fields`` of the
+    ``model`` row it points at, in one query. Single fields map to the bare
+    value, several fields to a tuple.
+    """
+    ids = {getattr(instance, attname) for instance in instances} - {None}
+    if not ids:
+        return {}
+    rows = model.objects.filter(pk__in=ids).values_list("pk", *fields)
+    if len(fields) == 1:
+        return dict(rows)
+    return {row[0]: row[1:] for row in rows}
+
+
+def validate_batch(instances):
+    """
+    Validate ``instances`` (all of one model) and return the failures as
+    ``[{"index": <position in instances>, "errors": [messages]}]``.
+    """
+    if not instances:
+        return []
+    coerce_relations(instances)
+    context = type(instances[0]).build_validation_context(instances)
+    errors = []
+    for index, instance in enumerate(instances):
+        try:
+            instance.clean_with_context(context)
+        except ValidationError as e:
+            errors.append({"index": index, "errors": e.messages})
+    return errors
@@ -10,6 +10,31 @@ from rest_framework.exceptions import ValidationError
 from django.core.exceptions import ObjectDoesNotExist
 from uuid import UUID
 from rest_framework.decorators import action
+from institution.catalog_search import (
+    DEFAULT_LIMIT as DEFAULT_SEARCH_LIMIT,
+    MAX_LIMIT as MAX_SEARCH_LIMIT,
+    SEARCH_KINDS,
+    search_catalog,
+)
+from institution.curriculum import LEVELS as CURRICULUM_LEVELS, get_curriculum_tree
+from institution.enrollment_import import (
+    FILE_TYPES as ENROLLMENT_FILE_TYPES,
+    store_upload,
+)
+from institution.jobs import AcademicSessionRolloverJob, StudentEnrollmentImportJob
+from institution.ordering import move as move_item, reorder as reorder_items
+from institution.provisioning import (
+    load_template,
+    provision_curriculum,
+    template_from_institution,
+)
+from institution.teacher_assignments import (
+    assignment_matrix,
+    bulk_assign as bulk_assign_teachers,
+)
+from institution.visibility import visible_ids
+from job_management.serializers import JobSerializer
+from job_management.services import submit_job
 
 
 class InstitutionPermission(permissions.BasePermission):
@@ -88,7 +113,52 @@ class GlobalMicroLessonViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, InstitutionPermission]
 
 
-class CurriculumTrackViewSet(viewsets.ModelViewSet):
+class UserAnnotationViewMixin:
+    """
+    Annotate listed and retrieved rows with the per-user values of a
+    serializer using UserAnnotationMixin, so a page costs one query.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if not hasattr(serializer_class, "annotate_for_user"):
+            return queryset
+        return serializer_class.annotate_for_user(queryset, self.request.user)
+
+
+class ReorderMixin:
+    """
+    ``reorder`` (POST {"ids": [...]}, the full ordered list of siblings) and
+    ``move`` (POST {"after": <sibling id or null>}) for ordered curriculum
+    items. Both only touch rows visible through get_queryset().
+    """
+
+    @action(detail=False, methods=["post"])
+    def reorder(self, request):
+        ids = request.data.get("ids")
+        if not isinstance(ids, list):
+            raise ValidationError({"ids": "Provide the ordered list of ids."})
+        try:
+            ids = [UUID(str(pk)) for pk in ids]
+        except ValueError:
+            raise ValidationError({"ids": "Invalid UUID format in ids."})
+        items = reorder_items(self.get_queryset(), ids)
+        return Response(self.get_serializer(items, many=True).data)
+
+    @action(detail=True, methods=["post"])
+    def move(self, request, pk=None):
+        after = request.data.get("after")
+        if after is not None:
+            try:
+                after = UUID(str(after))
+            except ValueError:
+                raise ValidationError({"after": "Invalid UUID format for after."})
+        item = move_item(self.get_object(), after)
+        return Response(self.get_serializer(item).data)
+
+
+class CurriculumTrackViewSet(ReorderMixin, viewsets.ModelViewSet):
     serializer_class = CurriculumTrackSerializer
     permission_classes = [IsAuthenticated, IsInstitutionAdmin]
 
@@ -112,7 +182,7 @@ class CurriculumTrackViewSet(viewsets.ModelViewSet):
         serializer.save(institution_info=institution)
 
 
-class SectionViewSet(viewsets.ModelViewSet):
+class SectionViewSet(UserAnnotationViewMixin, ReorderMixin, viewsets.ModelViewSet):
     serializer_class = SectionSerializer
     permission_classes = [IsAuthenticated, IsInstitutionAdmin]
 
@@ -120,7 +190,9 @@ class SectionViewSet(viewsets.ModelViewSet):
         institution = InstitutionInfo.objects.filter(admin=self.request.user).first()
         if not institution:
             return Section.objects.none()
-        return Section.objects.filter(curriculum_track__institution_info=institution)
+        return Section.objects.filter(
+            curriculum_track__institution_info=institution
+        ).select_related("curriculum_track__name")
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -136,7 +208,7 @@ class SectionViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
-class StreamViewSet(viewsets.ModelViewSet):
+class StreamViewSet(ReorderMixin, viewsets.ModelViewSet):
     serializer_class = StreamSerializer
     permission_classes = [IsAuthenticated, IsInstitutionAdmin]
 
@@ -160,7 +232,7 @@ class StreamViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
-class SubjectViewSet(viewsets.ModelViewSet):
+class SubjectViewSet(ReorderMixin, viewsets.ModelViewSet):
     serializer_class = SubjectSerializer
     permission_classes = [IsAuthenticated, IsInstitutionAdmin]
 
@@ -200,7 +272,7 @@ class SubjectViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
-class ModuleViewSet(viewsets.ModelViewSet):
+class ModuleViewSet(ReorderMixin, viewsets.ModelViewSet):
     serializer_class = ModuleSerializer
     permission_classes = [IsAuthenticated, IsInstitutionAdmin | IsTeacher]
 
@@ -210,9 +282,7 @@ class ModuleViewSet(viewsets.ModelViewSet):
             institution = InstitutionInfo.objects.filter(admin=user).first()
             if not institution:
                 return Module.objects.none()
-            return Module.objects.filter(
-                subject__stream__curriculum_track__institution_info=institution
-            )
+            return Module.objects.filter(institution=institution)
         elif user.is_teacher:
             institution_id = self.request.query_params.get("institution_id")
             if institution_id:
@@ -231,7 +301,7 @@ class ModuleViewSet(viewsets.ModelViewSet):
                 return Module.objects.filter(
                     subject__teacher_enrollments__user=user,
                     subject__teacher_enrollments__is_active=True,
-                    subject__stream__curriculum_track__institution_info__id=institution_id,
+                    institution_id=institution_id,
                     is_active=True,
                 ).distinct()
             return Module.objects.filter(
@@ -316,7 +386,7 @@ class ModuleViewSet(viewsets.ModelViewSet):
             serializer.save()
 
 
-class UnitViewSet(viewsets.ModelViewSet):
+class UnitViewSet(ReorderMixin, viewsets.ModelViewSet):
     serializer_class = UnitSerializer
     permission_classes = [IsAuthenticated, IsInstitutionAdmin | IsTeacher]
 
@@ -326,9 +396,7 @@ class UnitViewSet(viewsets.ModelViewSet):
             institution = InstitutionInfo.objects.filter(admin=user).first()
             if not institution:
                 return Unit.objects.none()
-            return Unit.objects.filter(
-                module__subject__stream__curriculum_track__institution_info=institution
-            )
+            return Unit.objects.filter(institution=institution)
         elif user.is_teacher:
             institution_id = self.request.query_params.get("institution_id")
             if institution_id:
@@ -345,14 +413,14 @@ class UnitViewSet(viewsets.ModelViewSet):
                         {"institution_id": "You are not enrolled in this institution."}
                     )
                 return Unit.objects.filter(
-                    module__subject__teacher_enrollments__user=user,
-                    module__subject__teacher_enrollments__is_active=True,
-                    module__subject__stream__curriculum_track__institution_info__id=institution_id,
+                    subject__teacher_enrollments__user=user,
+                    subject__teacher_enrollments__is_active=True,
+                    institution_id=institution_id,
                     is_active=True,
                 ).distinct()
             return Unit.objects.filter(
-                module__subject__teacher_enrollments__user=user,
-                module__subject__teacher_enrollments__is_active=True,
+                subject__teacher_enrollments__user=user,
+                subject__teacher_enrollments__is_active=True,
                 is_active=True,
             ).distinct()
         return Unit.objects.none()
@@ -422,17 +490,17 @@ class UnitViewSet(viewsets.ModelViewSet):
                 )
             module = serializer.validated_data["module"]
             if not TeacherEnrollment.objects.filter(
-                user=user, subjects=module.subject, is_active=True
+                user=user, subjects=module.subject_id, is_active=True
             ).exists():
                 raise ValidationError("You are not enrolled to teach this subject.")
-            if module.subject.stream_curriculum_track.institution_info != institution:
+            if module.institution_id != institution.id:
                 raise ValidationError(
                     "Module does not belong to the specified institution."
                 )
             serializer.save()
 
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(ReorderMixin, viewsets.ModelViewSet):
     serializer_class = LessonSerializer
     permission_classes = [IsAuthenticated, IsInstitutionAdmin | IsTeacher]
 
@@ -442,9 +510,7 @@ class LessonViewSet(viewsets.ModelViewSet):
             institution = InstitutionInfo.objects.filter(admin=user).first()
             if not institution:
                 return Lesson.objects.none()
-            return Lesson.objects.filter(
-                unit__module__subject__stream__curriculum_track__institution_info=institution
-            )
+            return Lesson.objects.filter(institution=institution)
         elif user.is_teacher:
             institution_id = self.request.query_params.get("institution_id")
             if institution_id:
@@ -461,14 +527,14 @@ class LessonViewSet(viewsets.ModelViewSet):
                         {"institution_id": "You are not enrolled in this institution."}
                     )
                 return Lesson.objects.filter(
-                    unit__module__subject__teacher_enrollments__user=user,
-                    unit__module__subject__teacher_enrollments__is_active=True,
-                    unit__module__subject__stream__curriculum_track__institution_info__id=institution_id,
+                    subject__teacher_enrollments__user=user,
+                    subject__teacher_enrollments__is_active=True,
+                    institution_id=institution_id,
                     is_active=True,
                 ).distinct()
             return Lesson.objects.filter(
-                unit__module__subject__teacher_enrollments__user=user,
-                unit__module__subject__teacher_enrollments__is_active=True,
+                subject__teacher_enrollments__user=user,
+                subject__teacher_enrollments__is_active=True,
                 is_active=True,
             ).distinct()
         return Lesson.objects.none()
@@ -538,20 +604,17 @@ class LessonViewSet(viewsets.ModelViewSet):
                 )
             unit = serializer.validated_data["unit"]
             if not TeacherEnrollment.objects.filter(
-                user=user, subjects=unit.module.subject, is_active=True
+                user=user, subjects=unit.subject_id, is_active=True
             ).exists():
                 raise ValidationError("You are not enrolled to teach this subject.")
-            if (
-                unit.module.subject.stream.curriculum_track.institution_info
-                != institution
-            ):
+            if unit.institution_id != institution.id:
                 raise ValidationError(
                     "Unit does not belong to the specified institution."
                 )
             serializer.save()
 
 
-class MicroLessonViewSet(viewsets.ModelViewSet):
+class MicroLessonViewSet(ReorderMixin, viewsets.ModelViewSet):
     serializer_class = MicroLessonSerializer
     permission_classes = [IsAuthenticated, IsInstitutionAdmin | IsTeacher]
 
@@ -561,9 +624,7 @@ class MicroLessonViewSet(viewsets.ModelViewSet):
             institution = InstitutionInfo.objects.filter(admin=user).first()
             if not institution:
                 return MicroLesson.objects.none()
-            return MicroLesson.objects.filter(
-                lesson__unit__module__subject__stream__curriculum_track__institution_info=institution
-            )
+            return MicroLesson.objects.filter(institution=institution)
         elif user.is_teacher:
             institution_id = self.request.query_params.get("institution_id")
             if institution_id:
@@ -580,14 +641,14 @@ class MicroLessonViewSet(viewsets.ModelViewSet):
                         {"institution_id": "You are not enrolled in this institution."}
                     )
                 return MicroLesson.objects.filter(
-                    lesson__unit__module__subject__teacher_enrollments__user=user,
-                    lesson__unit__module__subject__teacher_enrollments__is_active=True,
-                    lesson__unit__module__subject__stream__curriculum_track__institution_info__id=institution_id,
+                    subject__teacher_enrollments__user=user,
+                    subject__teacher_enrollments__is_active=True,
+                    institution_id=institution_id,
                     is_active=True,
                 ).distinct()
             return MicroLesson.objects.filter(
-                lesson__unit__module__subject__teacher_enrollments__user=user,
-                lesson__unit__module__subject__teacher_enrollments__is_active=True,
+                subject__teacher_enrollments__user=user,
+                subject__teacher_enrollments__is_active=True,
                 is_active=True,
             ).distinct()
         return MicroLesson.objects.none()
@@ -657,13 +718,10 @@ class MicroLessonViewSet(viewsets.ModelViewSet):
                 )
             lesson = serializer.validated_data["lesson"]
             if not TeacherEnrollment.objects.filter(
-                user=user, subjects=lesson.unit.module.subject, is_active=True
+                user=user, subjects=lesson.subject_id, is_active=True
             ).exists():
                 raise ValidationError("You are not enrolled to teach this subject.")
-            if (
-                lesson.unit.module.subject.stream.curriculum_track.institution_info
-                != institution
-            ):
+            if lesson.institution_id != institution.id:
                 raise ValidationError(
                     "Lesson does not belong to the specified institution."
                 )
@@ -693,6 +751,27 @@ class TeacherEnrollmentViewSet(viewsets.ModelViewSet):
             raise ValidationError("No institution found for this admin.")
         serializer.save(institution=institution)
 
+    @action(detail=False, methods=["get"])
+    def matrix(self, request):
+        """Section x subject grid of the teachers assigned to each cell."""
+        institution = InstitutionInfo.objects.filter(admin=request.user).first()
+        if not institution:
+            raise ValidationError("No institution found for this admin.")
+        return Response(assignment_matrix(institution))
+
+    @action(detail=False, methods=["post"], url_path="bulk-assign")
+    def bulk_assign(self, request):
+        """
+        Replace the curriculum tracks, sections and/or subjects of several
+        enrollments at once: {"assignments": [{"enrollment": id,
+        "section": [ids], ...}]}. Omitted fields are kept.
+        """
+        institution = InstitutionInfo.objects.filter(admin=request.user).first()
+        if not institution:
+            raise ValidationError("No institution found for this admin.")
+        counts = bulk_assign_teachers(institution, request.data.get("assignments"))
+        return Response({"updated": counts})
+
 
 class StudentEnrollmentViewSet(viewsets.ModelViewSet):
     serializer_class = StudentEnrollmentSerializer
@@ -722,6 +801,35 @@ class StudentEnrollmentViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated()]
         return super().get_permissions()
 
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_file(self, request):
+        """
+        Enroll the students of an uploaded CSV/XLSX admission file in the
+        background. Poll the returned job for progress and per-row errors.
+        """
+        institution = InstitutionInfo.objects.filter(admin=request.user).first()
+        if not institution:
+            raise ValidationError("No institution found for this admin.")
+        upload = request.FILES.get("file")
+        if not upload:
+            raise ValidationError({"file": "Upload a .csv or .xlsx file."})
+        if not upload.name.lower().endswith(ENROLLMENT_FILE_TYPES):
+            raise ValidationError({"file": "Upload a .csv or .xlsx file."})
+        job = submit_job(
+            StudentEnrollmentImportJob.kind,
+            request.user,
+            params={
+                "institution_id": str(institution.id),
+                "file": store_upload(request.user, upload),
+                "filename": upload.name,
+            },
+            institution=institution,
+        )
+        return Response(
+            JobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
     @action(detail=False, methods=["get"], url_path="by-section")
     def by_section(self, request):
         user = request.user
@@ -768,6 +876,54 @@ class StudentEnrollmentViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+class AcademicSessionViewSet(viewsets.ModelViewSet):
+    serializer_class = AcademicSessionSerializer
+    permission_classes = [IsAuthenticated, IsInstitutionAdmin]
+
+    def get_queryset(self):
+        institution = InstitutionInfo.objects.filter(admin=self.request.user).first()
+        if not institution:
+            return AcademicSession.objects.none()
+        return AcademicSession.objects.filter(institution=institution)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        institution = InstitutionInfo.objects.filter(admin=self.request.user).first()
+        if institution:
+            context["institution"] = institution
+        return context
+
+    def perform_create(self, serializer):
+        if "institution" not in serializer.context:
+            raise ValidationError("No institution found for this admin.")
+        serializer.save()
+
+    @action(detail=True, methods=["post"])
+    def rollover(self, request, pk=None):
+        """
+        Close this session in the background: archive its attendance, quiz,
+        homework and exam rows, open ``next_session`` and apply
+        ``promotions`` ([{"from_section", "to_section"}]) except to the
+        students in ``hold_back``.
+        """
+        session = self.get_object()
+        job = submit_job(
+            AcademicSessionRolloverJob.kind,
+            request.user,
+            params={
+                "session_id": str(session.pk),
+                "next_session": request.data.get("next_session"),
+                "promotions": request.data.get("promotions", []),
+                "hold_back": request.data.get("hold_back", []),
+            },
+            institution=session.institution,
+        )
+        return Response(
+            JobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
 # TO GET THE CURRICULUM TRACKS, SECTIONS AND SUBJECTS FOR THE LOGGED IN USER
 
 
@@ -776,41 +932,20 @@ class MyCurriculumTrackViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_teacher:
-            return CurriculumTrack.objects.filter(
-                teacher_enrollments__user=user,
-                teacher_enrollments__is_active=True,
-                is_active=True,
-            ).distinct()
-        elif user.is_student:
-            return CurriculumTrack.objects.filter(
-                student_enrollments__user=user,
-                student_enrollments__is_active=True,
-                is_active=True,
-            ).distinct()
-        return CurriculumTrack.objects.none()
+        return CurriculumTrack.objects.filter(
+            pk__in=visible_ids(self.request.user, "curriculum_track"),
+            is_active=True,
+        )
 
 
-class MySectionViewSet(viewsets.ReadOnlyModelViewSet):
+class MySectionViewSet(UserAnnotationViewMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = SectionSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_teacher:
-            return Section.objects.filter(
-                teacher_enrollments__user=user,
-                teacher_enrollments__is_active=True,
-                is_active=True,
-            ).distinct()
-        elif user.is_student:
-            return Section.objects.filter(
-                student_enrollments__user=user,
-                student_enrollments__is_active=True,
-                is_active=True,
-            ).distinct()
-        return Section.objects.none()
+        return Section.objects.filter(
+            pk__in=visible_ids(self.request.user, "section"), is_active=True
+        ).select_related("curriculum_track__name")
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -823,21 +958,10 @@ class MySubjectViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_teacher:
-            return Subject.objects.filter(
-                teacher_enrollments__user=user,
-                teacher_enrollments__is_active=True,
-                is_active=True,
-            ).distinct()
-        elif user.is_student:
-            # Students get subjects via their enrolled section's stream
-            return Subject.objects.filter(
-                stream__section__student_enrollments__user=user,
-                stream__section__student_enrollments__is_active=True,
-                is_active=True,
-            ).distinct()
-        return Subject.objects.none()
+        # Students see the subjects of their section's streams
+        return Subject.objects.filter(
+            pk__in=visible_ids(self.request.user, "subject"), is_active=True
+        )
 
 
 class MySubjectByInstitutionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -845,7 +969,6 @@ class MySubjectByInstitutionViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
         institution_id = self.request.query_params.get("institution_id")
 
         if not institution_id:
@@ -857,21 +980,153 @@ class MySubjectByInstitutionViewSet(viewsets.ReadOnlyModelViewSet):
                 {"institution_id": "Invalid UUID format for institution ID."}
             )
 
-        if user.is_teacher:
-            return Subject.objects.filter(
-                teacher_enrollments__user=user,
-                teacher_enrollments__is_active=True,
-                is_active=True,
-                stream__curriculum_track__institution_info__id=institution_id,
-            ).distinct()
-        elif user.is_student:
-            return Subject.objects.filter(
-                stream__section__student_enrollments__user=user,
-                stream__section__student_enrollments__is_active=True,
-                is_active=True,
-                stream__curriculum_track__institution_info__id=institution_id,
-            ).distinct()
-        return Subject.objects.none()
+        return Subject.objects.filter(
+            pk__in=visible_ids(self.request.user, "subject", institution_id),
+            is_active=True,
+        )
+
+
+class CatalogSearchView(APIView):
+    """
+    Ranked prefix search over the Global* catalog, for autocomplete:
+    ?q=<text>[&type=subject,lesson][&institution_type=<type>][&limit=20]
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            raise ValidationError({"q": "Search text is required."})
+        kinds = [
+            kind for kind in request.query_params.get("type", "").split(",") if kind
+        ]
+        if set(kinds) - set(SEARCH_KINDS):
+            raise ValidationError(
+                {"type": f"Type must be among: {', '.join(SEARCH_KINDS)}."}
+            )
+        institution_type = request.query_params.get("institution_type") or None
+        if institution_type and institution_type not in InstitutionType.values:
+            raise ValidationError({"institution_type": "Invalid institution type."})
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_SEARCH_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            raise ValidationError(
+                {"limit": f"Limit must be between 1 and {MAX_SEARCH_LIMIT}."}
+            )
+
+        results = search_catalog(text, kinds, institution_type, limit)
+        return Response(
+            [
+                {
+                    "type": row["kind"],
+                    "id": str(row["id"]),
+                    "title": row["label"],
+                    "institution_type": row["institution_type"],
+                    "rank": round(row["rank"], 4),
+                }
+                for row in results
+            ]
+        )
+
+
+class CurriculumTreeView(APIView):
+    """
+    Whole curriculum tree of an institution, or the subtree under one node
+    (?level=subject&root_id=<uuid>), with Global* names resolved.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, institution_id):
+        user = request.user
+        if not (
+            InstitutionInfo.objects.filter(id=institution_id, admin=user).exists()
+            or InstitutionMembership.objects.filter(
+                user=user, institution_id=institution_id
+            ).exists()
+        ):
+            return Response(
+                {"error": "You are not a member of this institution."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        level = request.query_params.get("level", "curriculum_track")
+        if level not in CURRICULUM_LEVELS:
+            raise ValidationError(
+                {"level": f"Level must be one of: {', '.join(CURRICULUM_LEVELS)}."}
+            )
+        root_id = request.query_params.get("root_id")
+        if root_id:
+            try:
+                root_id = str(UUID(root_id))
+            except ValueError:
+                raise ValidationError({"root_id": "Invalid UUID format for root ID."})
+        active_only = request.query_params.get("active_only", "").lower() in (
+            "1",
+            "true",
+        )
+
+        tree = get_curriculum_tree(institution_id, level, root_id, active_only)
+        if root_id and not tree:
+            return Response(
+                {"error": f"No {level} with this ID in the institution."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response({"level": level, "results": tree})
+
+
+class CurriculumImportView(APIView):
+    """
+    Create an institution's curriculum in one request, from a YAML/JSON
+    template (uploaded as ``file`` or posted as ``template``) or by cloning
+    another institution the user administers (``source_institution``).
+    """
+
+    permission_classes = [IsAuthenticated, IsInstitutionAdmin]
+
+    def post(self, request, institution_id):
+        institution = InstitutionInfo.objects.filter(
+            id=institution_id, admin=request.user
+        ).first()
+        if not institution:
+            return Response(
+                {"error": "You are not the admin of this institution."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        source_id = request.data.get("source_institution")
+        upload = request.FILES.get("file")
+        if source_id:
+            try:
+                source_id = UUID(str(source_id))
+            except ValueError:
+                raise ValidationError(
+                    {"source_institution": "Invalid UUID format for institution ID."}
+                )
+            if not InstitutionInfo.objects.filter(
+                id=source_id, admin=request.user
+            ).exists():
+                return Response(
+                    {"error": "You are not the admin of the source institution."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            template = template_from_institution(source_id)
+        elif upload:
+            template = load_template(upload.read(), upload.name)
+        elif isinstance(request.data.get("template"), dict):
+            template = request.data["template"]
+        elif isinstance(request.data.get("template"), str):
+            template = load_template(request.data["template"])
+        else:
+            raise ValidationError(
+                {"template": "Provide a template, a file or a source_institution."}
+            )
+
+        created = provision_curriculum(institution, template)
+        return Response({"created": created}, status=status.HTTP_201_CREATED)
 
 
 # ............................#
@@ -0,0 +1,167 @@
+"""
+Per-user visibility index behind the My* endpoints.
+
+``UserVisibility`` holds, for every teacher and student, the curriculum
+tracks, sections and subjects their active enrollments give them. The My*
+endpoints read it through partial covering indexes with a semi-join
+(``pk__in``), so they need neither DISTINCT nor the enrollment join chains.
+
+Rows are rebuilt per user by ``refresh_user_visibility``: the enrollment
+signals in institution.signals call it, and bulk writes that bypass signals
+(bulk_create, queryset.update) must call it themselves.
+"""
+
+from django.apps import apps as global_apps
+from django.db import transaction
+
+TEACHER = "teacher"
+STUDENT = "student"
+
+# Level -> (UserVisibility column, filters selecting rows of that level)
+LEVEL_FILTERS = {
+    "curriculum_track": (
+        "curriculum_track_id",
+        {"section__isnull": True, "subject__isnull": True},
+    ),
+    "section": ("section_id", {"section__isnull": False, "subject__isnull": True}),
+    "subject": ("subject_id", {"subject__isnull": False}),
+}
+
+
+def _visibility_rows(user_ids, apps):
+    """Set of (user, institution, track, section, subject, role) tuples."""
+    CurriculumTrack = apps.get_model("institution", "CurriculumTrack")
+    Section = apps.get_model("institution", "Section")
+    Subject = apps.get_model("institution", "Subject")
+    StudentEnrollment = apps.get_model("institution", "StudentEnrollment")
+
+    rows = set()
+    teaching = {
+        "teacher_enrollments__user_id__in": user_ids,
+        "teacher_enrollments__is_active": True,
+    }
+    for user_id, track_id, institution_id in CurriculumTrack.objects.filter(
+        **teaching
+    ).values_list("teacher_enrollments__user_id", "id", "institution_info_id"):
+        rows.add((user_id, institution_id, track_id, None, None, TEACHER))
+    for user_id, section_id, track_id, institution_id in Section.objects.filter(
+        **teaching
+    ).values_list(
+        "teacher_enrollments__user_id",
+        "id",
+        "curriculum_track_id",
+        "curriculum_track__institution_info_id",
+    ):
+        rows.add((user_id, institution_id, track_id, section_id, None, TEACHER))
+    for (
+        user_id,
+        subject_id,
+        section_id,
+        track_id,
+        institution_id,
+    ) in Subject.objects.filter(**teaching).values_list(
+        "teacher_enrollments__user_id",
+        "id",
+        "stream__section_id",
+        "stream__curriculum_track_id",
+        "stream__curriculum_track__institution_info_id",
+    ):
+        rows.add((user_id, institution_id, track_id, section_id, subject_id, TEACHER))
+
+    for (
+        user_id,
+        track_id,
+        section_id,
+        institution_id,
+    ) in StudentEnrollment.objects.filter(
+        user_id__in=user_ids, is_active=True
+    ).values_list(
+        "user_id",
+        "curriculum_track_id",
+        "section_id",
+        "curriculum_track__institution_info_id",
+    ):
+        rows.add((user_id, institution_id, track_id, None, None, STUDENT))
+        rows.add((user_id, institution_id, track_id, section_id, None, STUDENT))
+    # Students see the subjects of the streams of their section
+    for (
+        user_id,
+        subject_id,
+        section_id,
+        track_id,
+        institution_id,
+    ) in Subject.objects.filter(
+        stream__section__student_enrollments__user_id__in=user_ids,
+        stream__section__student_enrollments__is_active=True,
+    ).values_list(
+        "stream__section__student_enrollments__user_id",
+        "id",
+        "stream__section_id",
+        "stream__curriculum_track_id",
+        "stream__curriculum_track__institution_info_id",
+    ):
+        rows.add((user_id, institution_id, track_id, section_id, subject_id, STUDENT))
+    return rows
+
+
+def refresh_user_visibility(user_ids, apps=global_apps):
+    """
+    Rebuild the visibility rows of ``user_ids`` from their enrollments.
+    Takes an app registry so migrations can pass their historical one.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    UserVisibility = apps.get_model("institution", "UserVisibility")
+    rows = _visibility_rows(user_ids, apps)
+    with transaction.atomic():
+        UserVisibility.objects.filter(user_id__in=user_ids).delete()
+        UserVisibility.objects.bulk_create(
+            [
+                UserVisibility(
+                    user_id=user_id,
+                    institution_id=institution_id,
+                    curriculum_track_id=track_id,
+                    section_id=section_id,
+                    subject_id=subject_id,
+                    role=role,
+                )
+                for user_id, institution_id, track_id, section_id, subject_id, role in rows
+            ],
+            batch_size=1000,
+        )
+
+
+def rebuild_user_visibility(apps=global_apps, batch_size=500, stdout=None):
+    """Rebuild the rows of every enrolled user, ``batch_size`` users at a time."""
+    TeacherEnrollment = apps.get_model("institution", "TeacherEnrollment")
+    StudentEnrollment = apps.get_model("institution", "StudentEnrollment")
+    user_ids = sorted(
+        set(TeacherEnrollment.objects.values_list("user_id", flat=True))
+        | set(StudentEnrollment.objects.values_list("user_id", flat=True)),
+        key=str,
+    )
+    for start in range(0, len(user_ids), batch_size):
+        refresh_user_visibility(user_ids[start : start + batch_size], apps)
+    if stdout:
+        stdout.write(f"Visibility rebuilt for {len(user_ids)} users")
+
+
+def visible_ids(user, level, institution_id=None):
+    """
+    Subquery of the ids of ``level`` ("curriculum_track", "section" or
+    "subject") visible to ``user``, as a teacher if they are one, otherwise
+    as a student. Use it as ``Model.objects.filter(pk__in=...)``.
+    """
+    UserVisibility = global_apps.get_model("institution", "UserVisibility")
+    if user.is_teacher:
+        role = TEACHER
+    elif user.is_student:
+        role = STUDENT
+    else:
+        return UserVisibility.objects.none().values("pk")
+    column, filters = LEVEL_FILTERS[level]
+    queryset = UserVisibility.objects.filter(user=user, role=role, **filters)
+    if institution_id:
+        queryset = queryset.filter(institution_id=institution_id)
+    return queryset.values(column)
@@ -0,0 +1,31 @@
+from django.contrib import admin
+
+from job_management.models import Job, JobChunk
+
+
+class JobChunkInline(admin.TabularInline):
+    model = JobChunk
+    extra = 0
+    fields = ("index", "status", "attempts", "error", "updated_at")
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "kind",
+        "status",
+        "institution",
+        "created_by",
+        "total_chunks",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("kind", "status")
+    search_fields = ("id", "created_by__email", "institution__name")
+    readonly_fields = ("created_at", "updated_at", "started_at", "finished_at")
+    ordering = ("-created_at",)
+    inlines = [JobChunkInline]
+    list_per_page = 25
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobManagementConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "job_management"
+
+    def ready(self):
+        # Job handlers live in <app>/jobs.py and register themselves on import
+        autodiscover_modules("jobs")
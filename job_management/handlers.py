@@ -0,0 +1,70 @@
+"""
+Registry of background job kinds.
+
+Apps define handlers in ``<app>/jobs.py`` (imported on startup by
+JobManagementConfig.ready) and decorate them with ``@register``:
+
+    @register
+    class AttendanceExportJob(JobHandler):
+        kind = "attendance_export"
+
+        def chunks(self, job): ...
+        def run_chunk(self, job, payload): ...
+        def finalize(self, job, results): ...
+"""
+
+from rest_framework.exceptions import ValidationError
+
+_registry = {}
+
+
+class JobHandler:
+    kind = None
+    label = None
+    # Rows per chunk for handlers that split a list with chunked()
+    chunk_size = 500
+
+    def validate(self, params, user):
+        """Check ``params`` for a submission by ``user`` and return them."""
+        return params
+
+    def chunks(self, job):
+        """Return the JSON payloads of the chunks to run, in order."""
+        return [{}]
+
+    def run_chunk(self, job, payload):
+        """Process one chunk and return a JSON-serializable result."""
+        raise NotImplementedError
+
+    def finalize(self, job, results):
+        """
+        Combine the chunk ``results`` (in chunk order) once all succeeded.
+        May call ``job.attach_artifact``; the return value is stored as
+        ``job.result``.
+        """
+        return None
+
+
+def chunked(items, size):
+    items = list(items)
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def register(handler_class):
+    if not handler_class.kind:
+        raise ValueError(f"{handler_class.__name__} must define a kind.")
+    _registry[handler_class.kind] = handler_class()
+    return handler_class
+
+
+def get_handler(kind):
+    try:
+        return _registry[kind]
+    except KeyError:
+        raise ValidationError({"kind": f"Unknown job kind '{kind}'."})
+
+
+def handler_choices():
+    return [
+        (kind, handler.label or kind) for kind, handler in sorted(_registry.items())
+    ]
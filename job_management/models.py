@@ -0,0 +1,107 @@
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import models
+
+from institution.models import InstitutionInfo, uuid7
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        FINALIZING = "finalizing", "Finalizing"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+        CANCELLED = "cancelled", "Cancelled"
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    kind = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    institution = models.ForeignKey(
+        InstitutionInfo,
+        on_delete=models.CASCADE,
+        related_name="jobs",
+        null=True,
+        blank=True,
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="jobs",
+    )
+    total_chunks = models.PositiveIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    artifact = models.FileField(upload_to="jobs/%Y/%m/", null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_by", "created_at"]),
+            models.Index(fields=["status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (
+            self.Status.COMPLETED,
+            self.Status.FAILED,
+            self.Status.CANCELLED,
+        )
+
+    @property
+    def artifact_name(self):
+        return os.path.basename(self.artifact.name) if self.artifact else None
+
+    def attach_artifact(self, filename, content):
+        """Store ``content`` (bytes or a File) as the downloadable result."""
+        if isinstance(content, bytes):
+            content = ContentFile(content)
+        self.artifact.save(filename, content, save=False)
+
+
+class JobChunk(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+        CANCELLED = "cancelled", "Cancelled"
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="chunks")
+    index = models.PositiveIntegerField()
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Job Chunk"
+        verbose_name_plural = "Job Chunks"
+        ordering = ["index"]
+        unique_together = ("job", "index")
+        indexes = [
+            models.Index(fields=["job", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id} #{self.index} ({self.status})"
@@ -0,0 +1,119 @@
+"""
+Job progress and cancellation flags in Redis.
+
+Chunk tasks bump counters here so that polling a job is a single HGETALL
+instead of an aggregate over its chunks. The chunk rows stay the source of
+truth: when Redis is unavailable or the key expired, callers fall back to
+``progress_from_db``.
+"""
+
+import logging
+import time
+
+import redis
+from django.conf import settings
+from django.db import models
+
+logger = logging.getLogger("job_management")
+
+redis_client = settings.REDIS_CLIENT
+
+PROGRESS_TTL = 60 * 60 * 24
+
+
+def _progress_key(job_id):
+    return f"job:{job_id}:progress"
+
+
+def _cancel_key(job_id):
+    return f"job:{job_id}:cancel"
+
+
+def start(job_id, total):
+    key = _progress_key(job_id)
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hset(
+            key,
+            mapping={
+                "total": total,
+                "completed": 0,
+                "failed": 0,
+                "cancelled": 0,
+                "started_at": time.time(),
+            },
+        )
+        pipe.expire(key, PROGRESS_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not initialise progress for job {job_id}: {str(e)}")
+
+
+def record(job_id, outcome, count=1):
+    """Add ``count`` chunks to the ``outcome`` counter (may be negative)."""
+    try:
+        redis_client.hincrby(_progress_key(job_id), outcome, count)
+    except redis.RedisError as e:
+        logger.warning(f"Could not record progress for job {job_id}: {str(e)}")
+
+
+def cancel(job_id):
+    try:
+        redis_client.setex(_cancel_key(job_id), PROGRESS_TTL, 1)
+    except redis.RedisError as e:
+        logger.warning(f"Could not set cancel flag for job {job_id}: {str(e)}")
+
+
+def is_cancelled(job_id):
+    try:
+        return bool(redis_client.exists(_cancel_key(job_id)))
+    except redis.RedisError:
+        return False
+
+
+def summarize(total, completed, failed, cancelled, started_at=None):
+    finished = completed + failed + cancelled
+    eta_seconds = None
+    if started_at and finished and finished < total:
+        elapsed = time.time() - started_at
+        eta_seconds = round(elapsed / finished * (total - finished), 1)
+    return {
+        "total": total,
+        "completed": completed,
+        "failed": failed,
+        "cancelled": cancelled,
+        "percent": round(finished / total * 100, 1) if total else 0.0,
+        "eta_seconds": eta_seconds,
+    }
+
+
+def progress_from_db(job):
+    counts = dict(
+        job.chunks.values("status")
+        .annotate(count=models.Count("id"))
+        .values_list("status", "count")
+    )
+    started_at = job.started_at.timestamp() if job.started_at else None
+    return summarize(
+        job.total_chunks,
+        counts.get("completed", 0),
+        counts.get("failed", 0),
+        counts.get("cancelled", 0),
+        started_at,
+    )
+
+
+def get_progress(job):
+    try:
+        raw = redis_client.hgetall(_progress_key(job.id))
+    except redis.RedisError:
+        raw = None
+    if not raw:
+        return progress_from_db(job)
+    return summarize(
+        int(raw.get("total", 0)),
+        int(raw.get("completed", 0)),
+        int(raw.get("failed", 0)),
+        int(raw.get("cancelled", 0)),
+        float(raw["started_at"]) if raw.get("started_at") else None,
+    )
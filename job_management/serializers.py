@@ -0,0 +1,72 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from institution.models import InstitutionInfo
+from job_management import progress
+from job_management.handlers import handler_choices
+from job_management.models import Job
+
+
+class JobSubmitSerializer(serializers.Serializer):
+    kind = serializers.CharField(max_length=100)
+    params = serializers.JSONField(required=False, default=dict)
+    institution = serializers.PrimaryKeyRelatedField(
+        queryset=InstitutionInfo.objects.all(), required=False, allow_null=True
+    )
+
+    def validate_kind(self, value):
+        if value not in dict(handler_choices()):
+            raise serializers.ValidationError(f"Unknown job kind '{value}'.")
+        return value
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Params must be an object.")
+        return value
+
+    def validate_institution(self, value):
+        user = self.context["request"].user
+        if (
+            value
+            and value.admin_id != user.id
+            and not user.memberships.filter(institution=value).exists()
+        ):
+            raise serializers.ValidationError(
+                "You are not a member of this institution."
+            )
+        return value
+
+
+class JobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    artifact_name = serializers.CharField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "params",
+            "status",
+            "institution",
+            "progress",
+            "result",
+            "error",
+            "artifact_name",
+            "download_url",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        return progress.get_progress(obj)
+
+    def get_download_url(self, obj):
+        if not obj.artifact:
+            return None
+        url = reverse("job_management:job-download", kwargs={"pk": obj.pk})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,84 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from job_management import progress
+from job_management.handlers import get_handler
+from job_management.models import Job, JobChunk
+from job_management.tasks import finalize_if_done, run_job, run_job_chunk
+
+logger = logging.getLogger("job_management")
+
+
+def submit_job(kind, user, params=None, institution=None):
+    """
+    Create a job of ``kind`` and queue it once the transaction commits.
+    ``user`` is None for jobs started by the scheduler. Without
+    ``institution`` the job belongs to the ``institution_id`` of the
+    validated params, if any.
+    """
+    handler = get_handler(kind)
+    params = handler.validate(params or {}, user)
+    job = Job.objects.create(
+        kind=kind,
+        params=params,
+        institution_id=institution.pk if institution else params.get("institution_id"),
+        created_by=user,
+    )
+    transaction.on_commit(lambda: run_job.delay(str(job.id)))
+    submitter = f"user {user.id}" if user else "the scheduler"
+    logger.info(f"Job {job.id} ({kind}) submitted by {submitter}")
+    return job
+
+
+def cancel_job(job):
+    if job.is_finished:
+        raise ValidationError({"status": f"Job is already {job.status}."})
+    progress.cancel(job.id)
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.Status.CANCELLED,
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    job.refresh_from_db()
+    return job
+
+
+def retry_job(job):
+    """Re-queue the failed chunks of a failed job."""
+    if job.status != Job.Status.FAILED:
+        raise ValidationError({"status": "Only failed jobs can be retried."})
+    with transaction.atomic():
+        job = Job.objects.select_for_update().get(pk=job.pk)
+        if not job.total_chunks:
+            # Failed while planning: start over
+            job.status = Job.Status.PENDING
+            job.error = ""
+            job.finished_at = None
+            job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+            transaction.on_commit(lambda: run_job.delay(str(job.id)))
+            return job
+        chunk_ids = list(
+            job.chunks.filter(status=JobChunk.Status.FAILED).values_list(
+                "id", flat=True
+            )
+        )
+        JobChunk.objects.filter(id__in=chunk_ids).update(
+            status=JobChunk.Status.PENDING, attempts=0, error=""
+        )
+        job.status = Job.Status.RUNNING
+        job.error = ""
+        job.finished_at = None
+        job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+        for chunk_id in chunk_ids:
+            transaction.on_commit(
+                lambda chunk_id=chunk_id: run_job_chunk.delay(chunk_id)
+            )
+        if not chunk_ids:
+            # Every chunk succeeded and finalize() itself failed
+            finalize_if_done(job.id)
+    progress.record(job.id, "failed", -len(chunk_ids))
+    logger.info(f"Job {job.id} retrying {len(chunk_ids)} failed chunks")
+    return job
@@ -0,0 +1,129 @@
+import logging
+
+from celery import shared_task
+from django.db import transaction
+from django.utils import timezone
+
+from job_management import progress
+from job_management.handlers import get_handler
+from job_management.models import Job, JobChunk
+
+logger = logging.getLogger("job_management")
+
+CHUNK_MAX_RETRIES = 3
+
+
+@shared_task
+def run_job(job_id):
+    """Split a pending job into chunks and queue them."""
+    job = Job.objects.get(pk=job_id)
+    if job.status != Job.Status.PENDING:
+        logger.info(f"Job {job_id} is {job.status}, not starting it")
+        return
+    handler = get_handler(job.kind)
+    try:
+        payloads = list(handler.chunks(job))
+    except Exception as e:
+        logger.error(f"Job {job_id} failed while planning chunks: {str(e)}")
+        job.status = Job.Status.FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+        return
+
+    with transaction.atomic():
+        chunks = JobChunk.objects.bulk_create(
+            [
+                JobChunk(job=job, index=index, payload=payload)
+                for index, payload in enumerate(payloads)
+            ]
+        )
+        job.status = Job.Status.RUNNING
+        job.total_chunks = len(chunks)
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "total_chunks", "started_at", "updated_at"])
+    progress.start(job.id, len(chunks))
+    logger.info(f"Job {job_id} ({job.kind}) started with {len(chunks)} chunks")
+
+    if not chunks:
+        finalize_if_done(job.id)
+    for chunk in chunks:
+        run_job_chunk.delay(chunk.id)
+
+
+@shared_task(bind=True, max_retries=CHUNK_MAX_RETRIES)
+def run_job_chunk(self, chunk_id):
+    chunk = JobChunk.objects.select_related("job").get(pk=chunk_id)
+    job = chunk.job
+    if chunk.status not in (JobChunk.Status.PENDING, JobChunk.Status.RUNNING):
+        return
+    if job.status == Job.Status.CANCELLED or progress.is_cancelled(job.id):
+        chunk.status = JobChunk.Status.CANCELLED
+        chunk.save(update_fields=["status", "updated_at"])
+        progress.record(job.id, "cancelled")
+        return
+
+    chunk.status = JobChunk.Status.RUNNING
+    chunk.attempts += 1
+    chunk.save(update_fields=["status", "attempts", "updated_at"])
+    try:
+        result = get_handler(job.kind).run_chunk(job, chunk.payload)
+    except Exception as e:
+        logger.error(
+            f"Job {job.id} chunk {chunk.index} failed "
+            f"(attempt {chunk.attempts}): {str(e)}"
+        )
+        if self.request.retries < self.max_retries:
+            chunk.status = JobChunk.Status.PENDING
+            chunk.save(update_fields=["status", "updated_at"])
+            raise self.retry(exc=e, countdown=10 * 2**self.request.retries)
+        chunk.status = JobChunk.Status.FAILED
+        chunk.error = str(e)
+        chunk.save(update_fields=["status", "error", "updated_at"])
+        progress.record(job.id, "failed")
+    else:
+        chunk.status = JobChunk.Status.COMPLETED
+        chunk.result = result
+        chunk.error = ""
+        chunk.save(update_fields=["status", "result", "error", "updated_at"])
+        progress.record(job.id, "completed")
+    finalize_if_done(job.id)
+
+
+def finalize_if_done(job_id):
+    unfinished = JobChunk.objects.filter(
+        job_id=job_id,
+        status__in=[JobChunk.Status.PENDING, JobChunk.Status.RUNNING],
+    )
+    if unfinished.exists():
+        return
+    # Only the chunk that flips RUNNING -> FINALIZING queues the finalizer
+    claimed = Job.objects.filter(pk=job_id, status=Job.Status.RUNNING).update(
+        status=Job.Status.FINALIZING, updated_at=timezone.now()
+    )
+    if claimed:
+        transaction.on_commit(lambda: finalize_job.delay(str(job_id)))
+
+
+@shared_task
+def finalize_job(job_id):
+    job = Job.objects.get(pk=job_id)
+    if job.status != Job.Status.FINALIZING:
+        return
+    failed = job.chunks.filter(status=JobChunk.Status.FAILED).count()
+    if failed:
+        job.status = Job.Status.FAILED
+        job.error = f"{failed} of {job.total_chunks} chunks failed."
+    else:
+        results = list(job.chunks.order_by("index").values_list("result", flat=True))
+        try:
+            job.result = get_handler(job.kind).finalize(job, results)
+            job.status = Job.Status.COMPLETED
+            job.error = ""
+        except Exception as e:
+            logger.error(f"Job {job_id} failed while finalizing: {str(e)}")
+            job.status = Job.Status.FAILED
+            job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save()
+    logger.info(f"Job {job_id} ({job.kind}) finished as {job.status}")
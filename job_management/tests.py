@@ -0,0 +1,134 @@
+import tempfile
+from unittest.mock import patch
+
+import fakeredis
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from educational_management.celery import app as celery_app
+from job_management.handlers import JobHandler, chunked, register
+from job_management.models import Job, JobChunk
+from user_management.models import User
+
+
+@register
+class SumJob(JobHandler):
+    kind = "test_sum"
+    chunk_size = 3
+    fail_on = None
+
+    def chunks(self, job):
+        return [
+            {"numbers": numbers}
+            for numbers in chunked(job.params["numbers"], self.chunk_size)
+        ]
+
+    def run_chunk(self, job, payload):
+        if self.fail_on in payload["numbers"]:
+            raise RuntimeError("boom")
+        return sum(payload["numbers"])
+
+    def finalize(self, job, results):
+        job.attach_artifact("sums.csv", "\n".join(map(str, results)).encode())
+        return {"total": sum(results)}
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class JobApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="admin@example.com", password="pass12345", is_institution=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        redis_patch = patch(
+            "job_management.progress.redis_client",
+            fakeredis.FakeRedis(decode_responses=True),
+        )
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+        SumJob.fail_on = None
+
+    def submit(self, numbers):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("job_management:job-list"),
+                {"kind": "test_sum", "params": {"numbers": numbers}},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        return Job.objects.get(pk=response.data["id"])
+
+    def poll(self, job):
+        return self.client.get(
+            reverse("job_management:job-detail", kwargs={"pk": job.pk})
+        ).data
+
+    def test_job_runs_in_chunks_and_produces_artifact(self):
+        job = self.submit(list(range(1, 8)))
+        data = self.poll(job)
+        self.assertEqual(data["status"], Job.Status.COMPLETED)
+        self.assertEqual(data["result"], {"total": 28})
+        self.assertEqual(data["progress"]["total"], 3)
+        self.assertEqual(data["progress"]["percent"], 100.0)
+
+        response = self.client.get(data["download_url"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), b"6\n15\n7")
+
+    def test_failed_chunks_can_be_retried(self):
+        SumJob.fail_on = 5
+        job = self.submit(list(range(1, 8)))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        failed = job.chunks.get(status=JobChunk.Status.FAILED)
+        self.assertEqual(failed.index, 1)
+        self.assertEqual(self.poll(job)["progress"]["failed"], 1)
+
+        SumJob.fail_on = None
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("job_management:job-retry", kwargs={"pk": job.pk})
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        data = self.poll(job)
+        self.assertEqual(data["status"], Job.Status.COMPLETED)
+        self.assertEqual(data["progress"]["failed"], 0)
+        self.assertEqual(data["result"], {"total": 28})
+
+    def test_cancelled_job_does_not_run(self):
+        response = self.client.post(
+            reverse("job_management:job-list"),
+            {"kind": "test_sum", "params": {"numbers": [1, 2]}},
+            format="json",
+        )
+        job = Job.objects.get(pk=response.data["id"])
+        response = self.client.post(
+            reverse("job_management:job-cancel", kwargs={"pk": job.pk})
+        )
+        self.assertEqual(response.data["status"], Job.Status.CANCELLED)
+        response = self.client.post(
+            reverse("job_management:job-cancel", kwargs={"pk": job.pk})
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(job.chunks.exists())
+
+    def test_unknown_kind_and_other_users_jobs(self):
+        response = self.client.post(
+            reverse("job_management:job-list"), {"kind": "nope"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        job = self.submit([1])
+        other = APIClient()
+        other.force_authenticate(
+            User.objects.create_user(email="other@example.com", password="pass12345")
+        )
+        response = other.get(
+            reverse("job_management:job-detail", kwargs={"pk": job.pk})
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
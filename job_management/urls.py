@@ -0,0 +1,10 @@
+from rest_framework.routers import DefaultRouter
+
+from .views import JobViewSet
+
+app_name = "job_management"
+
+router = DefaultRouter()
+router.register("", JobViewSet, basename="job")
+
+urlpatterns = router.urls
@@ -0,0 +1,82 @@
+import logging
+
+from django.http import FileResponse
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from job_management.models import Job
+from job_management.serializers import JobSerializer, JobSubmitSerializer
+from job_management.services import cancel_job, retry_job, submit_job
+
+logger = logging.getLogger("job_management")
+
+
+class JobViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Submit background jobs and poll their progress. Users only see the jobs
+    they submitted.
+    """
+
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Job.objects.filter(created_by=self.request.user)
+        kind = self.request.query_params.get("kind")
+        job_status = self.request.query_params.get("status")
+        if kind:
+            queryset = queryset.filter(kind=kind)
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return JobSubmitSerializer
+        return JobSerializer
+
+    def create(self, request):
+        serializer = JobSubmitSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        job = submit_job(
+            serializer.validated_data["kind"],
+            request.user,
+            params=serializer.validated_data["params"],
+            institution=serializer.validated_data.get("institution"),
+        )
+        return Response(
+            JobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        job = cancel_job(self.get_object())
+        logger.info(f"Job {job.id} cancelled by user {request.user.id}")
+        return Response(JobSerializer(job, context={"request": request}).data)
+
+    @action(detail=True, methods=["post"])
+    def retry(self, request, pk=None):
+        job = retry_job(self.get_object())
+        return Response(
+            JobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if not job.artifact:
+            raise NotFound("This job has no downloadable result.")
+        return FileResponse(
+            job.artifact.open("rb"), as_attachment=True, filename=job.artifact_name
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-19 00:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicate_started_attempts(apps, schema_editor):
+    """Keep the oldest open attempt per (quiz, user) so the constraint applies."""
+    QuizAttempt = apps.get_model("quiz", "QuizAttempt")
+    seen = set()
+    duplicates = []
+    for attempt_id, quiz_id, user_id in (
+        QuizAttempt.objects.filter(status="started")
+        .order_by("quiz_id", "user_id", "started_at")
+        .values_list("id", "quiz_id", "user_id")
+    ):
+        if (quiz_id, user_id) in seen:
+            duplicates.append(attempt_id)
+        else:
+            seen.add((quiz_id, user_id))
+    QuizAttempt.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_started_attempts, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='quizattempt',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'started')), fields=('quiz', 'user'), name='unique_started_attempt_per_user'),
+        ),
+    ]
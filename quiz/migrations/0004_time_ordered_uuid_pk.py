@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 00:47
+
+import institution.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_quizattempt_unique_started'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quizattempt',
+            name='id',
+            field=models.UUIDField(default=institution.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='quizresponse',
+            name='id',
+            field=models.UUIDField(default=institution.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,141 @@
+# Generated by Django 5.2 on 2026-10-19 01:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("institution", "0006_academicsession"),
+        ("quiz", "0004_time_ordered_uuid_pk"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedQuizAttempt",
+            fields=[
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "id",
+                    models.UUIDField(editable=False, primary_key=True, serialize=False),
+                ),
+                ("score", models.FloatField()),
+                ("started_at", models.DateTimeField()),
+                ("ended_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("started", "Started"), ("completed", "Completed")],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "quiz",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="quiz.quizcontainer",
+                    ),
+                ),
+                (
+                    "session",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="institution.academicsession",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived quiz attempt",
+                "verbose_name_plural": "Archived quiz attempts",
+                "indexes": [
+                    models.Index(fields=["session"], name="quizattempt_arch_0_idx"),
+                    models.Index(
+                        fields=["session", "user"], name="quizattempt_arch_1_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedQuizResponse",
+            fields=[
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "id",
+                    models.UUIDField(editable=False, primary_key=True, serialize=False),
+                ),
+                ("short_answer", models.TextField(blank=True, null=True)),
+                ("is_correct", models.BooleanField(null=True)),
+                ("manual_score", models.FloatField(blank=True, null=True)),
+                (
+                    "attempt",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="quiz.quizattempt",
+                    ),
+                ),
+                (
+                    "question",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="quiz.globalquizquestion",
+                    ),
+                ),
+                (
+                    "selected_option",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="quiz.quizoption",
+                    ),
+                ),
+                (
+                    "session",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="institution.academicsession",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived quiz response",
+                "verbose_name_plural": "Archived quiz responses",
+                "indexes": [
+                    models.Index(fields=["session"], name="quizresponse_arch_0_idx"),
+                    models.Index(
+                        fields=["session", "attempt"], name="quizresponse_arch_1_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
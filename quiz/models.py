@@ -1,8 +1,11 @@
-from django.db import models
+from django.db import models, connection, transaction
+from django.db.models import Q
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from uuid import uuid4
 from institution.models import *
+from institution.archive import archive_model
+from institution.validation import BatchValidationMixin, lookup
 from django.conf import settings
 
 
@@ -130,7 +133,7 @@ class QuizOption(CommonFields):
 
 
 # --- Quiz Instance Models ---
-class QuizContainer(CommonFields):
+class QuizContainer(BatchValidationMixin, CommonFields):
     curriculum_track = models.ForeignKey(
         CurriculumTrack,
         on_delete=models.CASCADE,
@@ -201,7 +204,27 @@ class QuizContainer(CommonFields):
         GlobalQuizQuestion, related_name="quiz_containers"
     )
 
-    def clean(self):
+    @classmethod
+    def build_validation_context(cls, instances):
+        return {
+            "subject_tracks": lookup(
+                Subject, instances, "subject_id", "stream__curriculum_track_id"
+            ),
+            "section_tracks": lookup(
+                Section, instances, "section_id", "curriculum_track_id"
+            ),
+            "streams": lookup(
+                Stream, instances, "stream_id", "curriculum_track_id", "section_id"
+            ),
+            "module_subjects": lookup(Module, instances, "module_id", "subject_id"),
+            "unit_modules": lookup(Unit, instances, "unit_id", "module_id"),
+            "lesson_units": lookup(Lesson, instances, "lesson_id", "unit_id"),
+            "micro_lesson_lessons": lookup(
+                MicroLesson, instances, "micro_lesson_id", "lesson_id"
+            ),
+        }
+
+    def clean_with_context(self, context):
         if self.enable_negative_marking and (
             self.negative_marks is None or self.negative_marks <= 0
         ):
@@ -217,29 +240,44 @@ class QuizContainer(CommonFields):
                 "Enable negative marking check box to add negative marks."
             )
         # Validate curriculum hierarchy
-        if not Stream.objects.filter(
-            curriculum_track=self.curriculum_track, subjects=self.subject
-        ).exists():
+        if context["subject_tracks"].get(self.subject_id) != self.curriculum_track_id:
             raise ValidationError(
                 "Subject does not belong to the specified curriculum track."
             )
-        if self.section and self.section.curriculum_track != self.curriculum_track:
+        if (
+            self.section_id
+            and context["section_tracks"].get(self.section_id)
+            != self.curriculum_track_id
+        ):
             raise ValidationError(
                 "Section does not belong to the specified curriculum track."
             )
-        if self.stream and self.stream.curriculum_track != self.curriculum_track:
+        stream_track_id, stream_section_id = context["streams"].get(
+            self.stream_id, (None, None)
+        )
+        if self.stream_id and stream_track_id != self.curriculum_track_id:
             raise ValidationError(
                 "Stream does not belong to the specified curriculum track."
             )
-        if self.stream and self.section and self.stream.section != self.section:
+        if self.stream_id and self.section_id and stream_section_id != self.section_id:
             raise ValidationError("Stream does not belong to the specified section.")
-        if self.module and self.module.subject != self.subject:
+        if (
+            self.module_id
+            and context["module_subjects"].get(self.module_id) != self.subject_id
+        ):
             raise ValidationError("Module does not belong to the specified subject.")
-        if self.unit and self.unit.module != self.module:
+        if self.unit_id and context["unit_modules"].get(self.unit_id) != self.module_id:
             raise ValidationError("Unit does not belong to the specified module.")
-        if self.lesson and self.lesson.unit != self.unit:
+        if (
+            self.lesson_id
+            and context["lesson_units"].get(self.lesson_id) != self.unit_id
+        ):
             raise ValidationError("Lesson does not belong to the specified unit.")
-        if self.micro_lesson and self.micro_lesson.lesson != self.lesson:
+        if (
+            self.micro_lesson_id
+            and context["micro_lesson_lessons"].get(self.micro_lesson_id)
+            != self.lesson_id
+        ):
             raise ValidationError(
                 "Micro lesson does not belong to the specified lesson."
             )
@@ -255,7 +293,52 @@ ATTEMPT_STATUS_CHOICES = [
 ]
 
 
+class QuizAttemptManager(models.Manager):
+    def start(self, quiz, user):
+        """
+        Return (attempt, created) for the user's open attempt on ``quiz``.
+
+        Backed by the partial unique constraint on (quiz, user) for started
+        attempts, so simultaneous requests converge on one row. On PostgreSQL
+        this is a single INSERT ... ON CONFLICT statement; the no-op DO UPDATE
+        makes the existing row come back through RETURNING as well, and
+        ``xmax = 0`` tells a fresh insert from a conflict.
+        """
+        if connection.vendor != "postgresql":
+            return self.get_or_create(quiz=quiz, user=user, status="started")
+
+        now = timezone.now()
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        attempts = list(
+            self.raw(
+                f"""
+                INSERT INTO {table}
+                    (id, quiz_id, user_id, score, started_at, status,
+                     created_at, updated_at)
+                VALUES (%s, %s, %s, 0, %s, 'started', %s, %s)
+                ON CONFLICT (quiz_id, user_id) WHERE status = 'started'
+                DO UPDATE SET status = EXCLUDED.status
+                RETURNING *, (xmax = 0) AS created
+                """,
+                [self.model._meta.pk.get_default(), quiz.pk, user.pk, now, now, now],
+            )
+        )
+        attempt = attempts[0]
+        return attempt, attempt.created
+
+    def lock(self, pk):
+        """
+        Fetch an attempt with a row-level lock (SELECT ... FOR UPDATE).
+
+        Must be called inside transaction.atomic(); concurrent scorers of the
+        same attempt queue on the row instead of computing the score twice.
+        Attempts of other users are unaffected.
+        """
+        return self.select_for_update().select_related("quiz").get(pk=pk)
+
+
 class QuizAttempt(CommonFields):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     quiz = models.ForeignKey(
         QuizContainer, on_delete=models.CASCADE, related_name="attempts"
     )
@@ -269,6 +352,17 @@ class QuizAttempt(CommonFields):
         max_length=20, choices=ATTEMPT_STATUS_CHOICES, default="started"
     )
 
+    objects = QuizAttemptManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["quiz", "user"],
+                condition=Q(status="started"),
+                name="unique_started_attempt_per_user",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user}'s attempt on {self.quiz.title} ({self.status})"
 
@@ -287,14 +381,22 @@ class QuizAttempt(CommonFields):
         self.save(update_fields=["score"])
 
     def complete_attempt(self):
-        if self.status == "started":
-            self.ended_at = timezone.now()
-            self.status = "completed"
-            self.save(update_fields=["ended_at", "status"])
-            self.calculate_score()
-
-
-class QuizResponse(CommonFields):
+        # Conditional UPDATE so that only one of two racing submissions
+        # completes (and scores) the attempt.
+        ended_at = timezone.now()
+        with transaction.atomic():
+            completed = QuizAttempt.objects.filter(
+                pk=self.pk, status="started"
+            ).update(ended_at=ended_at, status="completed", updated_at=ended_at)
+            if completed:
+                self.ended_at = ended_at
+                self.status = "completed"
+                self.calculate_score()
+        return bool(completed)
+
+
+class QuizResponse(BatchValidationMixin, CommonFields):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     attempt = models.ForeignKey(
         QuizAttempt, on_delete=models.CASCADE, related_name="responses"
     )
@@ -314,19 +416,34 @@ class QuizResponse(CommonFields):
     def __str__(self):
         return f"Response for {self.question.text[:20]}... in attempt {self.attempt.id}"
 
-    def clean(self):
-        q_type = self.question.question_type
+    @classmethod
+    def build_validation_context(cls, instances):
+        return {
+            "question_types": lookup(
+                GlobalQuizQuestion, instances, "question_id", "question_type"
+            ),
+            "option_questions": lookup(
+                QuizOption, instances, "selected_option_id", "question_id"
+            ),
+        }
+
+    def clean_with_context(self, context):
+        q_type = context["question_types"].get(self.question_id)
         if q_type in ["mcq", "true_false"]:
-            if self.selected_option is None and self.short_answer:
+            if self.selected_option_id is None and self.short_answer:
                 raise ValidationError(
                     f"Do not provide short answer for {q_type} questions."
                 )
-            if self.selected_option and self.selected_option.question != self.question:
+            if (
+                self.selected_option_id
+                and context["option_questions"].get(self.selected_option_id)
+                != self.question_id
+            ):
                 raise ValidationError(
                     "The selected option does not belong to this question."
                 )
         elif q_type == "short":
-            if self.selected_option is not None:
+            if self.selected_option_id is not None:
                 raise ValidationError(
                     "Do not select an option for short answer questions."
                 )
@@ -341,3 +458,7 @@ class QuizResponse(CommonFields):
             elif q_type == "short":
                 self.is_correct = None
         super().save(*args, **kwargs)
+
+
+ArchivedQuizAttempt = archive_model(QuizAttempt, indexes=[["user"]])
+ArchivedQuizResponse = archive_model(QuizResponse, indexes=[["attempt"]])
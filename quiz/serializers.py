@@ -27,6 +27,7 @@ from institution.models import (
     TeacherEnrollment,
     StudentEnrollment,
 )
+from institution.validation import validate_batch
 from user_management.models import ParentChildRelationship
 import logging
 
@@ -451,35 +452,50 @@ class QuizSubmissionSerializer(serializers.Serializer):
         return value
 
     def create(self, validated_data):
-        attempt = self.context["attempt"]
-        quiz = attempt.quiz
         with transaction.atomic():
+            # Lock the attempt so a retried submit waits for the first one
+            # and then sees it completed instead of scoring it twice.
+            attempt = QuizAttempt.objects.lock(self.context["attempt"].pk)
+            if attempt.status != "started":
+                raise serializers.ValidationError(
+                    {"attempt_id": "This quiz attempt has already been submitted."}
+                )
+            questions = [answer["question"] for answer in validated_data["answers"]]
+            options = {
+                (option.question_id, option.label): option
+                for option in QuizOption.objects.filter(question__in=questions)
+            }
+            responses = []
             for answer in validated_data["answers"]:
                 question = answer["question"]
-                is_correct = None
                 if question.question_type == "short":
-                    QuizResponse.objects.create(
-                        attempt=attempt,
-                        question=question,
-                        short_answer=answer.get("short_answer"),
-                        is_correct=None,
-                    )
-                else:
-                    selected_label = answer.get("selected_option")
-                    selected_option = QuizOption.objects.filter(
-                        question=question, label=selected_label
-                    ).first()
-                    if not selected_option:
-                        raise serializers.ValidationError(
-                            f"Invalid option '{selected_label}' for question {question.id}."
+                    responses.append(
+                        QuizResponse(
+                            attempt=attempt,
+                            question=question,
+                            short_answer=answer.get("short_answer"),
+                            is_correct=None,
                         )
-                    is_correct = selected_option.is_correct
-                    QuizResponse.objects.create(
+                    )
+                    continue
+                selected_label = answer.get("selected_option")
+                selected_option = options.get((question.id, selected_label))
+                if not selected_option:
+                    raise serializers.ValidationError(
+                        f"Invalid option '{selected_label}' for question {question.id}."
+                    )
+                responses.append(
+                    QuizResponse(
                         attempt=attempt,
                         question=question,
                         selected_option=selected_option,
-                        is_correct=is_correct,
+                        is_correct=selected_option.is_correct,
                     )
+                )
+            errors = validate_batch(responses)
+            if errors:
+                raise serializers.ValidationError({"answers": errors})
+            QuizResponse.objects.bulk_create(responses)
             attempt.complete_attempt()
         return {
             "attempt_id": attempt.id,
@@ -520,11 +536,12 @@ class ManualGradingSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         response = self.context["response"]
-        response.manual_score = validated_data["manual_score"]
-        response.is_correct = validated_data["manual_score"] > 0
-        response.save()
-        attempt = response.attempt
-        attempt.calculate_score()
+        with transaction.atomic():
+            attempt = QuizAttempt.objects.lock(response.attempt_id)
+            response.manual_score = validated_data["manual_score"]
+            response.is_correct = validated_data["manual_score"] > 0
+            response.save()
+            attempt.calculate_score()
         # Return a dictionary matching the serializer's fields
         return {"response_id": str(response.id), "manual_score": response.manual_score}
 
@@ -1,3 +1,132 @@
+from io import StringIO
+from uuid import uuid4
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from institution.models import (
+    CurriculumTrack,
+    GlobalCurriculumTrack,
+    GlobalStream,
+    GlobalSubject,
+    InstitutionInfo,
+    Stream,
+    StudentEnrollment,
+    Section,
+    Subject,
+)
+from quiz.models import QuizAttempt, QuizContainer
+from user_management.models import InstitutionMembership, User
+
+
+class QuizAttemptStartTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email="admin@example.com", password="pass12345", is_institution=True
+        )
+        self.student = User.objects.create_user(
+            email="student@example.com", password="pass12345", is_student=True
+        )
+        self.institution = InstitutionInfo.objects.create(
+            name="Test School", admin=self.admin
+        )
+        self.track = CurriculumTrack.objects.create(
+            institution_info=self.institution,
+            name=GlobalCurriculumTrack.objects.create(name="Class 9"),
+        )
+        self.section = Section.objects.create(
+            curriculum_track=self.track, name="Section A"
+        )
+        stream = Stream.objects.create(
+            curriculum_track=self.track,
+            section=self.section,
+            name=GlobalStream.objects.create(name="Science"),
+        )
+        subject = Subject.objects.create(
+            stream=stream, name=GlobalSubject.objects.create(name="Physics")
+        )
+        self.quiz = QuizContainer.objects.create(
+            curriculum_track=self.track,
+            subject=subject,
+            title="Weekly quiz",
+            status="published",
+        )
+        InstitutionMembership.objects.create(
+            user=self.student, institution=self.institution, role="student"
+        )
+        StudentEnrollment.objects.create(
+            institution=self.institution,
+            user=self.student,
+            curriculum_track=self.track,
+            section=self.section,
+        )
+
+    def test_start_returns_the_same_open_attempt(self):
+        attempt, created = QuizAttempt.objects.start(self.quiz, self.student)
+        again, created_again = QuizAttempt.objects.start(self.quiz, self.student)
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(attempt.pk, again.pk)
+        self.assertEqual(QuizAttempt.objects.count(), 1)
+
+    def test_constraint_rejects_second_started_attempt(self):
+        QuizAttempt.objects.create(quiz=self.quiz, user=self.student)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            QuizAttempt.objects.create(quiz=self.quiz, user=self.student)
+
+    def test_completed_attempt_allows_a_new_start(self):
+        attempt, _ = QuizAttempt.objects.start(self.quiz, self.student)
+        self.assertTrue(attempt.complete_attempt())
+        self.assertFalse(attempt.complete_attempt())
+        new_attempt, created = QuizAttempt.objects.start(self.quiz, self.student)
+        self.assertTrue(created)
+        self.assertNotEqual(attempt.pk, new_attempt.pk)
+
+    def test_start_view(self):
+        client = APIClient()
+        client.force_authenticate(self.student)
+        url = reverse("quiz-start", kwargs={"pk": self.quiz.pk})
+        first = client.post(url)
+        second = client.post(url)
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data["id"], second.data["id"])
+
+    def test_rekey_replaces_random_attempt_keys(self):
+        attempt = QuizAttempt.objects.create(
+            id=uuid4(), quiz=self.quiz, user=self.student
+        )
+        call_command("rekey_uuid7", "quiz.QuizAttempt", stdout=StringIO())
+        rekeyed = QuizAttempt.objects.get()
+        self.assertEqual(rekeyed.pk.version, 7)
+        self.assertEqual(
+            rekeyed.pk.int >> 80, int(attempt.created_at.timestamp() * 1000)
+        )
 
-# Create your tests here.
+    def test_rekey_rewrites_each_batch_with_one_update_per_table(self):
+        for index in range(3):
+            student = User.objects.create_user(email=f"rekey{index}@example.com")
+            QuizAttempt.objects.create(id=uuid4(), quiz=self.quiz, user=student)
+        tables = 1 + sum(
+            rel.field.target_field.primary_key
+            for rel in QuizAttempt._meta.related_objects
+        )
+        with CaptureQueriesContext(connection) as queries:
+            call_command(
+                "rekey_uuid7",
+                "quiz.QuizAttempt",
+                "--batch-size",
+                "2",
+                stdout=StringIO(),
+            )
+        updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+        # Two batches of keys, whatever their size
+        self.assertEqual(len(updates), 2 * tables)
+        self.assertEqual(
+            {attempt.pk.version for attempt in QuizAttempt.objects.all()}, {7}
+        )
@@ -14,8 +14,8 @@ from .serializers import (
     ParentQuizAttemptSerializer,
 )
 from institution.models import InstitutionInfo, StudentEnrollment, TeacherEnrollment
-from user_management.models import ParentChildRelationship
-from django.utils import timezone
+from user_management.models import InstitutionMembership, ParentChildRelationship
+from django.db.models import Exists, OuterRef
 import logging
 
 logger = logging.getLogger(__name__)
@@ -332,11 +332,28 @@ class QuizStartView(APIView):
 
     def post(self, request, pk):
         try:
-            quiz = get_object_or_404(QuizContainer, pk=pk)
-            institution = InstitutionInfo.objects.filter(
-                memberships__user=request.user
-            ).first()
-            if quiz.curriculum_track.institution_info != institution:
+            # Membership and enrollment are resolved in the same query as the
+            # quiz so a start costs one read plus one upsert.
+            quiz = get_object_or_404(
+                QuizContainer.objects.annotate(
+                    is_member=Exists(
+                        InstitutionMembership.objects.filter(
+                            user=request.user,
+                            institution=OuterRef("curriculum_track__institution_info"),
+                        )
+                    ),
+                    is_enrolled=Exists(
+                        StudentEnrollment.objects.filter(
+                            user=request.user,
+                            curriculum_track=OuterRef("curriculum_track"),
+                            institution=OuterRef("curriculum_track__institution_info"),
+                            is_active=True,
+                        )
+                    ),
+                ),
+                pk=pk,
+            )
+            if not quiz.is_member:
                 logger.warning(
                     f"User {request.user.id} accessed quiz {pk} from another institution"
                 )
@@ -358,12 +375,7 @@ class QuizStartView(APIView):
                     {"error": "Only students can attempt quizzes"},
                     status=status.HTTP_403_FORBIDDEN,
                 )
-            if not StudentEnrollment.objects.filter(
-                user=request.user,
-                curriculum_track=quiz.curriculum_track,
-                institution=institution,
-                is_active=True,
-            ).exists():
+            if not quiz.is_enrolled:
                 logger.warning(
                     f"User {request.user.id} not enrolled in curriculum track for quiz {pk}"
                 )
@@ -371,12 +383,7 @@ class QuizStartView(APIView):
                     {"error": "You are not enrolled in this curriculum track"},
                     status=status.HTTP_403_FORBIDDEN,
                 )
-            attempt, created = QuizAttempt.objects.get_or_create(
-                quiz=quiz,
-                user=request.user,
-                status="started",
-                defaults={"started_at": timezone.now()},
-            )
+            attempt, created = QuizAttempt.objects.start(quiz, request.user)
             serializer = QuizAttemptSerializer(attempt)
             logger.info(
                 f"Quiz attempt {'created' if created else 'retrieved'} for quiz {pk} by user {request.user.id}"
@@ -0,0 +1,210 @@
+"""
+Benchmark of row-per-day attendance versus bit-packed monthly rows on
+PostgreSQL.
+
+Creates two scratch tables: one shaped like the attendance table (a row
+per student, subject and school day, with its unique key and student
+index) and one shaped like the packed rollup columns (a row per student,
+subject and month, see attendance.packed). Fills both with the same
+random statuses, then reports their total size (heap plus indexes) and
+the median latency of counting the statuses of one section over a date
+range that starts and ends mid-month. The tables are dropped afterwards.
+
+Usage (inside the web container, DJANGO_DEBUG=False so Postgres is used):
+    python scripts/bench_attendance_storage.py --students 2000 --months 10
+"""
+
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "educational_management.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from attendance.packed import (  # noqa: E402
+    STATUS_CODES,
+    count_statuses,
+    day_mask,
+    encode_month,
+    np,
+)
+
+ROWS_TABLE = "bench_attendance_rows"
+PACKED_TABLE = "bench_attendance_packed"
+TABLES_SQL = f"""
+CREATE UNLOGGED TABLE {ROWS_TABLE} (
+    id uuid PRIMARY KEY,
+    student_id uuid NOT NULL,
+    section_id uuid NOT NULL,
+    subject_id uuid NOT NULL,
+    date date NOT NULL,
+    status varchar(20) NOT NULL,
+    UNIQUE (student_id, section_id, subject_id, date)
+);
+CREATE INDEX {ROWS_TABLE}_section_idx ON {ROWS_TABLE} (section_id, subject_id, date);
+CREATE UNLOGGED TABLE {PACKED_TABLE} (
+    id bigserial PRIMARY KEY,
+    student_id uuid NOT NULL,
+    section_id uuid NOT NULL,
+    subject_id uuid NOT NULL,
+    month date NOT NULL,
+    days integer NOT NULL,
+    statuses bigint NOT NULL,
+    UNIQUE (section_id, subject_id, month, student_id)
+);
+"""
+SECTION_SIZE = 40
+
+
+def fill(cursor, students, months, subjects):
+    """Random statuses on weekdays; returns the section measured later."""
+    generator = random.Random(42)
+    sections = [uuid.uuid4() for _ in range(0, students, SECTION_SIZE)]
+    subject_ids = [uuid.uuid4() for _ in range(subjects)]
+    first = datetime.date.today().replace(day=1)
+    month_starts = []
+    for _ in range(months):
+        first = (first - datetime.timedelta(days=1)).replace(day=1)
+        month_starts.append(first)
+    for index in range(students):
+        student_id = uuid.uuid4()
+        section_id = sections[index // SECTION_SIZE]
+        rows, packed = [], []
+        for subject_id in subject_ids:
+            for month in month_starts:
+                statuses = {}
+                day = month
+                while day.month == month.month:
+                    if day.weekday() < 5:
+                        statuses[day.day] = generator.choices(
+                            list(STATUS_CODES), weights=(85, 8, 5, 2)
+                        )[0]
+                        rows.append(
+                            (
+                                uuid.uuid4(),
+                                student_id,
+                                section_id,
+                                subject_id,
+                                day,
+                                statuses[day.day],
+                            )
+                        )
+                    day += datetime.timedelta(days=1)
+                packed.append(
+                    (student_id, section_id, subject_id, month, *encode_month(statuses))
+                )
+        cursor.executemany(
+            f"INSERT INTO {ROWS_TABLE} (id, student_id, section_id, subject_id, "
+            "date, status) VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+        cursor.executemany(
+            f"INSERT INTO {PACKED_TABLE} (student_id, section_id, subject_id, "
+            "month, days, statuses) VALUES (%s, %s, %s, %s, %s, %s)",
+            packed,
+        )
+    cursor.execute(f"ANALYZE {ROWS_TABLE}")
+    cursor.execute(f"ANALYZE {PACKED_TABLE}")
+    return sections[0], subject_ids[0], min(month_starts), max(month_starts)
+
+
+def count_rows(cursor, section_id, subject_id, start, end):
+    cursor.execute(
+        f"SELECT status, count(*) FROM {ROWS_TABLE} WHERE section_id = %s "
+        "AND subject_id = %s AND date BETWEEN %s AND %s GROUP BY status",
+        [section_id, subject_id, start, end],
+    )
+    return dict(cursor.fetchall())
+
+
+def count_packed(cursor, section_id, subject_id, start, end):
+    cursor.execute(
+        f"SELECT month, days, statuses FROM {PACKED_TABLE} WHERE section_id = %s "
+        "AND subject_id = %s AND month BETWEEN %s AND %s",
+        [section_id, subject_id, start.replace(day=1), end],
+    )
+    counts = count_statuses(
+        [
+            (days, statuses, day_mask(month, start, end))
+            for month, days, statuses in cursor.fetchall()
+        ]
+    )
+    return {status: sum(values) for status, values in counts.items() if sum(values)}
+
+
+def median_ms(function, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, round(statistics.median(timings), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--months", type=int, default=10)
+    parser.add_argument("--subjects", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    if connection.vendor != "postgresql":
+        print(
+            "This benchmark needs PostgreSQL (set DJANGO_DEBUG=False); "
+            f"current backend is {connection.vendor}."
+        )
+        return 1
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {ROWS_TABLE}, {PACKED_TABLE}")
+        cursor.execute(TABLES_SQL)
+        try:
+            section_id, subject_id, first, last = fill(
+                cursor, args.students, args.months, args.subjects
+            )
+            start = first + datetime.timedelta(days=10)
+            end = last + datetime.timedelta(days=19)
+            results = []
+            for table, function in (
+                (ROWS_TABLE, count_rows),
+                (PACKED_TABLE, count_packed),
+            ):
+                cursor.execute(
+                    f"SELECT count(*), pg_total_relation_size('{table}') FROM {table}"
+                )
+                rows, size = cursor.fetchone()
+                counts, latency = median_ms(
+                    function, args.repeat, cursor, section_id, subject_id, start, end
+                )
+                results.append((table, rows, size, latency, counts))
+        finally:
+            cursor.execute(f"DROP TABLE IF EXISTS {ROWS_TABLE}, {PACKED_TABLE}")
+
+    print(f"{'table':<26}{'rows':>10}{'size_mb':>10}{'count_ms':>10}")
+    for table, rows, size, latency, _ in results:
+        print(f"{table:<26}{rows:>10}{size / 1024 / 1024:>10.2f}{latency:>10}")
+    if results[0][4] != results[1][4]:
+        print(f"\nCounts differ: {results[0][4]} != {results[1][4]}")
+        return 1
+    print(
+        f"\nRow-per-day storage is {results[0][2] / results[1][2]:.1f}x the packed "
+        f"size; counting with {'NumPy' if np is not None else 'integer bit ops'}."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
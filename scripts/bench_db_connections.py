@@ -0,0 +1,127 @@
+"""
+Benchmark of connection setup overhead per request against the configured
+PostgreSQL database.
+
+Simulates N "requests" that each run one trivial query, using three
+strategies:
+  fresh       - open a new connection per request (the old behaviour)
+  persistent  - reuse one connection (CONN_MAX_AGE > 0)
+  pool        - check a connection out of a psycopg pool (OPTIONS["pool"])
+
+Usage (inside the web container, DJANGO_DEBUG=False so Postgres is used):
+    python scripts/bench_db_connections.py --requests 500 --pool-size 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "educational_management.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+import psycopg  # noqa: E402
+from django.db import connection  # noqa: E402
+from psycopg_pool import ConnectionPool  # noqa: E402
+
+
+def summarize(name, samples):
+    samples = sorted(samples)
+    p95 = samples[max(int(len(samples) * 0.95) - 1, 0)]
+    return {
+        "strategy": name,
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(p95, 3),
+        "total_ms": round(sum(samples), 1),
+    }
+
+
+def run_fresh(params, requests):
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        with psycopg.connect(**params) as conn:
+            conn.execute("SELECT 1").fetchone()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run_persistent(params, requests):
+    samples = []
+    with psycopg.connect(**params) as conn:
+        for _ in range(requests):
+            started = time.perf_counter()
+            conn.execute("SELECT 1").fetchone()
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run_pool(params, requests, pool_size):
+    samples = []
+    with ConnectionPool(
+        kwargs=params,
+        min_size=pool_size,
+        max_size=pool_size,
+        check=ConnectionPool.check_connection,
+        open=True,
+    ) as pool:
+        pool.wait()
+        for _ in range(requests):
+            started = time.perf_counter()
+            with pool.connection() as conn:
+                conn.execute("SELECT 1").fetchone()
+            samples.append((time.perf_counter() - started) * 1000)
+        stats = pool.get_stats()
+    return samples, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    if connection.vendor != "postgresql":
+        print(
+            "This benchmark needs PostgreSQL (set DJANGO_DEBUG=False); "
+            f"current backend is {connection.vendor}."
+        )
+        return 1
+
+    params = connection.get_connection_params()
+    params["autocommit"] = True
+
+    results = [
+        summarize("fresh", run_fresh(params, args.requests)),
+        summarize("persistent", run_persistent(params, args.requests)),
+    ]
+    pool_samples, pool_stats = run_pool(params, args.requests, args.pool_size)
+    results.append(summarize("pool", pool_samples))
+
+    print(
+        f"{'strategy':<12}{'mean_ms':>10}{'p50_ms':>10}{'p95_ms':>10}{'total_ms':>12}"
+    )
+    for row in results:
+        print(
+            f"{row['strategy']:<12}{row['mean_ms']:>10}{row['p50_ms']:>10}"
+            f"{row['p95_ms']:>10}{row['total_ms']:>12}"
+        )
+    overhead = results[0]["mean_ms"] - results[1]["mean_ms"]
+    print(f"\nConnection setup overhead per request: {overhead:.3f} ms")
+    print(
+        f"Pool: checkouts={pool_stats.get('requests_num', 0)} "
+        f"wait_ms={pool_stats.get('requests_wait_ms', 0)} "
+        f"connections_created={pool_stats.get('connections_num', 0)}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
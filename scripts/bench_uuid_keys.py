@@ -0,0 +1,103 @@
+"""
+Benchmark of random (uuid4) versus time-ordered (uuid7) primary keys on
+PostgreSQL.
+
+Creates two scratch tables shaped like the attendance table (uuid primary key
+plus a few payload columns), inserts the same number of rows into each in
+batches and reports insert throughput and the size of the primary key index.
+The tables are dropped afterwards.
+
+Usage (inside the web container, DJANGO_DEBUG=False so Postgres is used):
+    python scripts/bench_uuid_keys.py --rows 200000 --batch-size 1000
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "educational_management.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from institution.models import uuid7  # noqa: E402
+
+TABLE_SQL = """
+CREATE UNLOGGED TABLE {table} (
+    id uuid PRIMARY KEY,
+    student_id uuid NOT NULL,
+    date date NOT NULL,
+    status varchar(10) NOT NULL
+)
+"""
+
+
+def run(table, make_id, rows, batch_size):
+    student_id = uuid.uuid4()
+    today = datetime.date.today()
+    elapsed = 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(TABLE_SQL.format(table=table))
+        for offset in range(0, rows, batch_size):
+            batch = [
+                (make_id(), student_id, today, "present")
+                for _ in range(min(batch_size, rows - offset))
+            ]
+            started = time.perf_counter()
+            cursor.executemany(
+                f"INSERT INTO {table} (id, student_id, date, status) "
+                "VALUES (%s, %s, %s, %s)",
+                batch,
+            )
+            elapsed += time.perf_counter() - started
+        cursor.execute(f"SELECT pg_relation_size('{table}_pkey')")
+        index_bytes = cursor.fetchone()[0]
+        cursor.execute(f"DROP TABLE {table}")
+    return {
+        "key": table.rsplit("_", 1)[-1],
+        "rows_per_s": round(rows / elapsed),
+        "seconds": round(elapsed, 2),
+        "index_mb": round(index_bytes / 1024 / 1024, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    if connection.vendor != "postgresql":
+        print(
+            "This benchmark needs PostgreSQL (set DJANGO_DEBUG=False); "
+            f"current backend is {connection.vendor}."
+        )
+        return 1
+
+    results = [
+        run("bench_keys_uuid4", uuid.uuid4, args.rows, args.batch_size),
+        run("bench_keys_uuid7", uuid7, args.rows, args.batch_size),
+    ]
+
+    print(f"{'key':<8}{'rows_per_s':>12}{'seconds':>10}{'index_mb':>10}")
+    for row in results:
+        print(
+            f"{row['key']:<8}{row['rows_per_s']:>12}{row['seconds']:>10}"
+            f"{row['index_mb']:>10}"
+        )
+    ratio = results[0]["index_mb"] / results[1]["index_mb"]
+    print(f"\nuuid4 primary key index is {ratio:.2f}x the size of uuid7")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,43 @@
+import redis
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 import re
+import time
 
 logger = logging.getLogger("user_management")
 
+redis_client = settings.REDIS_CLIENT
+
+SMS_API_URL = "https://api.mimsms.com/api/SmsSending/SMS"
+SMS_TIMEOUT = 10  # seconds
+# Keep-alive connections held to the gateway per process
+SMS_POOL_SIZE = 10
+SMS_METRICS_KEY = "metrics:sms"
+
+_session = None
+
+
+def sms_session():
+    """
+    Process-wide requests session to the SMS gateway, so consecutive sends
+    reuse pooled keep-alive connections instead of a TLS handshake each.
+    Only connection errors are retried: a resent POST could send twice.
+    """
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=SMS_POOL_SIZE,
+            max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2),
+        )
+        session.mount("https://", adapter)
+        _session = session
+    return _session
+
 
 def format_phone_number(phone_number):
     """
@@ -41,8 +74,6 @@ def sms_api(phone_number, message):
     """
     Sends an SMS using the MIM SMS API.
     """
-    api_url = "https://api.mimsms.com/api/SmsSending/SMS"
-
     # Format phone number for MIM SMS API
     try:
         formatted_number = format_phone_number(phone_number)
@@ -63,7 +94,7 @@ def sms_api(phone_number, message):
     logger.debug(f"SMS API payload: {payload}")
 
     try:
-        response = requests.post(api_url, json=payload)
+        response = sms_session().post(SMS_API_URL, json=payload, timeout=SMS_TIMEOUT)
         logger.debug(f"SMS API response status code: {response.status_code}")
         logger.debug(f"SMS API response headers: {response.headers}")
         response_json = response.json()
@@ -84,3 +115,61 @@ def sms_api(phone_number, message):
             f"Full error response: {response.text if 'response' in locals() else 'No response'}"
         )
         return {"error": str(e)}
+
+
+def send_sms_batch(messages):
+    """
+    Send ``messages`` (``[(phone_number, message)]``) one after the other
+    over the pooled session and record the outcome in the SMS metrics.
+    Returns ``{"sent", "failed", "errors"}``, ``errors`` holding
+    ``{"phone_number", "error"}`` per failed message.
+    """
+    started = time.monotonic()
+    sent = 0
+    errors = []
+    for phone_number, message in messages:
+        response = sms_api(phone_number, message)
+        if "error" in response or response.get("status") == "Failed":
+            errors.append(
+                {
+                    "phone_number": phone_number,
+                    "error": response.get("error")
+                    or response.get("responseResult")
+                    or "Failed",
+                }
+            )
+        else:
+            sent += 1
+    record_sms_metrics(sent, len(errors), time.monotonic() - started)
+    return {"sent": sent, "failed": len(errors), "errors": errors}
+
+
+def record_sms_metrics(sent, failed, seconds):
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hincrby(SMS_METRICS_KEY, "batches", 1)
+        pipe.hincrby(SMS_METRICS_KEY, "sent", sent)
+        pipe.hincrby(SMS_METRICS_KEY, "failed", failed)
+        pipe.hincrbyfloat(SMS_METRICS_KEY, "seconds", seconds)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not record SMS metrics: {str(e)}")
+
+
+def sms_metrics():
+    """Totals of send_sms_batch across workers, with throughput and failure rate."""
+    try:
+        raw = redis_client.hgetall(SMS_METRICS_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Could not read SMS metrics: {str(e)}")
+        raw = {}
+    sent = int(raw.get("sent", 0))
+    failed = int(raw.get("failed", 0))
+    seconds = float(raw.get("seconds", 0))
+    return {
+        "batches": int(raw.get("batches", 0)),
+        "sent": sent,
+        "failed": failed,
+        "failure_rate": round(failed / (sent + failed), 3) if sent + failed else 0.0,
+        "messages_per_second": round((sent + failed) / seconds, 2) if seconds else 0.0,
+    }